@@ -0,0 +1,18 @@
+-- Enforce one row per punch on existing databases.
+-- New databases get the constraint from Base.metadata.create_all.
+
+BEGIN;
+
+-- Drop duplicates left by earlier syncs, keeping the first ingested copy
+DELETE FROM attendance_records a
+USING attendance_records b
+WHERE a.employee_id = b.employee_id
+  AND a.check_time = b.check_time
+  AND a.machine_serial = b.machine_serial
+  AND (a.created_at, a.uuid) > (b.created_at, b.uuid);
+
+ALTER TABLE attendance_records
+    ADD CONSTRAINT uq_attendance_records_punch
+    UNIQUE (employee_id, check_time, machine_serial);
+
+COMMIT;
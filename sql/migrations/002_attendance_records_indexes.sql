@@ -0,0 +1,9 @@
+-- Secondary indexes for the read, sync and status-update paths on existing
+-- databases. New databases get them from Base.metadata.create_all.
+-- CONCURRENTLY avoids blocking ingestion; run outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_records_machine_serial_check_time
+    ON attendance_records (machine_serial, check_time);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_records_check_time_brin
+    ON attendance_records USING brin (check_time);
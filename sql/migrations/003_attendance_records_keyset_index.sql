@@ -0,0 +1,6 @@
+-- Seek index for keyset pagination of GET /attendance on existing databases.
+-- New databases get it from Base.metadata.create_all.
+-- CONCURRENTLY avoids blocking ingestion; run outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_records_check_time_uuid
+    ON attendance_records (check_time, uuid);
@@ -0,0 +1,56 @@
+-- Daily attendance summary for existing databases, backfilled from the raw
+-- punches. New databases get the table from Base.metadata.create_all and
+-- fill it as they sync. Sync only refreshes the days it inserts into, so
+-- the backfill must run once before the table is read.
+
+CREATE TABLE IF NOT EXISTS daily_attendance_summary (
+    employee_id VARCHAR NOT NULL,
+    att_date DATE NOT NULL,
+    employee_name VARCHAR NOT NULL,
+    first_check_in TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    last_check_out TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    punch_count INTEGER NOT NULL,
+    devices VARCHAR[] NOT NULL,
+    worked_seconds INTEGER NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (employee_id, att_date)
+);
+
+CREATE INDEX IF NOT EXISTS ix_daily_attendance_summary_att_date_employee_id
+    ON daily_attendance_summary (att_date, employee_id);
+
+-- Same reduction as daily_summary_refresh in attendance_repository.py
+INSERT INTO daily_attendance_summary (
+    employee_id, att_date, employee_name, first_check_in, last_check_out,
+    punch_count, devices, worked_seconds, updated_at
+)
+SELECT
+    employee_id,
+    att_date,
+    employee_name,
+    first_check_in,
+    last_check_out,
+    punch_count,
+    devices,
+    GREATEST(EXTRACT(EPOCH FROM last_check_out - first_check_in), 0)::integer,
+    LOCALTIMESTAMP
+FROM (
+    SELECT
+        employee_id,
+        att_date::date AS att_date,
+        max(employee_name) AS employee_name,
+        coalesce(min(check_time) FILTER (WHERE attendance_status = 'Check In'), min(check_time)) AS first_check_in,
+        coalesce(max(check_time) FILTER (WHERE attendance_status = 'Check Out'), max(check_time)) AS last_check_out,
+        count(*) AS punch_count,
+        array_agg(DISTINCT machine_serial ORDER BY machine_serial) AS devices
+    FROM attendance_records
+    GROUP BY employee_id, att_date::date
+) AS daily
+ON CONFLICT (employee_id, att_date) DO UPDATE SET
+    employee_name = excluded.employee_name,
+    first_check_in = excluded.first_check_in,
+    last_check_out = excluded.last_check_out,
+    punch_count = excluded.punch_count,
+    devices = excluded.devices,
+    worked_seconds = excluded.worked_seconds,
+    updated_at = excluded.updated_at;
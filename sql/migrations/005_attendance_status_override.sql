@@ -0,0 +1,61 @@
+-- Attendance status is derived from the device type when read (see
+-- resolved_status in attendance_repository.py) instead of being copied onto
+-- every punch. The stored column only ever held that copy, so it is dropped;
+-- punches whose copy was stale (device retyped without a rewrite) now report
+-- their device's current type. status_override keeps per-punch corrections.
+
+ALTER TABLE attendance_records ADD COLUMN IF NOT EXISTS status_override VARCHAR;
+ALTER TABLE attendance_records DROP COLUMN IF EXISTS attendance_status;
+
+-- Summaries were built from the stored copies; rebuild them from the
+-- resolved status, same reduction as daily_summary_refresh
+INSERT INTO daily_attendance_summary (
+    employee_id, att_date, employee_name, first_check_in, last_check_out,
+    punch_count, devices, worked_seconds, updated_at
+)
+SELECT
+    employee_id,
+    att_date,
+    employee_name,
+    first_check_in,
+    last_check_out,
+    punch_count,
+    devices,
+    GREATEST(EXTRACT(EPOCH FROM last_check_out - first_check_in), 0)::integer,
+    LOCALTIMESTAMP
+FROM (
+    SELECT
+        employee_id,
+        att_date,
+        max(employee_name) AS employee_name,
+        coalesce(min(check_time) FILTER (WHERE status = 'Check In'), min(check_time)) AS first_check_in,
+        coalesce(max(check_time) FILTER (WHERE status = 'Check Out'), max(check_time)) AS last_check_out,
+        count(*) AS punch_count,
+        array_agg(DISTINCT machine_serial ORDER BY machine_serial) AS devices
+    FROM (
+        SELECT
+            r.employee_id,
+            r.att_date::date AS att_date,
+            r.employee_name,
+            r.check_time,
+            r.machine_serial,
+            coalesce(
+                r.status_override,
+                CASE d.device_type
+                    WHEN 'CHECK_IN' THEN 'Check In'
+                    WHEN 'CHECK_OUT' THEN 'Check Out'
+                END
+            ) AS status
+        FROM attendance_records r
+        LEFT JOIN attendance_devices d ON d.uuid = r.device_uuid
+    ) AS punches
+    GROUP BY employee_id, att_date
+) AS daily
+ON CONFLICT (employee_id, att_date) DO UPDATE SET
+    employee_name = excluded.employee_name,
+    first_check_in = excluded.first_check_in,
+    last_check_out = excluded.last_check_out,
+    punch_count = excluded.punch_count,
+    devices = excluded.devices,
+    worked_seconds = excluded.worked_seconds,
+    updated_at = excluded.updated_at;
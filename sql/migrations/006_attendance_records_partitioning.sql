@@ -0,0 +1,88 @@
+-- Convert attendance_records to monthly range partitions on check_time on
+-- existing databases. New databases get the partitioned table from
+-- Base.metadata.create_all and their partitions from the app at startup.
+-- A partitioned table's keys must contain check_time, so the primary key
+-- becomes (uuid, check_time).
+--
+-- The rows are copied, so this takes a full table lock for the duration:
+-- stop the app (or at least the scheduler) first.
+
+BEGIN;
+
+ALTER TABLE attendance_records RENAME TO attendance_records_unpartitioned;
+ALTER TABLE attendance_records_unpartitioned
+    RENAME CONSTRAINT attendance_records_pkey TO attendance_records_unpartitioned_pkey;
+ALTER TABLE attendance_records_unpartitioned
+    RENAME CONSTRAINT uq_attendance_records_punch TO uq_attendance_records_unpartitioned_punch;
+ALTER TABLE attendance_records_unpartitioned
+    RENAME CONSTRAINT attendance_records_device_uuid_fkey TO attendance_records_unpartitioned_device_uuid_fkey;
+ALTER INDEX IF EXISTS ix_attendance_records_check_time_uuid
+    RENAME TO ix_attendance_records_unpartitioned_check_time_uuid;
+ALTER INDEX IF EXISTS ix_attendance_records_machine_serial_check_time
+    RENAME TO ix_attendance_records_unpartitioned_machine_serial_check_time;
+ALTER INDEX IF EXISTS ix_attendance_records_check_time_brin
+    RENAME TO ix_attendance_records_unpartitioned_check_time_brin;
+
+CREATE TABLE attendance_records (
+    uuid UUID NOT NULL,
+    device_uuid UUID,
+    att_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    check_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    employee_id VARCHAR NOT NULL,
+    employee_name VARCHAR NOT NULL,
+    machine_alias VARCHAR NOT NULL,
+    machine_serial VARCHAR NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    sync_status VARCHAR NOT NULL,
+    status_override VARCHAR,
+    PRIMARY KEY (uuid, check_time),
+    CONSTRAINT uq_attendance_records_punch UNIQUE (employee_id, check_time, machine_serial),
+    FOREIGN KEY (device_uuid) REFERENCES attendance_devices (uuid)
+) PARTITION BY RANGE (check_time);
+
+CREATE INDEX ix_attendance_records_check_time_uuid
+    ON attendance_records (check_time, uuid);
+CREATE INDEX ix_attendance_records_machine_serial_check_time
+    ON attendance_records (machine_serial, check_time);
+CREATE INDEX ix_attendance_records_check_time_brin
+    ON attendance_records USING brin (check_time);
+
+-- One partition per month from the oldest punch to three months ahead,
+-- named like services/partitions.py names them
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(min(check_time), LOCALTIMESTAMP)),
+            date_trunc('month', greatest(coalesce(max(check_time), LOCALTIMESTAMP), LOCALTIMESTAMP))
+                + interval '3 months',
+            interval '1 month'
+        )::date
+        FROM attendance_records_unpartitioned
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF attendance_records FOR VALUES FROM (%L) TO (%L)',
+            'attendance_records_p' || to_char(month, 'YYYY_MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+    END LOOP;
+END
+$$;
+
+INSERT INTO attendance_records (
+    uuid, device_uuid, att_date, check_time, employee_id, employee_name,
+    machine_alias, machine_serial, created_at, sync_status, status_override
+)
+SELECT
+    uuid, device_uuid, att_date, check_time, employee_id, employee_name,
+    machine_alias, machine_serial, created_at, sync_status, status_override
+FROM attendance_records_unpartitioned;
+
+DROP TABLE attendance_records_unpartitioned;
+
+COMMIT;
+
+ANALYZE attendance_records;
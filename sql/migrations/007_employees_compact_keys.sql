@@ -0,0 +1,147 @@
+-- Move employee and device names out of attendance_records on existing
+-- databases. Employees get their own table (synced from
+-- API_EmployeeListByDevices), devices a compact device_key, and each punch
+-- references both by key instead of carrying employee_id, employee_name,
+-- machine_alias, machine_serial and device_uuid. Names are joined in when
+-- read. New databases get all of this from Base.metadata.create_all.
+--
+-- The rows are copied like 006 copied them, so this takes a full table lock
+-- for the duration: stop the app (or at least the scheduler) first. If the
+-- new app already started against this database, its create_all has made an
+-- empty employees table (and the employee sync may have filled it); both
+-- are kept.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS employees (
+    id SERIAL NOT NULL,
+    employee_id VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    card VARCHAR,
+    department VARCHAR,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (employee_id)
+);
+
+-- Latest name each employee punched under; the next employee sync fills
+-- in cards and departments
+INSERT INTO employees (employee_id, name, updated_at)
+SELECT DISTINCT ON (employee_id) employee_id, employee_name, LOCALTIMESTAMP
+FROM attendance_records
+ORDER BY employee_id, check_time DESC
+ON CONFLICT (employee_id) DO NOTHING;
+
+ALTER TABLE attendance_devices
+    ADD COLUMN device_key SMALLINT GENERATED BY DEFAULT AS IDENTITY;
+ALTER TABLE attendance_devices
+    ADD CONSTRAINT attendance_devices_device_key_key UNIQUE (device_key);
+
+-- Punches of devices the device sync never registered keep their serial
+-- and alias through an inactive device of their own
+INSERT INTO attendance_devices (uuid, device_id, serial_number, name, is_active, last_sync, sync_status)
+SELECT DISTINCT ON (r.machine_serial)
+    gen_random_uuid(), 'unregistered:' || r.machine_serial, r.machine_serial, r.machine_alias,
+    false, LOCALTIMESTAMP, 'INACTIVE'
+FROM attendance_records r
+WHERE NOT EXISTS (
+    SELECT 1 FROM attendance_devices d WHERE d.serial_number = r.machine_serial
+)
+ORDER BY r.machine_serial, r.check_time DESC;
+
+ALTER TABLE attendance_records RENAME TO attendance_records_wide;
+ALTER TABLE attendance_records_wide
+    RENAME CONSTRAINT attendance_records_pkey TO attendance_records_wide_pkey;
+ALTER TABLE attendance_records_wide
+    RENAME CONSTRAINT uq_attendance_records_punch TO uq_attendance_records_wide_punch;
+ALTER INDEX IF EXISTS ix_attendance_records_check_time_uuid
+    RENAME TO ix_attendance_records_wide_check_time_uuid;
+ALTER INDEX IF EXISTS ix_attendance_records_machine_serial_check_time
+    RENAME TO ix_attendance_records_wide_machine_serial_check_time;
+ALTER INDEX IF EXISTS ix_attendance_records_check_time_brin
+    RENAME TO ix_attendance_records_wide_check_time_brin;
+
+-- The old partitions keep their names; move them aside so the new ones
+-- can be named like services/partitions.py names them
+DO $$
+DECLARE
+    partition_name text;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'attendance_records_wide'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', partition_name, partition_name || '_wide');
+    END LOOP;
+END
+$$;
+
+CREATE TABLE attendance_records (
+    uuid UUID NOT NULL,
+    employee_key INTEGER NOT NULL,
+    device_key SMALLINT NOT NULL,
+    att_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    check_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    sync_status VARCHAR NOT NULL,
+    status_override VARCHAR,
+    PRIMARY KEY (uuid, check_time),
+    CONSTRAINT uq_attendance_records_punch UNIQUE (employee_key, check_time, device_key),
+    FOREIGN KEY (employee_key) REFERENCES employees (id),
+    FOREIGN KEY (device_key) REFERENCES attendance_devices (device_key)
+) PARTITION BY RANGE (check_time);
+
+CREATE INDEX ix_attendance_records_check_time_uuid
+    ON attendance_records (check_time, uuid);
+CREATE INDEX ix_attendance_records_device_key_check_time
+    ON attendance_records (device_key, check_time);
+CREATE INDEX ix_attendance_records_check_time_brin
+    ON attendance_records USING brin (check_time);
+
+-- Same months as before, oldest punch to three months ahead
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(min(check_time), LOCALTIMESTAMP)),
+            date_trunc('month', greatest(coalesce(max(check_time), LOCALTIMESTAMP), LOCALTIMESTAMP))
+                + interval '3 months',
+            interval '1 month'
+        )::date
+        FROM attendance_records_wide
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF attendance_records FOR VALUES FROM (%L) TO (%L)',
+            'attendance_records_p' || to_char(month, 'YYYY_MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+    END LOOP;
+END
+$$;
+
+INSERT INTO attendance_records (
+    uuid, employee_key, device_key, att_date, check_time,
+    created_at, sync_status, status_override
+)
+SELECT
+    r.uuid, e.id, d.device_key, r.att_date, r.check_time,
+    r.created_at, r.sync_status, r.status_override
+FROM attendance_records_wide r
+JOIN employees e ON e.employee_id = r.employee_id
+JOIN attendance_devices d ON d.serial_number = r.machine_serial;
+
+DROP TABLE attendance_records_wide;
+
+-- Summaries show the name from employees as well
+ALTER TABLE daily_attendance_summary DROP COLUMN employee_name;
+
+COMMIT;
+
+ANALYZE employees;
+ANALYZE attendance_devices;
+ANALYZE attendance_records;
@@ -0,0 +1,5 @@
+-- GET /devices answers from attendance_devices in the API_DeviceList shape,
+-- which includes Platform. New databases get the column from
+-- Base.metadata.create_all; the next device sync fills it in.
+
+ALTER TABLE attendance_devices ADD COLUMN IF NOT EXISTS platform VARCHAR;
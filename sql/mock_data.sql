@@ -1,44 +1,6 @@
 -- Clear existing data if needed
 TRUNCATE TABLE attendance_records CASCADE;
 
--- Insert mock attendance records
-INSERT INTO attendance_records (
-    uuid,
-    employee_id,
-    employee_name,
-    machine_alias,
-    machine_serial,
-    att_date,
-    check_time,
-    attendance_status,
-    sync_status,
-    created_at
-) VALUES
-    ('11111111-1111-1111-1111-111111111101', '00210', 'Employee 210', 'MC4732', 'AYSB28014732', '2024-12-02', '2024-12-02 07:52:34', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111102', '00210', 'Employee 210', 'MC4698', 'AYSB28014698', '2024-12-02', '2024-12-02 07:06:57', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111103', '00210', 'Employee 210', 'MC4732', 'AYSB28014732', '2024-12-03', '2024-12-03 07:47:28', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111104', '00210', 'Employee 210', 'MC4698', 'AYSB28014698', '2024-12-03', '2024-12-03 07:18:20', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111105', '00210', 'Employee 210', 'MC4732', 'AYSB28014732', '2024-12-04', '2024-12-04 07:50:02', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111106', '00210', 'Employee 210', 'MC4698', 'AYSB28014698', '2024-12-04', '2024-12-04 07:15:40', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111107', '00210', 'Employee 210', 'MC4732', 'AYSB28014732', '2024-12-05', '2024-12-05 08:23:23', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111108', '00210', 'Employee 210', 'MC4698', 'AYSB28014698', '2024-12-05', '2024-12-05 07:01:03', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111109', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-02', '2024-12-02 07:52:28', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111110', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-02', '2024-12-02 07:28:58', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111111', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-03', '2024-12-03 08:24:32', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111112', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-03', '2024-12-03 07:00:11', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111113', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-04', '2024-12-04 08:11:44', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111114', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-04', '2024-12-04 07:08:22', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111115', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-05', '2024-12-05 07:55:31', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111116', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-05', '2024-12-05 07:04:28', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111117', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-06', '2024-12-06 07:52:28', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111118', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-06', '2024-12-06 07:28:58', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111119', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-09', '2024-12-09 08:24:32', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111120', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-09', '2024-12-09 07:00:11', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111121', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-10', '2024-12-10 08:11:44', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111122', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-10', '2024-12-10 07:08:22', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111123', '00211', 'Employee 211', 'MC4732', 'AYSB28014732', '2024-12-11', '2024-12-11 07:55:31', 'None', 'synced', NOW()),
-    ('11111111-1111-1111-1111-111111111124', '00211', 'Employee 211', 'MC4698', 'AYSB28014698', '2024-12-11', '2024-12-11 07:04:28', 'None', 'synced', NOW());
-
 -- Insert mock devices with their types
 INSERT INTO attendance_devices (
     uuid,
@@ -50,8 +12,66 @@ INSERT INTO attendance_devices (
     is_active,
     last_sync
 ) VALUES
-    ('22222222-2222-2222-2222-222222222201', 'DEV4732', 'AYSB28014732', 'Device 4732', 'CHECK_IN', 'ACTIVE', true, NOW()),
-    ('22222222-2222-2222-2222-222222222202', 'DEV4698', 'AYSB28014698', 'Device 4698', 'CHECK_OUT', 'ACTIVE', true, NOW())
+    ('22222222-2222-2222-2222-222222222201', 'DEV4732', 'AYSB28014732', 'MC4732', 'CHECK_IN', 'ACTIVE', true, NOW()),
+    ('22222222-2222-2222-2222-222222222202', 'DEV4698', 'AYSB28014698', 'MC4698', 'CHECK_OUT', 'ACTIVE', true, NOW())
 ON CONFLICT (serial_number) DO UPDATE 
 SET device_type = EXCLUDED.device_type,
     last_sync = NOW();
+
+-- Insert mock employees
+INSERT INTO employees (
+    employee_id,
+    name,
+    updated_at
+) VALUES
+    ('00210', 'Employee 210', NOW()),
+    ('00211', 'Employee 211', NOW())
+ON CONFLICT (employee_id) DO UPDATE
+SET name = EXCLUDED.name,
+    updated_at = NOW();
+
+-- The records below fall in December 2024, older than the partitions the
+-- app creates; named like services/partitions.py names them
+CREATE TABLE IF NOT EXISTS attendance_records_p2024_12
+    PARTITION OF attendance_records
+    FOR VALUES FROM ('2024-12-01') TO ('2025-01-01');
+
+-- Insert mock attendance records, referencing employees and devices by key
+INSERT INTO attendance_records (
+    uuid,
+    employee_key,
+    device_key,
+    att_date,
+    check_time,
+    sync_status,
+    created_at
+)
+SELECT p.uuid::uuid, e.id, d.device_key, p.att_date::timestamp, p.check_time::timestamp, 'synced', NOW()
+FROM (VALUES
+    ('11111111-1111-1111-1111-111111111101', '00210', 'AYSB28014732', '2024-12-02', '2024-12-02 07:52:34'),
+    ('11111111-1111-1111-1111-111111111102', '00210', 'AYSB28014698', '2024-12-02', '2024-12-02 07:06:57'),
+    ('11111111-1111-1111-1111-111111111103', '00210', 'AYSB28014732', '2024-12-03', '2024-12-03 07:47:28'),
+    ('11111111-1111-1111-1111-111111111104', '00210', 'AYSB28014698', '2024-12-03', '2024-12-03 07:18:20'),
+    ('11111111-1111-1111-1111-111111111105', '00210', 'AYSB28014732', '2024-12-04', '2024-12-04 07:50:02'),
+    ('11111111-1111-1111-1111-111111111106', '00210', 'AYSB28014698', '2024-12-04', '2024-12-04 07:15:40'),
+    ('11111111-1111-1111-1111-111111111107', '00210', 'AYSB28014732', '2024-12-05', '2024-12-05 08:23:23'),
+    ('11111111-1111-1111-1111-111111111108', '00210', 'AYSB28014698', '2024-12-05', '2024-12-05 07:01:03'),
+    ('11111111-1111-1111-1111-111111111109', '00211', 'AYSB28014732', '2024-12-02', '2024-12-02 07:52:28'),
+    ('11111111-1111-1111-1111-111111111110', '00211', 'AYSB28014698', '2024-12-02', '2024-12-02 07:28:58'),
+    ('11111111-1111-1111-1111-111111111111', '00211', 'AYSB28014732', '2024-12-03', '2024-12-03 08:24:32'),
+    ('11111111-1111-1111-1111-111111111112', '00211', 'AYSB28014698', '2024-12-03', '2024-12-03 07:00:11'),
+    ('11111111-1111-1111-1111-111111111113', '00211', 'AYSB28014732', '2024-12-04', '2024-12-04 08:11:44'),
+    ('11111111-1111-1111-1111-111111111114', '00211', 'AYSB28014698', '2024-12-04', '2024-12-04 07:08:22'),
+    ('11111111-1111-1111-1111-111111111115', '00211', 'AYSB28014732', '2024-12-05', '2024-12-05 07:55:31'),
+    ('11111111-1111-1111-1111-111111111116', '00211', 'AYSB28014698', '2024-12-05', '2024-12-05 07:04:28'),
+    ('11111111-1111-1111-1111-111111111117', '00211', 'AYSB28014732', '2024-12-06', '2024-12-06 07:52:28'),
+    ('11111111-1111-1111-1111-111111111118', '00211', 'AYSB28014698', '2024-12-06', '2024-12-06 07:28:58'),
+    ('11111111-1111-1111-1111-111111111119', '00211', 'AYSB28014732', '2024-12-09', '2024-12-09 08:24:32'),
+    ('11111111-1111-1111-1111-111111111120', '00211', 'AYSB28014698', '2024-12-09', '2024-12-09 07:00:11'),
+    ('11111111-1111-1111-1111-111111111121', '00211', 'AYSB28014732', '2024-12-10', '2024-12-10 08:11:44'),
+    ('11111111-1111-1111-1111-111111111122', '00211', 'AYSB28014698', '2024-12-10', '2024-12-10 07:08:22'),
+    ('11111111-1111-1111-1111-111111111123', '00211', 'AYSB28014732', '2024-12-11', '2024-12-11 07:55:31'),
+    ('11111111-1111-1111-1111-111111111124', '00211', 'AYSB28014698', '2024-12-11', '2024-12-11 07:04:28')
+) AS p (uuid, employee_id, serial_number, att_date, check_time)
+JOIN employees e ON e.employee_id = p.employee_id
+JOIN attendance_devices d ON d.serial_number = p.serial_number;
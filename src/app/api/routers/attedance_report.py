@@ -1,24 +1,69 @@
+import csv
+import io
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query
-from datetime import datetime, timedelta
-from typing import Optional
+import uuid
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.exc import DetachedInstanceError
-from sqlalchemy.orm import Session
-from src.app.models.entities.orm import AttendanceRecord, DeviceType, AttendanceDevice
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.models.entities.orm import AttendanceRecord, AttendanceDevice
 from src.app.models.entities.schemas import (
     AttendanceSyncResponse,
+    SyncWindowResponse,
     AttendanceRecordResponse,
     AttendanceListResponse,
-    DeviceResponse,
+    AttendanceStatusOverride,
     EmployeeResponse,
     AttendanceDeviceInDB,
+    DeviceResponse,
+    DeviceSyncResponse,
     DeviceTypeUpdate,
-    
+    EmployeeSyncResponse,
+    SyncJobRequest,
+    SyncJobProgress,
+    SyncJobResponse,
+    DailyAttendanceListResponse,
+    EmployeeTimesheet,
+    TimesheetResponse,
 )
 from src.app.models.entities.orm import AttendanceDevice, DeviceSyncStatus
 from src.app.services.attendance_service import AttendanceService
-from src.app.dependencies.dependencies import get_postgres_manager, get_attendance_service
+from src.app.services.sync_jobs import SyncJob, SyncJobManager
+from src.app.core.config import settings
+from src.app.core.etag import compute_etag, etag_matches
+from src.app.core.responses import FastJSONResponse
+from src.app.core.pagination import (
+    decode_cursor,
+    decode_daily_cursor,
+    encode_cursor,
+    encode_daily_cursor,
+)
+from src.app.constants.enum import DataGenerationName, ExportFormat, SyncMode
+from src.app.repositories.attendance_repository import (
+    ATTENDANCE_RECORD_COLUMNS,
+    attendance_count_query,
+    attendance_export_query,
+    attendance_record_select,
+    attendance_records_query,
+    daily_summary_query,
+    daily_summary_refresh,
+    device_daily_keys_query,
+    monthly_timesheet_query,
+    generation_bump,
+    generation_query,
+    status_override_update,
+)
+from src.app.dependencies.dependencies import (
+    get_async_postgres_manager,
+    get_attendance_service,
+    get_sync_job_manager,
+)
+from src.app.dependencies.db_dependencies import get_async_session
 import httpx
 from typing import List
 
@@ -29,157 +74,249 @@ logger = logging.getLogger(__name__)
 
 @router.get("/attendance/sync", response_model=AttendanceSyncResponse)
 async def sync_attendance_data(
-    from_date: datetime = Query(default_factory=lambda: datetime.now() - timedelta(days=7)),
+    from_date: Optional[datetime] = Query(default=None, description="Start of the window (full mode, or incremental mode before the first sync)"),
     to_date: datetime = Query(default_factory=lambda: datetime.now()),
     employee_id: Optional[str] = None,
-    session: Session = Depends(get_postgres_manager),
+    mode: SyncMode = Query(default=SyncMode.incremental),
+    session: AsyncSession = Depends(get_async_postgres_manager),
     attendance_service: AttendanceService = Depends(get_attendance_service)
 ):
     """
-    Sync attendance data from external API and store in database
+    Sync attendance data from external API and store in database.
+
+    Incremental mode only fetches from the stored watermark (minus an overlap
+    for late punches); full mode refetches the whole from_date..to_date window.
     """
     try:
-        # Validate date range
-        if from_date > to_date:
-            raise ValueError("From date must be before or equal to to date")
-
-        # Fetch data from external API
-        api_records = await attendance_service.fetch_attendance_data(
+        result = await attendance_service.sync_attendance(
+            session=session,
             from_date=from_date,
             to_date=to_date,
-            employee_id=employee_id
+            employee_id=employee_id,
+            mode=mode,
         )
-        
-        if not api_records:
-            return AttendanceSyncResponse(
-                status="success",
-                message="No new records to sync",
-                records_count=0
-            )
 
-        # Parse API response into AttendanceRecord objects
-        try:
-            orm_records = attendance_service.parse_attendance_records(
-                api_records=api_records,
-                session=session
+        if result.unknown_serials:
+            logger.warning(
+                f"Skipped records from unregistered devices: {result.unknown_serials}"
             )
-        except Exception as e:
-            logger.error(f"Error parsing attendance records: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="An unexpected error occurred while parsing attendance records"
+
+        if not result.fetched:
+            message = "No new records to sync"
+        else:
+            message = f"Successfully synced {result.inserted} new records"
+        if result.unknown_serials:
+            message += (
+                f", skipped {sum(result.unknown_serials.values())} records from "
+                f"{len(result.unknown_serials)} unregistered devices"
             )
-        
-        # Track new records count
-        new_records_count = 0
-        
-        # Store in database using bulk operations
-        existing_records = {
-            (record.employee_id, record.check_time, record.machine_serial)
-            for record in session.query(AttendanceRecord).filter(
-                AttendanceRecord.check_time.between(from_date, to_date)
+        if result.failed_windows:
+            message += (
+                f", {len(result.failed_windows)} of {result.windows} windows failed"
             )
-        }
-        
-        records_to_add = []
-        for record in orm_records:
-            record_key = (record.employee_id, record.check_time, record.machine_serial)
-            if record_key not in existing_records:
-                records_to_add.append(record)
-                new_records_count += 1
-
-        if records_to_add:
-            session.bulk_save_objects(records_to_add)
-            session.commit()
-        
+
         return AttendanceSyncResponse(
-            status="success",
-            message=f"Successfully synced {new_records_count} new records",
-            records_count=new_records_count
+            status="partial" if result.failed_windows else "success",
+            message=message,
+            records_count=result.inserted,
+            unknown_serials=result.unknown_serials,
+            mode=result.mode.value,
+            from_date=result.from_date,
+            to_date=result.to_date,
+            windows=result.windows,
+            failed_windows=[
+                SyncWindowResponse(from_date=start, to_date=end)
+                for start, end in result.failed_windows
+            ],
+            watermark=result.watermark,
         )
         
     except ValueError as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Validation Error in sync_attendance_data: {e}")
         raise HTTPException(
             status_code=400,
             detail=str(e)
         )
     except httpx.HTTPError as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"HTTP Error in sync_attendance_data: {e}")
         raise HTTPException(
             status_code=502,
             detail=f"Error communicating with attendance API: {str(e)}"
         )
     except SQLAlchemyError as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Database Error in sync_attendance_data: {e}")
         raise HTTPException(
             status_code=500,
             detail="Database error occurred while syncing attendance records"
         )
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Unexpected error in sync_attendance_data: {e}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while syncing attendance records"
         )
     finally:
-        session.close()
+        await session.close()
+
+def _sync_job_response(job: SyncJob, merged: bool = False) -> SyncJobResponse:
+    from_date, to_date, employee_id, mode = job.key
+    result = job.result
+    elapsed = None
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or datetime.now()) - job.started_at).total_seconds()
+    return SyncJobResponse(
+        job_id=job.id,
+        status=job.status,
+        merged=merged,
+        mode=mode,
+        # Resolved window once running, requested window before
+        from_date=result.from_date or from_date,
+        to_date=result.to_date or to_date,
+        employee_id=employee_id,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        elapsed_seconds=elapsed,
+        error=job.error,
+        progress=SyncJobProgress(
+            windows=result.windows,
+            windows_fetched=result.windows_fetched,
+            failed_windows=[
+                SyncWindowResponse(from_date=start, to_date=end)
+                for start, end in result.failed_windows
+            ],
+            fetched=result.fetched,
+            parsed=result.parsed,
+            inserted=result.inserted,
+            skipped=result.skipped,
+            unknown_serials=result.unknown_serials,
+            phase_seconds={
+                phase: round(seconds, 3) for phase, seconds in result.phase_seconds.items()
+            },
+        ),
+        watermark=result.watermark,
+    )
 
-@router.get("/attendance", response_model=AttendanceListResponse)
+@router.post("/attendance/sync/jobs", response_model=SyncJobResponse, status_code=202)
+async def create_sync_job(
+    request: SyncJobRequest,
+    sync_jobs: SyncJobManager = Depends(get_sync_job_manager)
+):
+    """
+    Start an attendance sync in the background and return its job ID right
+    away. An identical request made while a job is still running returns
+    that job (merged=true) instead of starting another upstream fetch.
+    """
+    if request.from_date and request.to_date and request.from_date > request.to_date:
+        raise HTTPException(
+            status_code=400,
+            detail="From date must be before or equal to to date"
+        )
+    job, merged = sync_jobs.submit(
+        from_date=request.from_date,
+        to_date=request.to_date,
+        employee_id=request.employee_id,
+        mode=request.mode,
+    )
+    return _sync_job_response(job, merged=merged)
+
+@router.get("/attendance/sync/jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(
+    job_id: str,
+    sync_jobs: SyncJobManager = Depends(get_sync_job_manager)
+):
+    """
+    Status and progress of a background sync job
+    """
+    job = sync_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Sync job {job_id} not found"
+        )
+    return _sync_job_response(job)
+
+async def _not_modified(
+    session: AsyncSession,
+    request: Request,
+    response: Response,
+    name: DataGenerationName,
+    *scope: str,
+) -> Optional[Response]:
+    """
+    Tag a read with an ETag from its data set's generation. Returns a 304
+    response when the client already holds that version, before any of the
+    read's own queries run.
+    """
+    # Read the generation before the data: a write committed in between can
+    # only make the body newer than its tag, which costs one extra refetch
+    generation = await session.scalar(generation_query(name)) or 0
+    etag = compute_etag(generation, request, *scope)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+@router.get("/attendance", response_model=AttendanceListResponse, response_class=FastJSONResponse)
 async def get_attendance_records(
+    request: Request,
+    response: Response,
     from_date: datetime = Query(default_factory=lambda: datetime.now() - timedelta(days=7)),
     to_date: datetime = Query(default_factory=lambda: datetime.now()),
     employee_id: Optional[str] = None,
-    session: Session = Depends(get_postgres_manager),
+    limit: int = Query(default=settings.ATTENDANCE_PAGE_SIZE, ge=1, le=settings.ATTENDANCE_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=False, description="Also count all matching records"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
 ):
     """
-    Get attendance records from local database with pagination and filtering
+    Get attendance records from local database with keyset pagination and filtering
+
+    Supports conditional requests: If-None-Match with the ETag of a previous
+    response returns 304 until new records are synced. A window defaulted to
+    "now" moves with the clock, so its ETag also changes every minute.
     """
     try:
         if from_date > to_date:
             raise ValueError("From date must be before or equal to to date")
 
-        query = session.query(AttendanceRecord)
-        
-        if employee_id:
-            query = query.filter(AttendanceRecord.employee_id == employee_id)
-        
-        query = query.filter(
-            AttendanceRecord.check_time >= from_date,
-            AttendanceRecord.check_time <= to_date
-        ).order_by(AttendanceRecord.check_time.desc())
-        
-        total = query.count()
-        orm_records = query.all()
-        
-        if not orm_records:
-            return AttendanceListResponse(
-                records=[],
-                total=0
-            )
+        clock_scope = []
+        if "from_date" not in request.query_params or "to_date" not in request.query_params:
+            clock_scope.append(datetime.now().strftime("%Y-%m-%dT%H:%M"))
+        not_modified = await _not_modified(
+            session, request, response, DataGenerationName.attendance, *clock_scope
+        )
+        if not_modified is not None:
+            return not_modified
 
-        pydantic_records = [
-            AttendanceRecordResponse(
-                uuid=str(record.uuid),
-                employee_id=str(record.employee_id),
-                employee_name=str(record.employee_name),
-                machine_alias=str(record.machine_alias),
-                machine_serial=str(record.machine_serial),
-                att_date=record.att_date,  #type: ignore
-                check_time=record.check_time, #type: ignore
-                created_at=record.created_at, #type: ignore
-                attendance_status=str(record.attendance_status),
-                sync_status=str(record.sync_status)
-            ) for record in orm_records
-        ]
+        after = decode_cursor(cursor) if cursor else None
+        query = attendance_records_query(from_date, to_date, employee_id, after=after)
+
+        # Fetch one extra row to know whether another page follows
+        rows = (await session.execute(query.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        total = None
+        if include_total:
+            total = await session.scalar(
+                attendance_count_query(from_date, to_date, employee_id)
+            )
         
-        return AttendanceListResponse(
-            records=pydantic_records,
-            total=total
+        # Rows are serialized as they come from the driver, in the shape of
+        # AttendanceListResponse, without building an entity and a model per record
+        return FastJSONResponse(
+            {
+                "total": total,
+                "records": [row._asdict() for row in rows],
+                "next_cursor": encode_cursor(rows[-1].check_time, rows[-1].uuid) if has_more else None,
+            },
+            headers=response.headers,
         )
 
     except ValueError as e:
@@ -201,79 +338,389 @@ async def get_attendance_records(
             detail="An unexpected error occurred while fetching attendance records"
         )
     finally:
-        session.close()
+        await session.close()
 
 
+@router.patch("/attendance/{record_uuid}/status", response_model=AttendanceRecordResponse, response_class=FastJSONResponse)
+async def override_attendance_status(
+    record_uuid: uuid.UUID,
+    override: AttendanceStatusOverride,
+    session: AsyncSession = Depends(get_async_postgres_manager),
+):
+    """
+    Correct the status of a single punch. A null status_override removes the
+    correction, so the status follows the device type again.
+    """
+    try:
+        status_override = override.status_override.value if override.status_override else None
+        key = (
+            await session.execute(status_override_update(record_uuid, status_override))
+        ).first()
+        if key is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Attendance record {record_uuid} not found"
+            )
+        await session.execute(daily_summary_refresh([tuple(key)]))
+        await session.execute(generation_bump(DataGenerationName.attendance))
+        await session.commit()
+
+        row = (
+            await session.execute(
+                attendance_record_select().where(AttendanceRecord.uuid == record_uuid)
+            )
+        ).one()
+        return FastJSONResponse(row._asdict())
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"Database error in override_attendance_status: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Database error occurred while updating attendance status"
+        )
+    finally:
+        await session.close()
+
+@router.get("/attendance/daily", response_model=DailyAttendanceListResponse, response_class=FastJSONResponse)
+async def get_daily_attendance(
+    from_date: date = Query(default_factory=lambda: date.today() - timedelta(days=7)),
+    to_date: date = Query(default_factory=lambda: date.today()),
+    employee_id: Optional[str] = None,
+    limit: int = Query(default=settings.ATTENDANCE_PAGE_SIZE, ge=1, le=settings.ATTENDANCE_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
+):
+    """
+    Get first check-in, last check-out, punch count, devices and worked time
+    per employee per day from the precomputed daily summary
+    """
+    try:
+        if from_date > to_date:
+            raise ValueError("From date must be before or equal to to date")
+
+        after = decode_daily_cursor(cursor) if cursor else None
+        query = daily_summary_query(from_date, to_date, employee_id, after=after)
+
+        # Fetch one extra row to know whether another page follows
+        rows = (await session.execute(query.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Serialized directly in the shape of DailyAttendanceListResponse
+        return FastJSONResponse({
+            "records": [row._asdict() for row in rows],
+            "next_cursor": encode_daily_cursor(rows[-1].att_date, rows[-1].employee_id) if has_more else None,
+        })
+
+    except ValueError as e:
+        logger.error(f"Validation Error in get_daily_attendance: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Database Error in get_daily_attendance: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Database error occurred while fetching daily attendance"
+        )
+    finally:
+        await session.close()
+
+
+@router.get("/attendance/timesheet", response_model=TimesheetResponse)
+async def get_monthly_timesheet(
+    month: str = Query(default_factory=lambda: date.today().strftime("%Y-%m"), description="YYYY-MM"),
+    employee_id: Optional[str] = None,
+    shift_start: Optional[time] = Query(default=None, description="Defaults to SHIFT_START"),
+    late_grace_minutes: Optional[int] = Query(default=None, ge=0, description="Defaults to LATE_GRACE_MINUTES"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
+):
+    """
+    Monthly hours, late arrivals and missing check-outs per employee,
+    computed in the database from Check In/Check Out punches
+    """
+    try:
+        month_start = datetime.strptime(month, "%Y-%m").date()
+        if shift_start is None:
+            shift_start = time.fromisoformat(settings.SHIFT_START)
+        if late_grace_minutes is None:
+            late_grace_minutes = settings.LATE_GRACE_MINUTES
+
+        rows = await session.execute(
+            monthly_timesheet_query(
+                month_start,
+                shift_start,
+                timedelta(minutes=late_grace_minutes),
+                employee_id,
+            )
+        )
+
+        return TimesheetResponse(
+            month=month_start.strftime("%Y-%m"),
+            shift_start=shift_start,
+            late_grace_minutes=late_grace_minutes,
+            employees=[
+                EmployeeTimesheet(
+                    **row._mapping,
+                    worked_hours=round(row.worked_seconds / 3600, 2),
+                )
+                for row in rows
+            ],
+        )
+
+    except ValueError as e:
+        logger.error(f"Validation Error in get_monthly_timesheet: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Database Error in get_monthly_timesheet: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Database error occurred while computing the timesheet"
+        )
+    finally:
+        await session.close()
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return None if value is None else str(value)
+
+
+async def _stream_attendance_export(
+    from_date: datetime,
+    to_date: datetime,
+    employee_id: Optional[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[str]:
+    """
+    Stream matching records through a server-side cursor, one chunk per
+    fetched batch, so memory stays flat whatever the export size
+    """
+    columns = [column.key for column in ATTENDANCE_RECORD_COLUMNS]
+    if export_format == ExportFormat.csv:
+        header = io.StringIO()
+        csv.writer(header).writerow(columns)
+        yield header.getvalue()
+
+    # The request-scoped session is closed before the body is sent, so the
+    # stream checks out its own connection for its whole lifetime
+    async with get_async_session() as session:
+        try:
+            result = await session.stream(
+                attendance_export_query(from_date, to_date, employee_id)
+                .execution_options(yield_per=settings.ATTENDANCE_EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                chunk = io.StringIO()
+                if export_format == ExportFormat.csv:
+                    writer = csv.writer(chunk)
+                    for row in rows:
+                        writer.writerow(_export_value(value) for value in row)
+                else:
+                    for row in rows:
+                        chunk.write(json.dumps(dict(zip(columns, map(_export_value, row)))))
+                        chunk.write("\n")
+                yield chunk.getvalue()
+        except SQLAlchemyError as e:
+            # Headers are already sent; all we can do is cut the stream short
+            logger.error(f"Database Error in export_attendance_records: {e}")
+            raise
+
+
+@router.get("/attendance/export")
+async def export_attendance_records(
+    from_date: datetime = Query(default_factory=lambda: datetime.now() - timedelta(days=7)),
+    to_date: datetime = Query(default_factory=lambda: datetime.now()),
+    employee_id: Optional[str] = None,
+    format: ExportFormat = Query(default=ExportFormat.csv),
+):
+    """
+    Stream attendance records as CSV or NDJSON, oldest first
+    """
+    if from_date > to_date:
+        raise HTTPException(
+            status_code=400,
+            detail="From date must be before or equal to to date"
+        )
+
+    filename = f"attendance_{from_date:%Y%m%d}_{to_date:%Y%m%d}.{format.value}"
+    return StreamingResponse(
+        _stream_attendance_export(from_date, to_date, employee_id, format),
+        media_type="text/csv" if format == ExportFormat.csv else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _device_response(device: AttendanceDevice) -> DeviceResponse:
+    """
+    A local device in the upstream API_DeviceList shape GET /devices has
+    always returned
+    """
+    return DeviceResponse(
+        id=int(device.device_id) if device.device_id.isdigit() else device.device_id,
+        serial_number=device.serial_number,
+        ip=device.ip_address,
+        mac=device.mac_address,
+        model=device.model,
+        firmware=device.firmware,
+        platform=device.platform,
+        alias=device.name,
+        location=device.location,
+    )
+
 @router.get("/devices", response_model=List[DeviceResponse])
 async def get_devices(
-    session: Session = Depends(get_postgres_manager),
+    request: Request,
+    response: Response,
+    active_only: bool = Query(default=True, description="Hide devices no longer reported by the API"),
+    refresh: bool = Query(default=False, description="Sync devices from the external API first, bypassing the cache"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
     attendance_service: AttendanceService = Depends(get_attendance_service)
 ):
     """
-    Get list of all attendance devices from the external API and sync with database
+    Get attendance devices from the local database, in the shape of the
+    external API's device list. Devices are kept in sync with the external
+    API by the background scheduler (or POST /devices/sync).
+
+    Supports conditional requests: If-None-Match with the ETag of a previous
+    response returns 304 until the devices change.
     """
     try:
-        # Fetch from API
-        api_devices = await attendance_service.fetch_device_list()
-        
-        # Get existing devices from database
-        existing_devices = {
-            device.serial_number: device 
-            for device in session.query(AttendanceDevice).all()
-        }
-        
-        # Process each device from API
-        for api_device in api_devices:
-            serial_number = api_device["SerialNumber"]
-            
-            if serial_number in existing_devices:
-                # Update existing device
-                device = existing_devices[serial_number]
-                device.update_from_api(api_device)
-            else:
-                # Create new device
-                device = AttendanceDevice.from_api_response(api_device)
-                session.add(device)
-        
-        # Mark devices not in API as inactive
-        api_serial_numbers = {d["SerialNumber"] for d in api_devices}
-        for device in existing_devices.values():
-            if device.serial_number not in api_serial_numbers:
-                device.update(is_active=False, sync_status=DeviceSyncStatus.INACTIVE)
-        
-        # Commit changes
-        session.commit()
-        
-        # Return API response
-        return [DeviceResponse(**device) for device in api_devices]
-        
+        if refresh:
+            await attendance_service.sync_devices(session, refresh=True)
+
+        not_modified = await _not_modified(
+            session, request, response, DataGenerationName.devices
+        )
+        if not_modified is not None:
+            return not_modified
+
+        query = select(AttendanceDevice).order_by(AttendanceDevice.serial_number)
+        if active_only:
+            query = query.where(AttendanceDevice.is_active.is_(True))
+        result = await session.execute(query)
+        return [_device_response(device) for device in result.scalars()]
+
     except httpx.HTTPError as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"HTTP Error in get_devices: {e}")
         raise HTTPException(
             status_code=502,
             detail=f"Error communicating with attendance API: {str(e)}"
         )
+    except SQLAlchemyError as e:
+        logger.error(f"Database Error in get_devices: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Database error occurred while fetching devices"
+        )
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Unexpected error in get_devices: {e}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while fetching devices"
         )
     finally:
-        session.close()
+        await session.close()
+
+@router.post("/devices/sync", response_model=DeviceSyncResponse)
+async def sync_devices(
+    refresh: bool = Query(default=False, description="Bypass the device list cache"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
+    attendance_service: AttendanceService = Depends(get_attendance_service)
+):
+    """
+    Sync devices from the external API into the database right away
+    """
+    try:
+        new_devices, updated_devices = await attendance_service.sync_devices(
+            session, refresh=refresh
+        )
+        return DeviceSyncResponse(
+            status="success",
+            new_devices=new_devices,
+            updated_devices=updated_devices,
+            message=f"Synced {new_devices} new and {updated_devices} updated devices"
+        )
+
+    except httpx.HTTPError as e:
+        await session.rollback()
+        logger.error(f"HTTP Error in sync_devices: {e}")
+        raise HTTPException(
+            status_code=502,
+            detail=f"Error communicating with attendance API: {str(e)}"
+        )
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Unexpected error in sync_devices: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while syncing devices"
+        )
+    finally:
+        await session.close()
+
+@router.post("/employees/sync", response_model=EmployeeSyncResponse)
+async def sync_employees(
+    refresh: bool = Query(default=False, description="Bypass the employee list cache"),
+    session: AsyncSession = Depends(get_async_postgres_manager),
+    attendance_service: AttendanceService = Depends(get_attendance_service)
+):
+    """
+    Sync the employees of the active devices from the external API into the
+    database right away; attendance records show their names from it
+    """
+    try:
+        new_employees, updated_employees = await attendance_service.sync_employees(
+            session, refresh=refresh
+        )
+        return EmployeeSyncResponse(
+            status="success",
+            new_employees=new_employees,
+            updated_employees=updated_employees,
+            message=f"Synced {new_employees} new and {updated_employees} updated employees"
+        )
+
+    except httpx.HTTPError as e:
+        await session.rollback()
+        logger.error(f"HTTP Error in sync_employees: {e}")
+        raise HTTPException(
+            status_code=502,
+            detail=f"Error communicating with attendance API: {str(e)}"
+        )
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Unexpected error in sync_employees: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while syncing employees"
+        )
+    finally:
+        await session.close()
 
 @router.get("/devices/{serial_number}/employees", response_model=List[EmployeeResponse])
 async def get_device_employees(
     serial_number: str,
+    refresh: bool = Query(default=False, description="Bypass the cache and fetch from the external API"),
     attendance_service: AttendanceService = Depends(get_attendance_service)
 ):
     """
-    Get list of employees associated with a specific device
+    Get list of employees associated with a specific device. The external API
+    is only called on a cache miss (see LOOKUP_CACHE_TTL_SECONDS).
     """
     try:
-        employees = await attendance_service.fetch_employees_by_device(serial_number)
+        employees = await attendance_service.fetch_employees_by_device(
+            serial_number, refresh=refresh
+        )
         return [EmployeeResponse(**employee) for employee in employees]
         
     except httpx.HTTPError as e:
@@ -289,17 +736,40 @@ async def get_device_employees(
             detail=f"An unexpected error occurred while fetching employees for device {serial_number}"
         )
     
+async def _refresh_device_summaries(serial_number: str) -> None:
+    """
+    Recompute the daily summaries of every day a device has punches on
+    """
+    async with get_async_session() as session:
+        try:
+            await session.execute(
+                daily_summary_refresh(device_daily_keys_query(serial_number))
+            )
+            await session.execute(generation_bump(DataGenerationName.attendance))
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Failed to refresh daily summaries of device {serial_number}: {e}")
+
 @router.patch("/devices/{serial_number}/type", response_model=AttendanceDeviceInDB)
 async def update_device_type(
     serial_number: str,
     device_type: DeviceTypeUpdate,
-    session: Session = Depends(get_postgres_manager)
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_postgres_manager)
 ):
+    """
+    Change the type of a device. Attendance statuses are derived from it when
+    read, so no attendance record is rewritten; only the device's daily
+    summaries are recomputed, after the response is sent.
+    """
     try:
         # Find the device
-        device = session.query(AttendanceDevice).filter(
-            AttendanceDevice.serial_number == serial_number
-        ).first()
+        device = await session.scalar(
+            select(AttendanceDevice).where(
+                AttendanceDevice.serial_number == serial_number
+            )
+        )
         
         if not device:
             raise HTTPException(
@@ -310,39 +780,49 @@ async def update_device_type(
         # Update device type
         device.device_type = device_type.device_type #type: ignore
         device.last_sync = datetime.now()
+        await session.execute(generation_bump(DataGenerationName.devices))
+        # Statuses served by /attendance follow the device type
+        await session.execute(generation_bump(DataGenerationName.attendance))
         
-        session.commit()
-        session.refresh(device)
+        await session.commit()
+        await session.refresh(device)
+        background_tasks.add_task(_refresh_device_summaries, serial_number)
         
         return device
         
+    except HTTPException:
+        raise
     except DetachedInstanceError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=500,
             detail="Database error occurred while updating device type"
         )
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Error updating device type: {e}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while updating device type"
         )
 
-@router.post("/devices/{serial_number}/update-attendance-status")
+@router.post("/devices/{serial_number}/update-attendance-status", deprecated=True)
 async def update_attendance_status_for_device(
     serial_number: str,
-    session: Session = Depends(get_postgres_manager)
+    session: AsyncSession = Depends(get_async_postgres_manager)
 ):
     """
-    Update attendance status for all records of a device based on its device type
+    Deprecated: attendance statuses are derived from the device type when
+    read, so there is nothing to rewrite. Only recomputes the device's daily
+    summaries, which PATCH /devices/{serial_number}/type already does.
     """
     try:
         # Find the device
-        device = session.query(AttendanceDevice).filter(
-            AttendanceDevice.serial_number == serial_number
-        ).first()
+        device = await session.scalar(
+            select(AttendanceDevice).where(
+                AttendanceDevice.serial_number == serial_number
+            )
+        )
         
         if device is None:
             raise HTTPException(
@@ -350,24 +830,24 @@ async def update_attendance_status_for_device(
                 detail=f"Device with serial number {serial_number} not found"
             )
             
-        attendance_status = "Check In" if device.device_type.value == DeviceType.CHECK_IN.value else "Check Out"
-        
-        updated = session.query(AttendanceRecord).filter(
-            AttendanceRecord.machine_serial == serial_number
-        ).update(
-            {"attendance_status": attendance_status},
-            synchronize_session=False
+        # Check-in/check-out times of the affected days depend on the status
+        await session.execute(
+            daily_summary_refresh(device_daily_keys_query(serial_number))
         )
+        await session.execute(generation_bump(DataGenerationName.attendance))
         
-        session.commit()
+        await session.commit()
         
         return {
-            "message": f"Successfully updated {updated} records for device {serial_number}",
-            "updated_records": updated
+            "message": (
+                f"Attendance status of device {serial_number} is derived from its "
+                "device type; no records rewritten"
+            ),
+            "updated_records": 0
         }
         
     except SQLAlchemyError as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Database error in update_attendance_status_for_device: {e}")
         raise HTTPException(
             status_code=500,
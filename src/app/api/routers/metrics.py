@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from src.app.middleware.access_code import verify_access_code
+
+# Scrapers send X-Access-Code like any other client: the metrics describe
+# the routes, upstream failures and database load of this worker
+router = APIRouter(dependencies=[Depends(verify_access_code)])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Prometheus metrics of this worker
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
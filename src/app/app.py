@@ -1,11 +1,26 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.app.api.routers.router import api_router
+from src.app.api.routers.metrics import router as metrics_router
 from fastapi.openapi.utils import get_openapi
+from src.app.db.postgres import get_async_postgres
+from src.app.core.http_client import create_http_client
+from src.app.core.metrics import instrument_engine
+from src.app.core.sql_profiling import instrument_engine_profiling
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.services.attendance_service import AttendanceService
+from src.app.services.partitions import maintain_attendance_partitions
+from src.app.services.scheduler import create_sync_scheduler
+from src.app.services.sync_jobs import SyncJobManager
+from src.app.core.config import settings
+from src.app.middleware.metrics import MetricsMiddleware
+from src.app.middleware.sql_profiling import SQLProfilingMiddleware
 import sys
 
 logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 origins = [
     "http://localhost",
@@ -13,7 +28,39 @@ origins = [
     "*",
 ]
 
-app = FastAPI(title="Attendance API", docs_url="/docs")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the engine and connection pool once per worker
+    postgres = get_async_postgres()
+    await postgres.init_models()
+    if settings.METRICS_ENABLED:
+        instrument_engine(postgres.engine)
+    if settings.SQL_PROFILING_SAMPLE_RATE > 0:
+        instrument_engine_profiling(postgres.engine)
+    # Partitions for the coming months exist before any request inserts;
+    # sync creates any other month it needs, so a failure here is not fatal
+    try:
+        async with get_async_session() as session:
+            await maintain_attendance_partitions(session)
+    except Exception as e:
+        logger.error(f"Attendance partition maintenance failed: {e}")
+    # One keep-alive upstream client and service per worker
+    app.state.http_client = create_http_client()
+    app.state.attendance_service = AttendanceService(app.state.http_client)
+    app.state.sync_jobs = SyncJobManager(app.state.attendance_service)
+    # Device and attendance sync run in the background, not in read requests
+    scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        scheduler = create_sync_scheduler(app.state.attendance_service)
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    await app.state.sync_jobs.stop()
+    await app.state.http_client.aclose()
+    await postgres.dispose()
+
+app = FastAPI(title="Attendance API", docs_url="/docs", lifespan=lifespan)
 
 def custom_openapi():
     if app.openapi_schema:
@@ -56,4 +103,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.SQL_PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        SQLProfilingMiddleware,
+        sample_rate=settings.SQL_PROFILING_SAMPLE_RATE,
+        server_timing=settings.SQL_PROFILING_SERVER_TIMING,
+    )
+
+if settings.METRICS_ENABLED:
+    # Added last, so it also times the other middleware
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router=metrics_router)
+
 app.include_router(router=api_router, prefix="/api")
\ No newline at end of file
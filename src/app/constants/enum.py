@@ -5,4 +5,26 @@ class TAGS(str, Enum):
     device_list = "Device List"
 
     def __str__(self) -> str:
-        return self.value
\ No newline at end of file
+        return self.value
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+class SyncMode(str, Enum):
+    full = "full"
+    incremental = "incremental"
+
+class SyncJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class DataGenerationName(str, Enum):
+    attendance = "attendance"
+    devices = "devices"
+
+class AttendanceStatus(str, Enum):
+    check_in = "Check In"
+    check_out = "Check Out"
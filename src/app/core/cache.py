@@ -0,0 +1,81 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AsyncTTLCache(Generic[V]):
+    """
+    In-process cache of async loader results with a time-to-live and a
+    least-recently-used size limit
+
+    Concurrent misses on the same key share a single load: the first caller
+    starts it and the others await the same task. Failed loads are not
+    cached. Cached values are shared between callers and must not be mutated.
+    """
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._loading: Dict[Hashable, "asyncio.Task[V]"] = {}
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Cached value of a key, or None if it is missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one key, or every key if None
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[V]], refresh: bool = False
+    ) -> V:
+        """
+        Return the cached value of a key, loading it on a miss
+
+        Args:
+            loader: Produces the value; called at most once per miss however
+                many callers are waiting for the key
+            refresh: Ignore the cached value (a load already in flight is
+                still shared, since it is at least as fresh)
+        """
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        # A waiter being cancelled must not cancel the load the others share
+        return await asyncio.shield(task)
+
+    def _loaded(self, key: Hashable, task: "asyncio.Task[V]") -> None:
+        self._loading.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
@@ -1,3 +1,4 @@
+from pydantic import ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
@@ -14,11 +15,96 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str = os.getenv('POSTGRES_SERVER', 'localhost')
     POSTGRES_DB: str = os.getenv('POSTGRES_DB', "attendance_db")
     POSTGRES_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    POSTGRES_ASYNC_URL: str = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+    # Connection pool configuration (one pool per worker process)
+    POSTGRES_POOL_SIZE: int = int(os.getenv('POSTGRES_POOL_SIZE', 10))
+    POSTGRES_MAX_OVERFLOW: int = int(os.getenv('POSTGRES_MAX_OVERFLOW', 20))
+    POSTGRES_POOL_TIMEOUT: int = int(os.getenv('POSTGRES_POOL_TIMEOUT', 30))
+    POSTGRES_POOL_RECYCLE: int = int(os.getenv('POSTGRES_POOL_RECYCLE', 1800))
+    POSTGRES_POOL_PRE_PING: bool = os.getenv('POSTGRES_POOL_PRE_PING', "true").lower() == "true"
 
     # External API configuration
     EXTERNAL_API_URL: str = os.getenv('EXTERNAL_API_URL', "http://192.168.2.120:6900/api/hpa/Paradise")
     EXTERNAL_API_USER: str = os.getenv('EXTERNAL_API_USER', "admin")
     EXTERNAL_API_PASSWORD: str = os.getenv('EXTERNAL_API_PASSWORD', "1234")
+
+    # Shared upstream HTTP client (one keep-alive pool per worker process)
+    EXTERNAL_API_MAX_CONNECTIONS: int = int(os.getenv('EXTERNAL_API_MAX_CONNECTIONS', 20))
+    EXTERNAL_API_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv('EXTERNAL_API_MAX_KEEPALIVE_CONNECTIONS', 10))
+    EXTERNAL_API_KEEPALIVE_EXPIRY: float = float(os.getenv('EXTERNAL_API_KEEPALIVE_EXPIRY', 30.0))
+    EXTERNAL_API_CONNECT_TIMEOUT: float = float(os.getenv('EXTERNAL_API_CONNECT_TIMEOUT', 5.0))
+    EXTERNAL_API_READ_TIMEOUT: float = float(os.getenv('EXTERNAL_API_READ_TIMEOUT', 30.0))
+    EXTERNAL_API_MAX_RETRIES: int = int(os.getenv('EXTERNAL_API_MAX_RETRIES', 3))
+    EXTERNAL_API_RETRY_BACKOFF: float = float(os.getenv('EXTERNAL_API_RETRY_BACKOFF', 0.5))
+    # In-process cache of device and employee lists from the external API
+    LOOKUP_CACHE_TTL_SECONDS: int = int(os.getenv('LOOKUP_CACHE_TTL_SECONDS', 900))
+    LOOKUP_CACHE_MAX_SIZE: int = int(os.getenv('LOOKUP_CACHE_MAX_SIZE', 1024))
+    # Background sync scheduler (one run per job at a time across workers)
+    SCHEDULER_ENABLED: bool = os.getenv('SCHEDULER_ENABLED', "true").lower() == "true"
+    DEVICE_SYNC_INTERVAL_SECONDS: int = int(os.getenv('DEVICE_SYNC_INTERVAL_SECONDS', 3600))
+    EMPLOYEE_SYNC_INTERVAL_SECONDS: int = int(os.getenv('EMPLOYEE_SYNC_INTERVAL_SECONDS', 3600))
+    ATTENDANCE_SYNC_INTERVAL_SECONDS: int = int(os.getenv('ATTENDANCE_SYNC_INTERVAL_SECONDS', 300))
+
+    # GET /attendance page size
+    ATTENDANCE_PAGE_SIZE: int = int(os.getenv('ATTENDANCE_PAGE_SIZE', 100))
+    ATTENDANCE_MAX_PAGE_SIZE: int = int(os.getenv('ATTENDANCE_MAX_PAGE_SIZE', 1000))
+
+    # Rows fetched per round-trip by the server-side cursor of /attendance/export
+    ATTENDANCE_EXPORT_BATCH_SIZE: int = int(os.getenv('ATTENDANCE_EXPORT_BATCH_SIZE', 2000))
+
+    # Timesheet report: shift start (HH:MM) and minutes of tolerance before
+    # a first check-in counts as late; both can be overridden per request
+    SHIFT_START: str = os.getenv('SHIFT_START', "08:00")
+    LATE_GRACE_MINUTES: int = int(os.getenv('LATE_GRACE_MINUTES', 5))
+
+    # Attendance ingestion
+    ATTENDANCE_INSERT_BATCH_SIZE: int = int(os.getenv('ATTENDANCE_INSERT_BATCH_SIZE', 1000))
+    # Incremental sync: re-read this much before the watermark for late punches,
+    # and look back this far when a source has no watermark yet
+    SYNC_OVERLAP_MINUTES: int = int(os.getenv('SYNC_OVERLAP_MINUTES', 60))
+    SYNC_INITIAL_LOOKBACK_DAYS: int = int(os.getenv('SYNC_INITIAL_LOOKBACK_DAYS', 7))
+    # Large ranges are fetched as day-aligned windows, a few at a time
+    SYNC_WINDOW_DAYS: int = int(os.getenv('SYNC_WINDOW_DAYS', 1))
+    SYNC_MAX_CONCURRENT_WINDOWS: int = int(os.getenv('SYNC_MAX_CONCURRENT_WINDOWS', 4))
+    SYNC_WINDOW_RETRIES: int = int(os.getenv('SYNC_WINDOW_RETRIES', 2))
+    # Parsed batches waiting for the database; with the batches being filled
+    # by each window this bounds sync memory to roughly
+    # (SYNC_QUEUE_MAX_BATCHES + SYNC_MAX_CONCURRENT_WINDOWS) * ATTENDANCE_INSERT_BATCH_SIZE rows
+    SYNC_QUEUE_MAX_BATCHES: int = int(os.getenv('SYNC_QUEUE_MAX_BATCHES', 4))
+    # Punches of devices missing from API_DeviceList hold the watermark back
+    # until the device sync registers them, for at most this many hours after
+    # the punch; older ones are logged and left behind
+    SYNC_UNKNOWN_DEVICE_GRACE_HOURS: int = int(os.getenv('SYNC_UNKNOWN_DEVICE_GRACE_HOURS', 24))
+    # attendance_records is partitioned by month of check_time: partitions
+    # are created this many months ahead, and months older than the retention
+    # are detached (or dropped) from the table; 0 keeps every month
+    ATTENDANCE_PARTITION_MONTHS_AHEAD: int = int(os.getenv('ATTENDANCE_PARTITION_MONTHS_AHEAD', 3))
+    ATTENDANCE_RETENTION_MONTHS: int = int(os.getenv('ATTENDANCE_RETENTION_MONTHS', 0))
+    ATTENDANCE_RETENTION_DROP: bool = os.getenv('ATTENDANCE_RETENTION_DROP', "false").lower() == "true"
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = int(os.getenv('PARTITION_MAINTENANCE_INTERVAL_SECONDS', 86400))
+    # Finished background sync jobs kept for status lookups, per worker
+    SYNC_JOB_HISTORY: int = int(os.getenv('SYNC_JOB_HISTORY', 100))
+
+    # Prometheus metrics of each worker on GET /metrics, behind the access code
+    METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', "false").lower() == "true"
+    # SQL profiling of a random share of requests (0 turns it off, 1 profiles
+    # all): slow statements are logged with their parameters, and a statement
+    # repeated this many times in one request is logged as a probable N+1
+    SQL_PROFILING_SAMPLE_RATE: float = float(os.getenv('SQL_PROFILING_SAMPLE_RATE', 0))
+    SQL_SLOW_QUERY_SECONDS: float = float(os.getenv('SQL_SLOW_QUERY_SECONDS', 0.5))
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 10))
+    # Also report a profiled request's SQL time in a Server-Timing header
+    SQL_PROFILING_SERVER_TIMING: bool = os.getenv('SQL_PROFILING_SERVER_TIMING', "false").lower() == "true"
+
     ACCESS_CODE: str = os.getenv('ACCESS_CODE', "X7#mK9pL$fR2")
 
+    @field_validator("SYNC_WINDOW_DAYS", "SYNC_MAX_CONCURRENT_WINDOWS")
+    @classmethod
+    def _at_least_one(cls, value: int, info: ValidationInfo) -> int:
+        # Zero would leave sync splitting or waiting forever
+        if value < 1:
+            raise ValueError(f"{info.field_name} must be at least 1")
+        return value
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,27 @@
+import hashlib
+from typing import Optional
+from fastapi import Request
+
+
+def compute_etag(generation: int, request: Request, *scope: str) -> str:
+    """
+    Strong ETag of a read: the data set's generation plus everything that
+    selects the response body (path, sorted query string and any extra scope,
+    e.g. the clock bucket of a defaulted date window)
+    """
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    raw = "\n".join([str(generation), request.url.path, query, *scope])
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag (weak comparison, as
+    RFC 9110 requires for If-None-Match)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
@@ -0,0 +1,19 @@
+import httpx
+from src.app.core.config import settings
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the keep-alive client shared by all upstream API calls of a worker
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.EXTERNAL_API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.EXTERNAL_API_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.EXTERNAL_API_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.EXTERNAL_API_READ_TIMEOUT,
+            connect=settings.EXTERNAL_API_CONNECT_TIMEOUT,
+        ),
+    )
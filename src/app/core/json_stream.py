@@ -0,0 +1,119 @@
+import json
+from typing import Any, AsyncIterator, Dict
+
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a number; "" is the end of the buffer
+_NUMBER_TAIL = ("", ".", "e", "E", "+", "-", *"0123456789")
+
+
+class JSONEnvelopeStream:
+    """
+    Incremental parser for upstream responses shaped like
+    {"result": ..., "reason": ..., "data": [[item, item, ...]]}
+
+    `items()` yields the items of data[0] one at a time while the body is
+    still being received, so only the current item and one network chunk are
+    held in memory. The other top-level members are collected in `fields`
+    (complete once `items()` is exhausted).
+    """
+    def __init__(self, chunks: AsyncIterator[str], key: str = "data") -> None:
+        self.fields: Dict[str, Any] = {}
+        self._chunks = chunks.__aiter__()
+        self._key = key
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    async def items(self) -> AsyncIterator[Any]:
+        await self._expect("{")
+        if await self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = await self._value()
+            await self._expect(":")
+            if key == self._key and await self._peek() == "[":
+                async for item in self._first_array_items():
+                    yield item
+            else:
+                self.fields[key] = await self._value()
+            if await self._peek() == ",":
+                self._pos += 1
+                continue
+            await self._expect("}")
+            return
+
+    async def _first_array_items(self) -> AsyncIterator[Any]:
+        await self._expect("[")
+        if await self._peek() == "[":
+            self._pos += 1
+            if await self._peek() == "]":
+                self._pos += 1
+            else:
+                while True:
+                    yield await self._value()
+                    if await self._peek() == ",":
+                        self._pos += 1
+                        continue
+                    await self._expect("]")
+                    break
+        elif await self._peek() != "]":
+            # data[0] is not an array: nothing to stream
+            await self._value()
+        # Only data[0] carries records; skip anything after it
+        while await self._peek() == ",":
+            self._pos += 1
+            await self._value()
+        await self._expect("]")
+
+    async def _fill(self) -> bool:
+        """
+        Append the next chunk, dropping the text already consumed
+
+        Returns:
+            False at the end of the stream
+        """
+        if self._eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    async def _peek(self) -> str:
+        """
+        Next non-whitespace character, without consuming it
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not await self._fill():
+                raise ValueError("Unexpected end of JSON response")
+
+    async def _expect(self, char: str) -> None:
+        found = await self._peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON response: expected {char!r}, found {found!r}")
+        self._pos += 1
+
+    async def _value(self) -> Any:
+        await self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not await self._fill():
+                    raise
+                continue
+            # A number cut off by the end of a chunk may continue in the next one
+            if self._buf[end:end + 1] in _NUMBER_TAIL and await self._fill():
+                continue
+            self._pos = end
+            return value
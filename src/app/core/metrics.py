@@ -0,0 +1,149 @@
+"""
+Prometheus metrics of this worker process, served by GET /metrics.
+With several worker processes, each serves its own values.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.app.core.config import settings
+
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "attportal_http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method", "route"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "attportal_http_request_duration_seconds",
+    "HTTP request time, until the last byte of the response body is sent",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "attportal_http_request_db_queries",
+    "Database statements executed per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "attportal_upstream_request_duration_seconds",
+    "Time until the upstream API returns response headers, per attempt",
+    ["api"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+UPSTREAM_ERRORS = Counter(
+    "attportal_upstream_errors_total",
+    "Failed upstream API calls: transport errors, HTTP error statuses and "
+    "API-level failures; retried attempts count too",
+    ["api", "reason"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "attportal_db_query_duration_seconds",
+    "Database statement execution time",
+    ["verb"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10),
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "attportal_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, waiting for a free one or "
+    "opening a new one",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "attportal_db_pool_connections",
+    "Connections of the async engine's pool, by state",
+    ["state"],
+)
+DB_POOL_LIMIT = Gauge(
+    "attportal_db_pool_limit",
+    "Most connections the async engine's pool opens (pool size plus overflow)",
+)
+
+SYNC_RECORDS = Counter(
+    "attportal_sync_records_total",
+    "Attendance records handled by sync: fetched from the upstream, then "
+    "inserted, dropped as duplicates or skipped for an unknown device",
+    ["outcome"],
+)
+SYNC_RUNS = Counter(
+    "attportal_sync_runs_total",
+    "Attendance syncs by mode and outcome (success, partial or failed)",
+    ["mode", "outcome"],
+)
+
+
+@dataclass
+class QueryCount:
+    count: int = 0
+
+
+# Statements of the HTTP request being handled; a mutable holder so that
+# statements run in copied contexts (threads, greenlets) still add to it
+_request_queries: ContextVar[Optional[QueryCount]] = ContextVar("request_queries", default=None)
+
+
+@contextmanager
+def count_request_queries() -> Iterator[QueryCount]:
+    """
+    Count the statements the engine executes inside the block
+    """
+    counter = QueryCount()
+    token = _request_queries.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_queries.reset(token)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async engine pool that observes how long each checkout takes
+    """
+    # Log as the pool it extends, under the "sqlalchemy" logger's level,
+    # rather than under this module's name
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def connect(self) -> Any:
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(perf_counter() - started)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    # Kept on the statement's own context: after_cursor_execute does not run
+    # for a failed statement, and the context is discarded with it
+    context._query_started = perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.labels(verb=verb).observe(perf_counter() - started)
+    counter = _request_queries.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time the statements of an async engine, count them per HTTP request and
+    expose its pool usage
+    """
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    # engine.pool is replaced by dispose(), so look it up at scrape time
+    DB_POOL_CONNECTIONS.labels(state="checked_out").set_function(lambda: engine.pool.checkedout())
+    DB_POOL_CONNECTIONS.labels(state="idle").set_function(lambda: engine.pool.checkedin())
+    DB_POOL_LIMIT.set(settings.POSTGRES_POOL_SIZE + max(settings.POSTGRES_MAX_OVERFLOW, 0))
@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, List, Tuple
+
+
+def _encode(values: List[str]) -> str:
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    return json.loads(raw)
+
+
+def encode_cursor(check_time: datetime, record_uuid: uuid.UUID) -> str:
+    """
+    Encode the (check_time, uuid) seek position of the last returned record
+    into an opaque URL-safe cursor
+    """
+    return _encode([check_time.isoformat(), str(record_uuid)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        check_time, record_uuid = _decode(cursor)
+        return datetime.fromisoformat(check_time), uuid.UUID(record_uuid)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_daily_cursor(att_date: date, employee_id: str) -> str:
+    """
+    Encode the (att_date, employee_id) seek position of the last returned
+    daily summary
+    """
+    return _encode([att_date.isoformat(), employee_id])
+
+
+def decode_daily_cursor(cursor: str) -> Tuple[date, str]:
+    """
+    Decode a cursor produced by encode_daily_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        att_date, employee_id = _decode(cursor)
+        if not isinstance(employee_id, str):
+            raise TypeError("employee_id must be a string")
+        return date.fromisoformat(att_date), employee_id
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
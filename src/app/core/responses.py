@@ -0,0 +1,14 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson, for routes that return plain rows
+    instead of response models. datetime, date and uuid.UUID serialize
+    natively like in pydantic's output; driver-specific types such as
+    asyncpg's UUID fall back to str.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str)
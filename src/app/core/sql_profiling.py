@@ -0,0 +1,106 @@
+"""
+Opt-in profiling of the SQL a request runs, for a sample of requests
+(SQL_PROFILING_SAMPLE_RATE): statements are counted and timed, slow ones
+are logged with their parameters, and a statement executed one at a
+time SQL_N_PLUS_ONE_THRESHOLD times or more in one request is logged as
+a probable N+1 pattern. Requests outside the sample cost one contextvar
+lookup per statement.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Dict, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement or parameter text written to the log
+_LOG_TEXT_LIMIT = 1000
+
+
+@dataclass
+class SQLProfile:
+    statements: int = 0
+    seconds: float = 0.0
+    # Single executions per statement text; parameters are bound separately,
+    # so the same query with other values has the same text. Batched
+    # (executemany) executions are left out: they already are the fix.
+    shapes: Dict[str, int] = field(default_factory=dict)
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        return {statement: count for statement, count in self.shapes.items() if count >= threshold}
+
+
+_profile: ContextVar[Optional[SQLProfile]] = ContextVar("sql_profile", default=None)
+
+
+def _truncate(value: Any) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= _LOG_TEXT_LIMIT else text[:_LOG_TEXT_LIMIT] + "..."
+
+
+@contextmanager
+def profile_sql() -> Iterator[SQLProfile]:
+    """
+    Profile the statements executed inside the block
+    """
+    profile = SQLProfile()
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if _profile.get() is not None:
+        # On the statement's own context, which a failed statement discards
+        # without an after_cursor_execute
+        context._profile_started = perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    profile = _profile.get()
+    if profile is None:
+        return
+    started = getattr(context, "_profile_started", None)
+    elapsed = perf_counter() - started if started is not None else 0.0
+    profile.statements += 1
+    profile.seconds += elapsed
+    if not executemany:
+        profile.shapes[statement] = profile.shapes.get(statement, 0) + 1
+    if elapsed >= settings.SQL_SLOW_QUERY_SECONDS:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f}ms): {_truncate(statement)} "
+            f"parameters: {_truncate(parameters)}"
+        )
+
+
+def instrument_engine_profiling(engine: AsyncEngine) -> None:
+    """
+    Feed the statements of an async engine to the profile of the request
+    executing them
+    """
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def log_profile(profile: SQLProfile, request_name: str) -> None:
+    """
+    Log a request's statement totals, and its repeated statements as
+    probable N+1 patterns
+    """
+    for statement, count in profile.repeated_shapes(settings.SQL_N_PLUS_ONE_THRESHOLD).items():
+        logger.warning(
+            f"Probable N+1 in {request_name}: executed {count} times: {_truncate(statement)}"
+        )
+    logger.debug(
+        f"SQL profile of {request_name}: {profile.statements} statements, "
+        f"{profile.seconds * 1000:.1f}ms"
+    )
@@ -1,4 +1,6 @@
-from typing import List
+import threading
+import zlib
+from typing import List, Optional
 import sqlalchemy
 from sqlalchemy import (
     create_engine,
@@ -7,42 +9,85 @@ from sqlalchemy import (
     MetaData,
     text,
 )
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 
 from src.app.core.config import settings
+from src.app.core.metrics import InstrumentedAsyncQueuePool
 from src.app.repositories.base_repository import ITableRepository
 from src.app.models.entities.orm import Base
 
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Stable advisory lock key for a name, identical in every worker
+    """
+    return zlib.crc32(f"attportal:{name}".encode())
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    }
+
+
+def create_pooled_engine(url: str) -> Engine:
+    """
+    Create an engine whose connection pool is configured from settings
+    """
+    return create_engine(url, **_pool_options())
+
+
+def create_pooled_async_engine(url: str) -> AsyncEngine:
+    """
+    Create an asyncpg-backed engine whose connection pool is configured from
+    settings and times its checkouts for the metrics
+    """
+    return create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **_pool_options())
+
+
 class PostgresManager(ITableRepository):
     def __init__(self) -> None:
+        self.engine = create_pooled_engine(settings.POSTGRES_URL)
+        self.metadata = MetaData()
+        self.Session = sessionmaker(bind=self.engine)
+
+    def init_models(self) -> None:
+        """
+        Create the database (if missing) and all tables defined in models
+        """
         try:
-            self.engine = create_engine(settings.POSTGRES_URL)
-            self.engine.connect()
-            # Create all tables defined in models
-            Base.metadata.create_all(self.engine)  
+            with self.engine.connect():
+                pass
         except Exception as e:
             print(str(e))
-            self.engine = create_engine(settings.POSTGRES_URL + '/postgres')
             self.create_database(settings.POSTGRES_DB)
-        finally:
-            try:
-                self.engine = create_engine(settings.POSTGRES_URL)
-                self.metadata = MetaData()
-                self.Session = sessionmaker(bind=self.engine)
-                # Create all tables after database is created
-                Base.metadata.create_all(self.engine)  
-            except Exception as e:
-                print(f"Failed to initialize PostgresManager: {e}")
+        try:
+            Base.metadata.create_all(self.engine)
+        except Exception as e:
+            print(f"Failed to initialize PostgresManager: {e}")
+
+    def dispose(self) -> None:
+        self.engine.dispose()
 
     def create_database(self, database_name: str) -> None:
+        admin_engine = create_engine(
+            make_url(settings.POSTGRES_URL).set(database="postgres"),
+            isolation_level="AUTOCOMMIT",
+        )
         try:
-            conn = self.engine.connect()
-            conn.execute(sqlalchemy.sql.text("commit"))
-            conn.execute(sqlalchemy.sql.text(f"create database {database_name}"))
-            conn.close()
+            with admin_engine.connect() as conn:
+                conn.execute(sqlalchemy.sql.text(f"create database {database_name}"))
         except Exception as e:
             print(f"Failed to create database: {e}")
+        finally:
+            admin_engine.dispose()
 
     def create_table(self, table_name: str, columns: List[Column] = []) -> None:
         try:
@@ -136,4 +181,138 @@ class PostgresManager(ITableRepository):
 
 class TableNotFoundException(Exception):
     def __init__(self, table_name: str):
-        super().__init__(f"Table {table_name} not found")
\ No newline at end of file
+        super().__init__(f"Table {table_name} not found")
+
+
+_postgres_manager: Optional[PostgresManager] = None
+_postgres_manager_lock = threading.Lock()
+
+
+def get_postgres() -> PostgresManager:
+    """
+    Return the process-wide PostgresManager, creating its engine, pool and
+    tables on first use only
+    """
+    global _postgres_manager
+    if _postgres_manager is None:
+        with _postgres_manager_lock:
+            if _postgres_manager is None:
+                manager = PostgresManager()
+                manager.init_models()
+                _postgres_manager = manager
+    return _postgres_manager
+
+
+class AsyncPostgresManager(ITableRepository):
+    """
+    Async counterpart of PostgresManager used by the FastAPI routes
+    """
+    def __init__(self) -> None:
+        self.engine = create_pooled_async_engine(settings.POSTGRES_ASYNC_URL)
+        self.metadata = MetaData()
+        self.Session = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    async def init_models(self) -> None:
+        """
+        Create the database (if missing) and all tables defined in models
+        """
+        try:
+            async with self.engine.connect():
+                pass
+        except Exception as e:
+            print(str(e))
+            await self.create_database(settings.POSTGRES_DB)
+        try:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        except Exception as e:
+            print(f"Failed to initialize AsyncPostgresManager: {e}")
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+    async def create_database(self, database_name: str) -> None:
+        admin_engine = create_async_engine(
+            make_url(settings.POSTGRES_ASYNC_URL).set(database="postgres"),
+            isolation_level="AUTOCOMMIT",
+        )
+        try:
+            async with admin_engine.connect() as conn:
+                await conn.execute(text(f"create database {database_name}"))
+        except Exception as e:
+            print(f"Failed to create database: {e}")
+        finally:
+            await admin_engine.dispose()
+
+    async def create_table(self, table_name: str, columns: List[Column] = []) -> None:
+        try:
+            if not await self.has_table(table_name=table_name):
+                table = Table(table_name, self.metadata, *columns)
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(table.create)
+                return
+            raise ValueError(f"Table {table_name} already exists")
+        except Exception as e:
+            print(f"Failed to create table {table_name}: {e}")
+
+    async def has_table(self, table_name: str) -> bool:
+        try:
+            async with self.engine.connect() as conn:
+                return await conn.run_sync(
+                    lambda sync_conn: sqlalchemy.inspect(sync_conn).has_table(table_name)
+                )
+        except Exception as e:
+            print(f"Failed to check if table exists {table_name}: {e}")
+            return False
+
+    async def delete_table(self, table_name: str) -> None:
+        try:
+            if await self.has_table(table_name=table_name):
+                table = Table(table_name, self.metadata)
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(table.drop)
+                return
+            raise TableNotFoundException(table_name)
+        except Exception as e:
+            print(f"Failed to delete table {table_name}: {e}")
+
+    async def list_tables(self) -> List[str]:
+        try:
+            async with self.Session() as session:
+                tables = await session.execute(
+                    text(
+                        "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+                    )
+                )
+                return [row[0] for row in tables]
+        except Exception as e:
+            print(f"Failed to list tables: {e}")
+            return []
+
+    async def get_table(self, table_name: str) -> Table:
+        try:
+            async with self.Session() as session:
+                table = await session.execute(
+                    text(
+                        "SELECT * FROM information_schema.tables WHERE table_schema = 'public' AND table_name = :table_name"
+                    ),
+                    {"table_name": table_name},
+                )
+                return [list(row) for row in table] # type: ignore
+        except Exception as e:
+            print(f"Failed to get table {table_name}: {e}")
+            raise TableNotFoundException(table_name)
+
+
+_async_postgres_manager: Optional[AsyncPostgresManager] = None
+
+
+def get_async_postgres() -> AsyncPostgresManager:
+    """
+    Return the process-wide AsyncPostgresManager; its pool is shared by all
+    requests handled on this worker's event loop
+    """
+    global _async_postgres_manager
+    if _async_postgres_manager is None:
+        _async_postgres_manager = AsyncPostgresManager()
+    return _async_postgres_manager
@@ -1,11 +1,15 @@
 from contextlib import asynccontextmanager
-from src.app.db.postgres import PostgresManager
+from src.app.db.postgres import get_postgres, get_async_postgres
 
 @asynccontextmanager
 async def get_postgres_manager():
-    postgres_manager = PostgresManager()
-    session = postgres_manager.Session()
+    session = get_postgres().Session()
     try:
         yield session
     finally:
         session.close()
+
+@asynccontextmanager
+async def get_async_session():
+    async with get_async_postgres().Session() as session:
+        yield session
@@ -1,14 +1,22 @@
-
-from src.app.db.postgres import PostgresManager
+from fastapi import Request
+from src.app.db.postgres import get_postgres, get_async_postgres
 from src.app.services.attendance_service import AttendanceService
+from src.app.services.sync_jobs import SyncJobManager
 
 def get_postgres_manager():
-    postgres_manager = PostgresManager()
-    session = postgres_manager.Session()
+    session = get_postgres().Session()
     try:
         yield session
     finally:
         session.close()
 
-def get_attendance_service() -> AttendanceService:
-    return AttendanceService()
\ No newline at end of file
+async def get_async_postgres_manager():
+    async with get_async_postgres().Session() as session:
+        yield session
+
+def get_attendance_service(request: Request) -> AttendanceService:
+    # Built once in the app lifespan around the shared upstream HTTP client
+    return request.app.state.attendance_service
+
+def get_sync_job_manager(request: Request) -> SyncJobManager:
+    return request.app.state.sync_jobs
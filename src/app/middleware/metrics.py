@@ -0,0 +1,61 @@
+from time import perf_counter
+from typing import Any, Dict
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.app.core.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    count_request_queries,
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the route a request goes to (e.g.
+    /api/attendance/{record_uuid}/status), so that labels stay few whatever
+    the paths requested
+    """
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Observe the latency, status and database statements of every HTTP
+    request, and count those in progress, per route
+
+    A plain ASGI middleware: it does not buffer or copy streamed bodies,
+    and the request runs in the caller's task and context.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels: Dict[str, Any] = {"method": scope["method"], "route": route_template(scope)}
+        status = {"code": 500}
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(**labels)
+        in_progress.inc()
+        started = perf_counter()
+        try:
+            with count_request_queries() as queries:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(**labels, status=str(status["code"])).observe(
+                perf_counter() - started
+            )
+            HTTP_REQUEST_DB_QUERIES.labels(**labels).observe(queries.count)
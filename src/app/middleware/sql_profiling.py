@@ -0,0 +1,38 @@
+import random
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.app.core.sql_profiling import log_profile, profile_sql
+from src.app.middleware.metrics import route_template
+
+
+class SQLProfilingMiddleware:
+    """
+    Profile the SQL of a random sample of HTTP requests (see
+    core/sql_profiling.py), optionally reporting it in a Server-Timing
+    header. The header is sent with the response head, so it leaves out
+    statements run while a body streams or in background tasks; the log
+    covers the whole request.
+    """
+    def __init__(self, app: ASGIApp, sample_rate: float, server_timing: bool = False) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        with profile_sql() as profile:
+            async def send_with_timing(message: Message) -> None:
+                if self.server_timing and message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={profile.seconds * 1000:.1f};desc="{profile.statements} queries"',
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                log_profile(profile, f"{scope['method']} {route_template(scope)}")
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import BigInteger, Column, String, Date, DateTime, Integer, SmallInteger, ForeignKey, Enum, Boolean, Identity, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from datetime import datetime
 import uuid
 import enum
+from typing import NamedTuple
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -21,6 +22,8 @@ class AttendanceDevice(Base):
     __tablename__ = "attendance_devices"
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Compact key attendance records reference the device by
+    device_key = Column(SmallInteger, Identity(), unique=True, nullable=False)
     device_id = Column(String, unique=True, nullable=False)  # ID from API
     serial_number = Column(String, unique=True, nullable=False)  # SerialNumber from API
     name = Column(String, nullable=True)  # Alias from API
@@ -31,6 +34,7 @@ class AttendanceDevice(Base):
     mac_address = Column(String, nullable=True)  # MAC from API
     model = Column(String, nullable=True)  # Model from API
     firmware = Column(String, nullable=True)  # Firmware from API
+    platform = Column(String, nullable=True)  # Platform from API
     location = Column(String, nullable=True)  # Location from API
     
     # Tracking fields
@@ -54,6 +58,7 @@ class AttendanceDevice(Base):
             mac_address=api_device.get("MAC"),
             model=api_device.get("Model"),
             firmware=api_device.get("Firmware"),
+            platform=api_device.get("Platform"),
             location=api_device.get("Location"),
             last_sync=datetime.now()
         )
@@ -61,59 +66,174 @@ class AttendanceDevice(Base):
     def update_from_api(self, api_device):
         """
         Update existing device instance from API response data
+
+        Returns:
+            bool: Whether anything GET /devices serves changed
         """
+        served = (
+            self.name, self.ip_address, self.mac_address, self.model,
+            self.firmware, self.platform, self.location, self.is_active,
+        )
         self.name = api_device.get("Alias")
         self.ip_address = api_device.get("IP")
         self.mac_address = api_device.get("MAC")
         self.model = api_device.get("Model")
         self.firmware = api_device.get("Firmware")
+        self.platform = api_device.get("Platform")
         self.location = api_device.get("Location")
         self.last_sync = datetime.now()
+        # Listed again after missing from an earlier device list
+        self.is_active = True
         self.sync_status = DeviceSyncStatus.ACTIVE
+        return served != (
+            self.name, self.ip_address, self.mac_address, self.model,
+            self.firmware, self.platform, self.location, self.is_active,
+        )
+
+class Employee(Base):
+    """
+    Employee dimension, synced from API_EmployeeListByDevices; attendance
+    records reference it by its compact key, so a rename is one row update
+    """
+    __tablename__ = "employees"
+
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(String, unique=True, nullable=False)  # SSN / EmployeeID from API
+    name = Column(String, nullable=False)  # FullName from API
+    card = Column(String, nullable=True)  # Card from API
+    department = Column(String, nullable=True)  # Department from API
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    # Relationship
+    attendance_records = relationship("AttendanceRecord", back_populates="employee")
+
+    @staticmethod
+    def values_from_api_response(api_employee):
+        """
+        Build the column values of an Employee from API response data
+        """
+        return {
+            "employee_id": api_employee["SSN"],
+            "name": api_employee["FullName"],
+            "card": api_employee.get("Card"),
+            "department": api_employee.get("Department"),
+            "updated_at": datetime.now(),
+        }
+
+class AttendanceRow(NamedTuple):
+    """
+    Column values of one ingested punch; a plain tuple is far smaller than
+    a dict or an ORM instance when a sync holds a batch of them. The
+    employee is still its API code here: the writer resolves it to its key.
+    """
+    att_date: datetime
+    check_time: datetime
+    employee_id: str
+    employee_name: str
+    device_key: int
+
+# Name of the constraint that makes a punch unique; ingestion relies on it
+# for ON CONFLICT DO NOTHING deduplication
+ATTENDANCE_PUNCH_CONSTRAINT = "uq_attendance_records_punch"
 
 class AttendanceRecord(Base):
     __tablename__ = "attendance_records"
+    __table_args__ = (
+        # Also serves GET /attendance?employee_id=... : its leading
+        # (employee_key, check_time) columns cover the filter, range and sort,
+        # so no separate (employee_key, check_time) index is declared
+        UniqueConstraint(
+            "employee_key", "check_time", "device_key",
+            name=ATTENDANCE_PUNCH_CONSTRAINT,
+        ),
+        # Seek order of GET /attendance pages across all employees
+        Index("ix_attendance_records_check_time_uuid", "check_time", "uuid"),
+        # Per-device access (device history, summary refresh after a type change)
+        Index("ix_attendance_records_device_key_check_time", "device_key", "check_time"),
+        # check_time is append-mostly, so a BRIN index keeps range scans
+        # over all employees cheap at a fraction of a btree's size
+        Index("ix_attendance_records_check_time_brin", "check_time", postgresql_using="brin"),
+        # One partition per month (see services/partitions.py): check_time
+        # ranges only touch their months, and old months are detached
+        # instead of deleted. Unique keys must include check_time.
+        {"postgresql_partition_by": "RANGE (check_time)"},
+    )
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    device_uuid = Column(UUID(as_uuid=True), ForeignKey('attendance_devices.uuid'))
+    # Employee and device by compact key; their codes and names are joined
+    # in when read (see ATTENDANCE_RECORD_COLUMNS in attendance_repository)
+    employee_key = Column(Integer, ForeignKey('employees.id'), nullable=False)
+    device_key = Column(SmallInteger, ForeignKey('attendance_devices.device_key'), nullable=False)
     
     # Fields from API response
     att_date = Column(DateTime, nullable=False)  
-    check_time = Column(DateTime, nullable=False)  
-    employee_id = Column(String, nullable=False)  
-    employee_name = Column(String, nullable=False)  
-    machine_alias = Column(String, nullable=False)  
-    machine_serial = Column(String, nullable=False)  
+    check_time = Column(DateTime, primary_key=True, nullable=False)  # Partition key
     
     # Additional fields for data tracking
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     sync_status = Column(String, nullable=False, default="synced")  
-    attendance_status = Column(String, nullable=True)
+    # Manual correction of the status; otherwise the status is derived from
+    # the device type when read (see ATTENDANCE_STATUS in attendance_repository)
+    status_override = Column(String, nullable=True)
     
-    # Relationship
+    # Relationships
     device = relationship("AttendanceDevice", back_populates="attendance_records")
+    employee = relationship("Employee", back_populates="attendance_records")
 
-    @classmethod
-    def from_api_response(cls, api_record, device):
+    @staticmethod
+    def row_from_api_response(api_record, device):
         """
-        Create an AttendanceRecord instance from API response data
+        Build the column values of an AttendanceRecord from API response data
+        as a lightweight AttendanceRow tuple (used by bulk ingestion)
         """
-        record = cls(
+        return AttendanceRow(
             att_date=datetime.fromisoformat(api_record["AttDate"]),
             check_time=datetime.fromisoformat(api_record["AttTime"]),
             employee_id=api_record["EmployeeID"],
             employee_name=api_record["FullName"],
-            machine_alias=api_record["MachineAlias"],
-            machine_serial=api_record["sn"],
-            device_uuid=device.uuid, 
-            device=device 
+            device_key=device.device_key,
         )
-        
-        # Set attendance status based on device type
-        if device and device.device_type:
-            if device.device_type == DeviceType.CHECK_IN:
-                record.attendance_status = "Check In"
-            elif device.device_type == DeviceType.CHECK_OUT:
-                record.attendance_status = "Check Out"
-        
-        return record
\ No newline at end of file
+
+
+class AttendanceSyncState(Base):
+    """
+    Per-source sync watermark: every punch up to `watermark` has been ingested
+    """
+    __tablename__ = "attendance_sync_state"
+
+    source = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    last_success_at = Column(DateTime, nullable=False, default=datetime.now)
+
+
+class DailyAttendanceSummary(Base):
+    """
+    Per-employee, per-day reduction of attendance_records, refreshed by sync
+    for the days it inserts punches into
+    """
+    __tablename__ = "daily_attendance_summary"
+    __table_args__ = (
+        # GET /attendance/daily across all employees pages in (att_date, employee_id) order
+        Index("ix_daily_attendance_summary_att_date_employee_id", "att_date", "employee_id"),
+    )
+
+    employee_id = Column(String, primary_key=True)  # Employee.employee_id; the name is joined in when read
+    att_date = Column(Date, primary_key=True)
+    first_check_in = Column(DateTime, nullable=False)
+    last_check_out = Column(DateTime, nullable=False)
+    punch_count = Column(Integer, nullable=False)
+    devices = Column(ARRAY(String), nullable=False)  # Serial numbers punched on
+    worked_seconds = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+
+class DataGeneration(Base):
+    """
+    Change counter of a data set, bumped in the same transaction as every
+    write to it; read endpoints derive their ETags from it
+    """
+    __tablename__ = "data_generations"
+
+    name = Column(String, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -1,8 +1,9 @@
 # schemas.py
 from pydantic import BaseModel, UUID4, Field
-from datetime import datetime
+from datetime import date, datetime, time
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
+from src.app.constants.enum import AttendanceStatus, SyncJobStatus, SyncMode
 
 
 # Attendance Record Schemas
@@ -15,7 +16,7 @@ class AttendanceRecordBase(BaseModel):
     machine_serial: str
 
 class AttendanceRecordCreate(AttendanceRecordBase):
-    device_uuid: Optional[UUID4] = None
+    device_key: Optional[int] = None
 
 # API Response Schemas
 class APIAttendanceRecord(BaseModel):
@@ -31,10 +32,54 @@ class APIResponseData(BaseModel):
     reason: str
     data: List[List[APIAttendanceRecord]]
 
+class SyncWindowResponse(BaseModel):
+    from_date: datetime
+    to_date: datetime
+
 class AttendanceSyncResponse(BaseModel):
     status: str
     message: str
     records_count: int
+    unknown_serials: Dict[str, int] = {}
+    mode: Optional[str] = None
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    windows: int = 0
+    failed_windows: List[SyncWindowResponse] = []
+    watermark: Optional[datetime] = None
+
+class SyncJobRequest(BaseModel):
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    employee_id: Optional[str] = None
+    mode: SyncMode = SyncMode.incremental
+
+class SyncJobProgress(BaseModel):
+    windows: int = 0
+    windows_fetched: int = 0
+    failed_windows: List[SyncWindowResponse] = []
+    fetched: int = 0
+    parsed: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    unknown_serials: Dict[str, int] = {}
+    phase_seconds: Dict[str, float] = {}
+
+class SyncJobResponse(BaseModel):
+    job_id: str
+    status: SyncJobStatus
+    merged: bool = False
+    mode: SyncMode
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    employee_id: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    error: Optional[str] = None
+    progress: SyncJobProgress
+    watermark: Optional[datetime] = None
 
 class AttendanceRecordResponse(BaseModel):
     uuid: str
@@ -45,16 +90,62 @@ class AttendanceRecordResponse(BaseModel):
     att_date: datetime
     check_time: datetime
     created_at: datetime
-    attendance_status: str
+    # Null while the punch's device has no type and no override is set
+    attendance_status: Optional[str] = None
     sync_status: str
+    status_override: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class AttendanceStatusOverride(BaseModel):
+    # None clears the override so the status follows the device type again
+    status_override: Optional[AttendanceStatus] = None
+
+
 class AttendanceListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     records: List[AttendanceRecordResponse]
+    next_cursor: Optional[str] = None
+
+
+class DailyAttendanceSummaryResponse(BaseModel):
+    employee_id: str
+    employee_name: str
+    att_date: date
+    first_check_in: datetime
+    last_check_out: datetime
+    punch_count: int
+    devices: List[str]
+    worked_seconds: int
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class DailyAttendanceListResponse(BaseModel):
+    records: List[DailyAttendanceSummaryResponse]
+    next_cursor: Optional[str] = None
+
+
+class EmployeeTimesheet(BaseModel):
+    employee_id: str
+    employee_name: str
+    days_present: int
+    worked_seconds: int
+    worked_hours: float
+    late_days: int
+    late_minutes: int
+    missing_check_out_days: int
+
+
+class TimesheetResponse(BaseModel):
+    month: str
+    shift_start: time
+    late_grace_minutes: int
+    employees: List[EmployeeTimesheet]
 
 
 class DeviceType(str, Enum):
@@ -67,7 +158,8 @@ class DeviceSyncStatus(str, Enum):
     ERROR = "error"
 
 class DeviceResponse(BaseModel):
-    id: int = Field(alias='ID')
+    # Devices registered only by migration 007 have a non-numeric ID
+    id: int | str = Field(alias='ID')
     serial_number: str = Field(alias='SerialNumber')
     ip: str | None = Field(default=None, alias='IP')
     mac: str | None = Field(default=None, alias='MAC')
@@ -122,6 +214,12 @@ class DeviceSyncResponse(BaseModel):
     updated_devices: int
     message: str | None = None
 
+class EmployeeSyncResponse(BaseModel):
+    status: str
+    new_employees: int
+    updated_employees: int
+    message: str | None = None
+
 class AttendanceDeviceList(BaseModel):
     devices: List[AttendanceDeviceInDB]
     total: int
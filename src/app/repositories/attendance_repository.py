@@ -0,0 +1,397 @@
+"""
+Query builders shared by the API routes, the service layer and the
+maintenance scripts, so that src/scripts/explain_queries.py plans exactly the
+statements the endpoints run.
+"""
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional, Sequence, Tuple, Union
+from sqlalchemy import (
+    Date, DateTime, Insert, Integer, ScalarSelect, Select, Update, and_, case, cast, func, select, tuple_, update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from src.app.constants.enum import AttendanceStatus
+from src.app.models.entities.orm import (
+    AttendanceDevice,
+    AttendanceRecord,
+    DailyAttendanceSummary,
+    DataGeneration,
+    DeviceType,
+    Employee,
+)
+
+# (employee_key, day) of a daily_attendance_summary row, keyed by the
+# employee's compact key as attendance_records is
+DailyKey = Tuple[int, date]
+
+# Status of a punch: its manual override, else its device's current type.
+# Resolved when read, so changing a device's type rewrites no punches.
+# Queries using it must outer join AttendanceRecord.device.
+resolved_status = func.coalesce(
+    AttendanceRecord.status_override,
+    case(
+        (AttendanceDevice.device_type == DeviceType.CHECK_IN, AttendanceStatus.check_in.value),
+        (AttendanceDevice.device_type == DeviceType.CHECK_OUT, AttendanceStatus.check_out.value),
+    ),
+)
+ATTENDANCE_STATUS = resolved_status.label("attendance_status")
+
+# Columns of AttendanceRecordResponse, in response field order; rows of
+# these serialize directly, without building ORM entities or models.
+# Employee and device names are joined in (see attendance_record_select).
+ATTENDANCE_RECORD_COLUMNS = (
+    AttendanceRecord.uuid,
+    Employee.employee_id,
+    Employee.name.label("employee_name"),
+    func.coalesce(AttendanceDevice.name, "").label("machine_alias"),
+    AttendanceDevice.serial_number.label("machine_serial"),
+    AttendanceRecord.att_date,
+    AttendanceRecord.check_time,
+    AttendanceRecord.created_at,
+    ATTENDANCE_STATUS,
+    AttendanceRecord.sync_status,
+    AttendanceRecord.status_override,
+)
+
+
+def attendance_record_select() -> Select:
+    """
+    ATTENDANCE_RECORD_COLUMNS with the employee and device they come from
+    """
+    return (
+        select(*ATTENDANCE_RECORD_COLUMNS)
+        .join(AttendanceRecord.employee)
+        .outerjoin(AttendanceRecord.device)
+    )
+
+
+def employee_key(employee_id: str) -> ScalarSelect:
+    """
+    Compact key of an employee code, as a scalar subquery: filtering
+    attendance_records on it (rather than on a join) lets the punch
+    constraint's (employee_key, check_time) prefix drive the scan
+    """
+    return select(Employee.id).where(Employee.employee_id == employee_id).scalar_subquery()
+
+
+def attendance_records_query(
+    from_date: datetime,
+    to_date: datetime,
+    employee_id: Optional[str] = None,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+) -> Select:
+    """
+    Rows of GET /attendance (ATTENDANCE_RECORD_COLUMNS): check_time range,
+    optional employee, newest first with uuid as tie-breaker so the order is total
+
+    Args:
+        after: (check_time, uuid) of the last record of the previous page;
+            only records strictly after it in that order are returned
+    """
+    query = attendance_record_select()
+
+    if employee_id:
+        query = query.where(AttendanceRecord.employee_key == employee_key(employee_id))
+
+    if after is not None:
+        query = query.where(
+            tuple_(AttendanceRecord.check_time, AttendanceRecord.uuid) < tuple_(*after)
+        )
+
+    return query.where(
+        AttendanceRecord.check_time >= from_date,
+        AttendanceRecord.check_time <= to_date
+    ).order_by(AttendanceRecord.check_time.desc(), AttendanceRecord.uuid.desc())
+
+
+def attendance_count_query(
+    from_date: datetime, to_date: datetime, employee_id: Optional[str] = None
+) -> Select:
+    """
+    Total of GET /attendance?include_total: same filters, without the joins
+    the count does not need
+    """
+    query = select(func.count()).select_from(AttendanceRecord)
+
+    if employee_id:
+        query = query.where(AttendanceRecord.employee_key == employee_key(employee_id))
+
+    return query.where(
+        AttendanceRecord.check_time >= from_date,
+        AttendanceRecord.check_time <= to_date
+    )
+
+
+def attendance_export_query(
+    from_date: datetime, to_date: datetime, employee_id: Optional[str] = None
+) -> Select:
+    """
+    Rows of GET /attendance/export: same columns and filters as
+    GET /attendance, oldest first
+    """
+    query = attendance_record_select()
+
+    if employee_id:
+        query = query.where(AttendanceRecord.employee_key == employee_key(employee_id))
+
+    return query.where(
+        AttendanceRecord.check_time >= from_date,
+        AttendanceRecord.check_time <= to_date
+    ).order_by(AttendanceRecord.check_time, AttendanceRecord.uuid)
+
+
+def devices_by_serial_query(serial_numbers: Optional[Iterable[str]] = None) -> Select:
+    """
+    Devices looked up by serial number during sync (all devices if None)
+    """
+    query = select(AttendanceDevice)
+    if serial_numbers is not None:
+        query = query.where(AttendanceDevice.serial_number.in_(serial_numbers))
+    return query
+
+
+def status_override_update(
+    record_uuid: uuid.UUID, status_override: Optional[str]
+) -> Update:
+    """
+    Status correction of PATCH /attendance/{record_uuid}/status; returns the
+    (employee_key, day) whose daily summary it affects
+    """
+    return (
+        update(AttendanceRecord)
+        .where(AttendanceRecord.uuid == record_uuid)
+        .values(status_override=status_override)
+        .returning(AttendanceRecord.employee_key, cast(AttendanceRecord.att_date, Date))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def daily_summary_refresh(keys: Union[Sequence[DailyKey], Select]) -> Insert:
+    """
+    Recompute the daily_attendance_summary rows of the given (employee_key,
+    day) keys from raw punches and upsert them
+
+    First check-in and last check-out come from check-in/check-out devices;
+    a day without punches of that kind falls back to its first/last punch.
+
+    Args:
+        keys: Explicit keys (e.g. the punches a sync just inserted), or a
+            select of (employee_key, day) pairs
+    """
+    day = cast(AttendanceRecord.att_date, Date)
+    first_punch = func.min(AttendanceRecord.check_time)
+    last_punch = func.max(AttendanceRecord.check_time)
+    first_check_in = func.coalesce(
+        first_punch.filter(resolved_status == AttendanceStatus.check_in.value), first_punch
+    )
+    last_check_out = func.coalesce(
+        last_punch.filter(resolved_status == AttendanceStatus.check_out.value), last_punch
+    )
+
+    source = select(
+        Employee.employee_id,
+        day,
+        first_check_in,
+        last_check_out,
+        func.count(),
+        func.array_agg(
+            aggregate_order_by(
+                AttendanceDevice.serial_number.distinct(), AttendanceDevice.serial_number
+            )
+        ),
+        cast(func.greatest(func.extract("epoch", last_check_out - first_check_in), 0), Integer),
+        func.localtimestamp(),
+    ).join(AttendanceRecord.employee).outerjoin(AttendanceRecord.device).where(
+        tuple_(AttendanceRecord.employee_key, day).in_(keys)
+    )
+
+    if not isinstance(keys, Select):
+        # Bound check_time as well so the punch constraint's
+        # (employee_key, check_time) prefix drives the scan; att_date may be
+        # a day off check_time for night shifts
+        days = [key_day for _, key_day in keys]
+        source = source.where(
+            AttendanceRecord.check_time >= datetime.combine(min(days) - timedelta(days=1), time.min),
+            AttendanceRecord.check_time < datetime.combine(max(days) + timedelta(days=2), time.min),
+        )
+
+    stmt = pg_insert(DailyAttendanceSummary).from_select(
+        [
+            "employee_id", "att_date", "first_check_in", "last_check_out",
+            "punch_count", "devices", "worked_seconds", "updated_at",
+        ],
+        source.group_by(Employee.employee_id, day),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyAttendanceSummary.employee_id, DailyAttendanceSummary.att_date],
+        set_={
+            column: stmt.excluded[column]
+            for column in (
+                "first_check_in", "last_check_out", "punch_count",
+                "devices", "worked_seconds", "updated_at",
+            )
+        },
+    )
+
+
+def device_daily_keys_query(serial_number: str) -> Select:
+    """
+    (employee_key, day) keys with punches on a device, for refreshing the
+    summaries a device type change affects
+    """
+    device_key = (
+        select(AttendanceDevice.device_key)
+        .where(AttendanceDevice.serial_number == serial_number)
+        .scalar_subquery()
+    )
+    return (
+        select(AttendanceRecord.employee_key, cast(AttendanceRecord.att_date, Date))
+        .where(AttendanceRecord.device_key == device_key)
+        .distinct()
+    )
+
+
+# Columns of DailyAttendanceSummaryResponse, in response field order; the
+# employee name is joined in
+DAILY_SUMMARY_COLUMNS = (
+    DailyAttendanceSummary.employee_id,
+    Employee.name.label("employee_name"),
+    DailyAttendanceSummary.att_date,
+    DailyAttendanceSummary.first_check_in,
+    DailyAttendanceSummary.last_check_out,
+    DailyAttendanceSummary.punch_count,
+    DailyAttendanceSummary.devices,
+    DailyAttendanceSummary.worked_seconds,
+    DailyAttendanceSummary.updated_at,
+)
+
+
+def daily_summary_query(
+    from_date: date,
+    to_date: date,
+    employee_id: Optional[str] = None,
+    after: Optional[DailyKey] = None,
+) -> Select:
+    """
+    Rows of GET /attendance/daily (DAILY_SUMMARY_COLUMNS): day range,
+    optional employee, in (att_date, employee_id) order
+
+    Args:
+        after: (att_date, employee_id) of the last row of the previous page
+    """
+    query = select(*DAILY_SUMMARY_COLUMNS).join(
+        Employee, Employee.employee_id == DailyAttendanceSummary.employee_id
+    )
+
+    if employee_id:
+        query = query.where(DailyAttendanceSummary.employee_id == employee_id)
+
+    if after is not None:
+        query = query.where(
+            tuple_(DailyAttendanceSummary.att_date, DailyAttendanceSummary.employee_id)
+            > tuple_(*after)
+        )
+
+    return query.where(
+        DailyAttendanceSummary.att_date >= from_date,
+        DailyAttendanceSummary.att_date <= to_date,
+    ).order_by(DailyAttendanceSummary.att_date, DailyAttendanceSummary.employee_id)
+
+
+def monthly_timesheet_query(
+    month_start: date,
+    shift_start: time,
+    late_grace: timedelta,
+    employee_id: Optional[str] = None,
+) -> Select:
+    """
+    Per-employee totals of GET /attendance/timesheet for one month
+
+    Punches are ordered by check_time within each (employee, day); a
+    Check In followed directly by a Check Out is a worked interval. A day is
+    late when its first Check In is after shift_start + late_grace, and is
+    missing a check-out when its last punch is a Check In. Punches from
+    devices without a type only count towards days present.
+    """
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    first_day = datetime.combine(month_start, time.min)
+    last_day = datetime.combine(next_month_start, time.min)
+
+    day = cast(AttendanceRecord.att_date, Date)
+    window = {"partition_by": (AttendanceRecord.employee_key, day), "order_by": AttendanceRecord.check_time}
+    punches = select(
+        AttendanceRecord.employee_key,
+        day.label("day"),
+        AttendanceRecord.check_time,
+        ATTENDANCE_STATUS,
+        func.lead(resolved_status).over(**window).label("next_status"),
+        func.lead(AttendanceRecord.check_time).over(**window).label("next_check_time"),
+    ).outerjoin(AttendanceRecord.device).where(
+        AttendanceRecord.att_date >= first_day,
+        AttendanceRecord.att_date < last_day,
+        # att_date is not indexed; bound check_time too (night shifts may
+        # punch on the day after their att_date)
+        AttendanceRecord.check_time >= first_day,
+        AttendanceRecord.check_time < last_day + timedelta(days=1),
+    )
+    if employee_id:
+        punches = punches.where(AttendanceRecord.employee_key == employee_key(employee_id))
+    p = punches.subquery("punches")
+
+    check_in = p.c.attendance_status == AttendanceStatus.check_in.value
+    days = select(
+        p.c.employee_key,
+        p.c.day,
+        func.min(p.c.check_time).filter(check_in).label("first_check_in"),
+        func.coalesce(
+            func.sum(func.extract("epoch", p.c.next_check_time - p.c.check_time))
+            .filter(and_(check_in, p.c.next_status == AttendanceStatus.check_out.value)),
+            0,
+        ).label("worked_seconds"),
+        func.bool_or(and_(check_in, p.c.next_check_time.is_(None))).label("missing_check_out"),
+    ).group_by(p.c.employee_key, p.c.day).subquery("days")
+
+    shift_begins = cast(days.c.day, DateTime) + timedelta(
+        hours=shift_start.hour, minutes=shift_start.minute, seconds=shift_start.second
+    )
+    late = days.c.first_check_in > shift_begins + late_grace
+    # Codes and names are joined in once per employee, after the reduction
+    return select(
+        Employee.employee_id,
+        Employee.name.label("employee_name"),
+        func.count().label("days_present"),
+        cast(func.sum(days.c.worked_seconds), Integer).label("worked_seconds"),
+        func.count().filter(late).label("late_days"),
+        cast(
+            func.coalesce(
+                func.sum(func.extract("epoch", days.c.first_check_in - shift_begins)).filter(late),
+                0,
+            ) / 60,
+            Integer,
+        ).label("late_minutes"),
+        func.count().filter(days.c.missing_check_out).label("missing_check_out_days"),
+    ).join(Employee, Employee.id == days.c.employee_key).group_by(Employee.id).order_by(Employee.employee_id)
+
+
+def generation_query(name: str) -> Select:
+    """
+    Current generation of a data set (no row means generation 0)
+    """
+    return select(DataGeneration.generation).where(DataGeneration.name == name)
+
+
+def generation_bump(name: str) -> Insert:
+    """
+    Increment a data set's generation; run it in the transaction that
+    changes the data so readers never see new data under an old generation
+    """
+    stmt = pg_insert(DataGeneration).values(
+        name=name, generation=1, updated_at=func.localtimestamp()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DataGeneration.name],
+        set_={
+            "generation": DataGeneration.generation + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
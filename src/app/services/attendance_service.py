@@ -1,21 +1,177 @@
+import asyncio
+import logging
 import httpx
-from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from time import perf_counter
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any, Sequence, Set, Tuple, Union
+from sqlalchemy import Select, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.models.entities.orm import (
+    ATTENDANCE_PUNCH_CONSTRAINT,
     AttendanceRecord,
+    AttendanceRow,
     AttendanceDevice,
+    AttendanceSyncState,
     DeviceSyncStatus,
+    Employee,
 )
+from src.app.constants.enum import DataGenerationName, SyncMode
+from src.app.core.cache import AsyncTTLCache
 from src.app.core.config import settings
+from src.app.core.json_stream import JSONEnvelopeStream
+from src.app.core.metrics import SYNC_RECORDS, SYNC_RUNS, UPSTREAM_ERRORS, UPSTREAM_REQUEST_DURATION
+from src.app.services.partitions import ensure_attendance_partitions
+from src.app.repositories.attendance_repository import (
+    DailyKey,
+    daily_summary_refresh,
+    devices_by_serial_query,
+    generation_bump,
+)
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth retrying; everything else fails immediately
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+SyncWindow = Tuple[datetime, datetime]
+
+
+@dataclass
+class AttendanceSyncResult:
+    """
+    Outcome of a sync, updated in place while it runs so callers holding a
+    reference (e.g. background jobs) can report live progress
+    """
+    mode: SyncMode = SyncMode.incremental
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    windows: int = 0
+    windows_fetched: int = 0
+    fetched: int = 0
+    parsed: int = 0
+    inserted: int = 0
+    unknown_serials: Dict[str, int] = field(default_factory=dict)
+    failed_windows: List[SyncWindow] = field(default_factory=list)
+    watermark: Optional[datetime] = None
+    # Seconds spent waiting for the upstream, parsing and writing to the database
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def skipped(self) -> int:
+        """
+        Parsed rows the database dropped as already stored
+        """
+        return self.parsed - self.inserted
+
+    def add_phase_time(self, phase: str, started: float) -> float:
+        """
+        Add the time elapsed since `started` (perf_counter) to a phase and
+        return the current perf_counter for chaining
+        """
+        now = perf_counter()
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + now - started
+        return now
+
+
+@dataclass
+class SyncBatch:
+    """
+    Parsed rows of one window, in insert-sized chunks. The last batch of a
+    window is marked done and carries the window's totals, or its error.
+    """
+    window: SyncWindow
+    rows: List[AttendanceRow] = field(default_factory=list)
+    fetched: int = 0
+    parse_seconds: float = 0.0
+    done: bool = False
+    # Latest punch parsed for storing, and earliest punch skipped for an
+    # unknown device within SYNC_UNKNOWN_DEVICE_GRACE_HOURS: the watermark
+    # must not pass either
+    latest: Optional[datetime] = None
+    earliest_skipped: Optional[datetime] = None
+    unknown_serials: Dict[str, int] = field(default_factory=dict)
+    # Skipped punches past the grace period, which no longer hold the watermark
+    abandoned_serials: Dict[str, int] = field(default_factory=dict)
+    error: Optional[Exception] = None
 
 
 class AttendanceService:
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
         self.base_url = settings.EXTERNAL_API_URL
         self.credentials = {
             "user": settings.EXTERNAL_API_USER,
             "pass": settings.EXTERNAL_API_PASSWORD,
         }
+        # Device and employee lists change about once a day
+        self.lookup_cache: AsyncTTLCache[List[Dict[str, Any]]] = AsyncTTLCache(
+            ttl_seconds=settings.LOOKUP_CACHE_TTL_SECONDS,
+            max_size=settings.LOOKUP_CACHE_MAX_SIZE,
+        )
+
+    @asynccontextmanager
+    async def _post_stream(self, payload: Dict[str, Any]) -> AsyncIterator[httpx.Response]:
+        """
+        POST to the upstream API on the shared client and hand back the
+        response before its body is read, retrying transient failures
+        (transport errors and retryable statuses) with exponential backoff
+        """
+        max_retries = settings.EXTERNAL_API_MAX_RETRIES
+        api = payload["name"]
+        for attempt in range(max_retries + 1):
+            request = self.client.build_request("POST", self.base_url, json=payload)
+            started = perf_counter()
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError as e:
+                UPSTREAM_ERRORS.labels(api=api, reason=type(e).__name__).inc()
+                if attempt == max_retries:
+                    raise
+                reason = repr(e)
+            else:
+                UPSTREAM_REQUEST_DURATION.labels(api=api).observe(perf_counter() - started)
+                if response.is_error:
+                    UPSTREAM_ERRORS.labels(api=api, reason=f"status {response.status_code}").inc()
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt == max_retries
+                ):
+                    try:
+                        response.raise_for_status()
+                        yield response
+                    finally:
+                        await response.aclose()
+                    return
+                await response.aclose()
+                reason = f"status {response.status_code}"
+
+            delay = settings.EXTERNAL_API_RETRY_BACKOFF * (2 ** attempt)
+            logger.warning(
+                f"Upstream {payload['name']} failed ({reason}), "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+    async def _stream_api_request(
+        self, name: str, params: List[str] = []
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Make a generic API request and yield the records of its response data
+        one by one while the body is still being received
+        """
+        payload = {**self.credentials, "name": name, "param": params}
+
+        async with self._post_stream(payload) as response:
+            envelope = JSONEnvelopeStream(response.aiter_text())
+            async for record in envelope.items():
+                yield record
+
+        if envelope.fields.get("result") != "success":
+            UPSTREAM_ERRORS.labels(api=name, reason="api error").inc()
+            raise ValueError(f"API Error: {envelope.fields.get('reason', 'Unknown error')}")
 
     async def _make_api_request(
         self, name: str, params: List[str] = []
@@ -26,27 +182,13 @@ class AttendanceService:
         Returns:
             List of dictionaries containing the API response data
         """
-        payload = {**self.credentials, "name": name, "param": params}
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.base_url, json=payload, timeout=30.0)
-            response.raise_for_status()
-
-            data = response.json()
-            if data["result"] != "success":
-                raise ValueError(f"API Error: {data.get('reason', 'Unknown error')}")
+        return [record async for record in self._stream_api_request(name, params)]
 
-            return (
-                data["data"][0]
-                if isinstance(data["data"], list) and data["data"]
-                else []
-            )
-
-    async def fetch_attendance_data(
+    def stream_attendance_data(
         self, from_date: datetime, to_date: datetime, employee_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Fetch attendance data from the external API
+        Stream attendance data from the external API
         """
         params = [
             "FromDate",
@@ -58,63 +200,497 @@ class AttendanceService:
         if employee_id:
             params.extend(["EmployeeID", employee_id])
 
-        return await self._make_api_request("API_AttendanceList", params)
+        return self._stream_api_request("API_AttendanceList", params)
+
+    @staticmethod
+    def split_windows(
+        from_date: datetime, to_date: datetime, window_days: int
+    ) -> List[SyncWindow]:
+        """
+        Split a range into consecutive windows of window_days whole days (the
+        upstream's filter granularity), so no two windows fetch the same day
+        """
+        if window_days < 1:
+            raise ValueError("Window days must be at least 1")
+        windows = []
+        start = from_date
+        while start <= to_date:
+            next_start = datetime.combine(
+                start.date() + timedelta(days=window_days), time.min
+            )
+            windows.append((start, min(next_start - timedelta(microseconds=1), to_date)))
+            start = next_start
+        return windows
+
+    async def _parse_window(
+        self,
+        window: SyncWindow,
+        employee_id: Optional[str],
+        devices: Dict[str, AttendanceDevice],
+        queue: "asyncio.Queue[SyncBatch]",
+    ) -> None:
+        """
+        Stream one window from the upstream and put its parsed rows on the
+        queue in ATTENDANCE_INSERT_BATCH_SIZE batches, ending with a done batch
+        """
+        batch_size = settings.ATTENDANCE_INSERT_BATCH_SIZE
+        batch = SyncBatch(window=window)
+        latest: Optional[datetime] = None
+        earliest_skipped: Optional[datetime] = None
+        unknown_serials: Dict[str, int] = {}
+        abandoned_serials: Dict[str, int] = {}
+        # Punches of unknown devices before this no longer wait for them
+        grace_cutoff = datetime.now() - timedelta(hours=settings.SYNC_UNKNOWN_DEVICE_GRACE_HOURS)
+
+        records = self.stream_attendance_data(window[0], window[1], employee_id)
+        async with aclosing(records):
+            async for record in records:
+                started = perf_counter()
+                check_time = datetime.fromisoformat(record["AttTime"])
+                # The upstream filters on whole days; keep only the requested window
+                if not window[0] <= check_time <= window[1]:
+                    continue
+                batch.fetched += 1
+
+                device = devices.get(record["sn"])
+                if device is None:
+                    unknown_serials[record["sn"]] = unknown_serials.get(record["sn"], 0) + 1
+                    if check_time < grace_cutoff:
+                        abandoned_serials[record["sn"]] = abandoned_serials.get(record["sn"], 0) + 1
+                    else:
+                        earliest_skipped = check_time if earliest_skipped is None else min(earliest_skipped, check_time)
+                else:
+                    batch.rows.append(AttendanceRecord.row_from_api_response(record, device))
+                    latest = check_time if latest is None else max(latest, check_time)
+                batch.parse_seconds += perf_counter() - started
+
+                if len(batch.rows) >= batch_size:
+                    # Blocks while the queue is full, which stops reading the
+                    # upstream body until the database catches up
+                    await queue.put(batch)
+                    batch = SyncBatch(window=window)
+
+        batch.done = True
+        batch.latest = latest
+        batch.earliest_skipped = earliest_skipped
+        batch.unknown_serials = unknown_serials
+        batch.abandoned_serials = abandoned_serials
+        await queue.put(batch)
+
+    async def stream_attendance_batches(
+        self,
+        from_date: datetime,
+        to_date: datetime,
+        devices: Dict[str, AttendanceDevice],
+        employee_id: Optional[str] = None,
+    ) -> AsyncIterator["SyncBatch"]:
+        """
+        Fetch a range as SYNC_WINDOW_DAYS windows with at most
+        SYNC_MAX_CONCURRENT_WINDOWS requests in flight, yielding parsed row
+        batches as they are produced
+
+        Batches go through a queue of SYNC_QUEUE_MAX_BATCHES, so memory stays
+        bounded by the batch size whatever the range. Each window ends with a
+        done batch carrying its totals, or its error if it still failed after
+        SYNC_WINDOW_RETRIES retries. A retried window resends rows it already
+        sent; the insert drops them as duplicates.
+        """
+        semaphore = asyncio.Semaphore(settings.SYNC_MAX_CONCURRENT_WINDOWS)
+        queue: "asyncio.Queue[SyncBatch]" = asyncio.Queue(settings.SYNC_QUEUE_MAX_BATCHES)
+        max_retries = settings.SYNC_WINDOW_RETRIES
+
+        async def fetch_window(window: SyncWindow) -> None:
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    try:
+                        await self._parse_window(window, employee_id, devices, queue)
+                        return
+                    except (httpx.HTTPError, ValueError) as e:
+                        if attempt == max_retries:
+                            error: Exception = e
+                            break
+                        logger.warning(
+                            f"Attendance window {window[0]:%Y-%m-%d}..{window[1]:%Y-%m-%d} "
+                            f"failed ({e!r}), retrying ({attempt + 1}/{max_retries})"
+                        )
+                        await asyncio.sleep(settings.EXTERNAL_API_RETRY_BACKOFF * (2 ** attempt))
+                    except Exception as e:
+                        error = e
+                        break
+                await queue.put(SyncBatch(window=window, done=True, error=error))
 
-    async def fetch_device_list(self) -> List[Dict[str, Any]]:
+        windows = self.split_windows(from_date, to_date, settings.SYNC_WINDOW_DAYS)
+        tasks = [asyncio.create_task(fetch_window(window)) for window in windows]
+        try:
+            pending = len(windows)
+            while pending:
+                batch = await queue.get()
+                if batch.done:
+                    pending -= 1
+                yield batch
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_device_list(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """
-        Fetch list of all devices from the external API
+        Fetch list of all devices from the external API (cached)
+
+        Args:
+            refresh: Bypass the cache and fetch from the API
         """
-        return await self._make_api_request("API_DeviceList")
+        return await self.lookup_cache.get_or_load(
+            ("API_DeviceList",),
+            lambda: self._make_api_request("API_DeviceList"),
+            refresh=refresh,
+        )
 
     async def fetch_employees_by_device(
-        self, serial_number: str
+        self, serial_number: str, refresh: bool = False
     ) -> List[Dict[str, Any]]:
         """
-        Fetch list of employees associated with a specific device
+        Fetch list of employees associated with a specific device (cached)
 
         Args:
             serial_number: The device serial number
+            refresh: Bypass the cache and fetch from the API
 
         Returns:
             List of employee records associated with the device
         """
         params = ["SerialNumber", serial_number]
-        return await self._make_api_request("API_EmployeeListByDevices", params)
+        return await self.lookup_cache.get_or_load(
+            ("API_EmployeeListByDevices", serial_number),
+            lambda: self._make_api_request("API_EmployeeListByDevices", params),
+            refresh=refresh,
+        )
+
+    async def get_device_map(
+        self, session: AsyncSession, serial_numbers: Optional[Set[str]] = None
+    ) -> Dict[str, AttendanceDevice]:
+        """
+        Load devices in a single query, keyed by serial number
+
+        Args:
+            serial_numbers: Restrict the lookup to these serials (all devices if None)
+        """
+        result = await session.execute(devices_by_serial_query(serial_numbers))
+        return {device.serial_number: device for device in result.scalars()}
+
+    async def resolve_employee_keys(
+        self,
+        session: AsyncSession,
+        rows: Sequence[AttendanceRow],
+        employee_keys: Dict[str, int],
+    ) -> None:
+        """
+        Add the keys of the rows' employees missing from employee_keys (code
+        to key), registering employees not synced yet under the name on
+        their punches. Existing names are left alone: sync_employees owns them.
+        """
+        missing = {row.employee_id: row.employee_name for row in rows if row.employee_id not in employee_keys}
+        if not missing:
+            return
+        await session.execute(
+            pg_insert(Employee).on_conflict_do_nothing(index_elements=[Employee.employee_id]),
+            [
+                {"employee_id": employee_id, "name": name, "updated_at": datetime.now()}
+                for employee_id, name in missing.items()
+            ],
+        )
+        result = await session.execute(
+            select(Employee.employee_id, Employee.id).where(Employee.employee_id.in_(missing))
+        )
+        employee_keys.update(result.tuples().all())
 
-    def parse_attendance_records(
-        self, api_records: List[Dict[str, Any]], session
-    ) -> List[AttendanceRecord]:
+    async def store_attendance_records(
+        self,
+        session: AsyncSession,
+        rows: Sequence[AttendanceRow],
+        employee_keys: Optional[Dict[str, int]] = None,
+    ) -> List[DailyKey]:
         """
-        Parse API response into AttendanceRecord objects
+        Insert parsed rows in fixed-size batches. Duplicates are dropped by the
+        database through the unique punch constraint, so concurrent syncs are safe.
+
+        Args:
+            employee_keys: Employee code to key cache, kept by the caller
+                across batches so known employees cost no lookup
+
+        Returns:
+            (employee_key, day) of each row actually inserted
+        """
+        if employee_keys is None:
+            employee_keys = {}
+        await self.resolve_employee_keys(session, rows, employee_keys)
+
+        inserted: List[DailyKey] = []
+        batch_size = settings.ATTENDANCE_INSERT_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            # Parameter list rather than .values(): the statement is compiled
+            # once and cached, and the driver batches the rows (insertmanyvalues)
+            result = await session.execute(
+                pg_insert(AttendanceRecord)
+                .on_conflict_do_nothing(constraint=ATTENDANCE_PUNCH_CONSTRAINT)
+                .returning(AttendanceRecord.employee_key, AttendanceRecord.att_date),
+                [
+                    {
+                        "att_date": row.att_date,
+                        "check_time": row.check_time,
+                        "employee_key": employee_keys[row.employee_id],
+                        "device_key": row.device_key,
+                    }
+                    for row in rows[start:start + batch_size]
+                ],
+            )
+            inserted.extend(
+                (key, att_date.date()) for key, att_date in result
+            )
+        return inserted
+
+    async def refresh_daily_summary(
+        self, session: AsyncSession, keys: Union[Iterable[DailyKey], Select]
+    ) -> None:
+        """
+        Recompute daily_attendance_summary for the given (employee_key, day)
+        keys, in the caller's transaction
+        """
+        if not isinstance(keys, Select):
+            keys = sorted(set(keys))
+            if not keys:
+                return
+        await session.execute(daily_summary_refresh(keys))
+
+    @staticmethod
+    def covered_until(
+        windows: Dict[SyncWindow, Tuple[Optional[datetime], Optional[datetime]]],
+        failed_windows: Iterable[SyncWindow],
+    ) -> Optional[datetime]:
+        """
+        Time the watermark may advance to: every punch up to it was stored.
+        Only the leading run of successful windows counts, as a window
+        after a failed one would leave a gap behind the watermark, and it
+        stops short of the first punch skipped for an unknown device, so a
+        sync after the device is registered fetches that punch again.
+        Punches past SYNC_UNKNOWN_DEVICE_GRACE_HOURS are not reported as
+        skipped, so a device that is never registered holds it back for at
+        most that long.
+
+        Args:
+            windows: (latest stored, earliest skipped) check_time of each
+                successful window
+        """
+        latest = None
+        for window in sorted(windows.keys() | set(failed_windows)):
+            if window not in windows:
+                break
+            stored, skipped = windows[window]
+            if skipped is not None:
+                return skipped - timedelta(microseconds=1)
+            if stored is not None:
+                latest = stored
+        return latest
+
+    @staticmethod
+    def sync_source(employee_id: Optional[str] = None) -> str:
+        """
+        Watermark key of an upstream attendance query; employee-filtered syncs
+        keep their own watermark so they never advance the plant-wide one
+        """
+        if employee_id:
+            return f"API_AttendanceList:{employee_id}"
+        return "API_AttendanceList"
+
+    async def get_watermark(
+        self, session: AsyncSession, source: str
+    ) -> Optional[datetime]:
+        return await session.scalar(
+            select(AttendanceSyncState.watermark).where(
+                AttendanceSyncState.source == source
+            )
+        )
+
+    async def advance_watermark(
+        self, session: AsyncSession, source: str, watermark: datetime
+    ) -> None:
+        """
+        Move a source's watermark forward (never backwards, even when two
+        syncs race), in the caller's transaction
+        """
+        stmt = pg_insert(AttendanceSyncState).values(
+            source=source, watermark=watermark, last_success_at=datetime.now()
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[AttendanceSyncState.source],
+                set_={
+                    "watermark": func.greatest(
+                        AttendanceSyncState.watermark, stmt.excluded.watermark
+                    ),
+                    "last_success_at": stmt.excluded.last_success_at,
+                },
+            )
+        )
+
+    async def sync_attendance(
+        self,
+        session: AsyncSession,
+        to_date: datetime,
+        from_date: Optional[datetime] = None,
+        employee_id: Optional[str] = None,
+        mode: SyncMode = SyncMode.incremental,
+        result: Optional[AttendanceSyncResult] = None,
+    ) -> AttendanceSyncResult:
+        """
+        Fetch, parse and store attendance for a window, then advance the
+        source watermark in the same transaction
+
+        In incremental mode the window starts SYNC_OVERLAP_MINUTES before the
+        stored watermark; without a watermark (and in full mode) it starts at
+        from_date, or SYNC_INITIAL_LOOKBACK_DAYS before to_date.
+
+        Args:
+            result: Optional result to fill in as the sync progresses
         """
-        records = []
-        for record in api_records:
-            # Get the device for this record
-            device = session.query(AttendanceDevice).filter_by(
-                serial_number=record["sn"]
-            ).first()
-            if device:
-                records.append(AttendanceRecord.from_api_response(record, device))
-        return records
+        try:
+            result = await self._sync_attendance(
+                session, to_date, from_date, employee_id, mode, result or AttendanceSyncResult()
+            )
+        except Exception:
+            SYNC_RUNS.labels(mode=mode.value, outcome="failed").inc()
+            raise
+        SYNC_RUNS.labels(mode=mode.value, outcome="partial" if result.failed_windows else "success").inc()
+        return result
+
+    async def _sync_attendance(
+        self,
+        session: AsyncSession,
+        to_date: datetime,
+        from_date: Optional[datetime],
+        employee_id: Optional[str],
+        mode: SyncMode,
+        result: AttendanceSyncResult,
+    ) -> AttendanceSyncResult:
+        source = self.sync_source(employee_id)
+        watermark = await self.get_watermark(session, source)
+
+        if mode == SyncMode.incremental and watermark is not None:
+            from_date = watermark - timedelta(minutes=settings.SYNC_OVERLAP_MINUTES)
+        elif from_date is None:
+            from_date = to_date - timedelta(days=settings.SYNC_INITIAL_LOOKBACK_DAYS)
+
+        if from_date > to_date:
+            raise ValueError("From date must be before or equal to to date")
+
+        result.mode = mode
+        result.from_date = from_date
+        result.to_date = to_date
+        result.watermark = watermark
+        result.windows = len(
+            self.split_windows(from_date, to_date, settings.SYNC_WINDOW_DAYS)
+        )
+
+        # Punches can only be stored in a month that has a partition
+        await ensure_attendance_partitions(session, from_date, to_date)
+
+        # (latest stored, earliest skipped) check_time per window, to advance the watermark
+        window_coverage: Dict[SyncWindow, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        first_error: Optional[Exception] = None
+        devices = await self.get_device_map(session)
+        employee_keys: Dict[str, int] = {}
 
-    async def sync_devices(self, session) -> tuple[int, int]:
+        # Windows are parsed concurrently; this loop is the single writer
+        mark = perf_counter()
+        batches = self.stream_attendance_batches(from_date, to_date, devices, employee_id)
+        async with aclosing(batches):
+            async for batch in batches:
+                mark = result.add_phase_time("fetch", mark)
+                result.phase_seconds["parse"] = (
+                    result.phase_seconds.get("parse", 0.0) + batch.parse_seconds
+                )
+                result.fetched += batch.fetched
+                SYNC_RECORDS.labels(outcome="fetched").inc(batch.fetched)
+                if batch.rows:
+                    result.parsed += len(batch.rows)
+                    inserted = await self.store_attendance_records(session, batch.rows, employee_keys)
+                    result.inserted += len(inserted)
+                    # Only days that received new punches change
+                    await self.refresh_daily_summary(session, inserted)
+                    if inserted:
+                        await session.execute(generation_bump(DataGenerationName.attendance))
+                    await session.commit()
+                    SYNC_RECORDS.labels(outcome="inserted").inc(len(inserted))
+                    SYNC_RECORDS.labels(outcome="duplicate").inc(len(batch.rows) - len(inserted))
+                    mark = result.add_phase_time("store", mark)
+                if not batch.done:
+                    continue
+
+                window = batch.window
+                if batch.error is not None:
+                    logger.error(
+                        f"Attendance window {window[0]:%Y-%m-%d}..{window[1]:%Y-%m-%d} failed: {batch.error}"
+                    )
+                    result.failed_windows.append(window)
+                    first_error = first_error or batch.error
+                    continue
+                result.windows_fetched += 1
+                window_coverage[window] = (batch.latest, batch.earliest_skipped)
+                for serial, count in batch.unknown_serials.items():
+                    result.unknown_serials[serial] = result.unknown_serials.get(serial, 0) + count
+                SYNC_RECORDS.labels(outcome="unknown_device").inc(sum(batch.unknown_serials.values()))
+                if batch.abandoned_serials:
+                    logger.warning(
+                        f"Attendance window {window[0]:%Y-%m-%d}..{window[1]:%Y-%m-%d}: "
+                        f"{sum(batch.abandoned_serials.values())} punches of unregistered devices "
+                        f"{', '.join(sorted(batch.abandoned_serials))} are older than "
+                        f"{settings.SYNC_UNKNOWN_DEVICE_GRACE_HOURS}h and no longer hold the watermark"
+                    )
+
+        if result.failed_windows and not result.windows_fetched:
+            raise first_error  # type: ignore
+
+        if not devices:
+            # Nothing could be stored; leave the watermark for a sync after
+            # the device sync
+            logger.warning("No devices registered; attendance watermark not advanced")
+        # A range that starts after the watermark would leave a gap behind it
+        elif watermark is None or from_date <= watermark:
+            latest = self.covered_until(window_coverage, result.failed_windows)
+            if latest is not None:
+                await self.advance_watermark(session, source, latest)
+                await session.commit()
+                result.watermark = max(latest, watermark) if watermark else latest
+
+        return result
+
+    async def sync_devices(
+        self, session: AsyncSession, refresh: bool = False
+    ) -> tuple[int, int]:
         """
         Sync devices from external API to database
 
+        Args:
+            refresh: Bypass the device list cache
+
         Returns:
             tuple[int, int]: (new_devices_count, updated_devices_count)
         """
         # Fetch current devices from API
-        api_devices = await self.fetch_device_list()
+        api_devices = await self.fetch_device_list(refresh=refresh)
 
         # Track counts
         new_devices = 0
         updated_devices = 0
+        renamed_devices = 0
+        # Added, changed or deactivated devices; the devices generation only
+        # moves for these, so unchanged lists keep answering 304
+        changed_devices = 0
 
         # Get existing devices from database
+        result = await session.execute(select(AttendanceDevice))
         existing_devices = {
             device.serial_number: device
-            for device in session.query(AttendanceDevice).all()
+            for device in result.scalars().all()
         }
 
         for api_device in api_devices:
@@ -122,20 +698,88 @@ class AttendanceService:
 
             if serial_number in existing_devices:
                 device = existing_devices[serial_number]
-                device.update_from_api(api_device)
+                previous_name = device.name
+                if device.update_from_api(api_device):
+                    changed_devices += 1
                 updated_devices += 1
+                if device.name != previous_name:
+                    renamed_devices += 1
             else:
                 device = AttendanceDevice.from_api_response(api_device)
                 session.add(device)
                 new_devices += 1
+                changed_devices += 1
 
         api_serial_numbers = {d["SerialNumber"] for d in api_devices}
         for device in existing_devices.values():
             if device.serial_number not in api_serial_numbers:
+                if device.is_active:
+                    changed_devices += 1
                 device.is_active = False
                 device.sync_status = DeviceSyncStatus.INACTIVE
 
         # Commit changes
-        session.commit()
+        if changed_devices:
+            await session.execute(generation_bump(DataGenerationName.devices))
+        if renamed_devices:
+            # Aliases served by /attendance come from this table
+            await session.execute(generation_bump(DataGenerationName.attendance))
+        await session.commit()
 
         return new_devices, updated_devices
+
+    async def sync_employees(
+        self, session: AsyncSession, refresh: bool = False
+    ) -> tuple[int, int]:
+        """
+        Sync employees enrolled on the active devices from the external API
+        to database. Names, cards and departments follow the API; employees
+        no longer listed are kept, as their punches still reference them.
+
+        Args:
+            refresh: Bypass the employee list cache
+
+        Returns:
+            tuple[int, int]: (new_employees_count, updated_employees_count)
+        """
+        serial_numbers = (
+            await session.scalars(
+                select(AttendanceDevice.serial_number).where(AttendanceDevice.is_active.is_(True))
+            )
+        ).all()
+
+        # An employee enrolled on several devices is listed once per device
+        api_employees: Dict[str, Dict[str, Any]] = {}
+        for serial_number in serial_numbers:
+            for api_employee in await self.fetch_employees_by_device(serial_number, refresh=refresh):
+                api_employees[api_employee["SSN"]] = Employee.values_from_api_response(api_employee)
+
+        result = await session.execute(
+            select(Employee.employee_id, Employee.name, Employee.card, Employee.department)
+        )
+        existing = {employee_id: (name, card, department) for employee_id, name, card, department in result}
+
+        new_employees = [values for employee_id, values in api_employees.items() if employee_id not in existing]
+        changed_employees = [
+            values for employee_id, values in api_employees.items()
+            if employee_id in existing
+            and existing[employee_id] != (values["name"], values["card"], values["department"])
+        ]
+
+        if new_employees or changed_employees:
+            stmt = pg_insert(Employee)
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Employee.employee_id],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in ("name", "card", "department", "updated_at")
+                    },
+                ),
+                new_employees + changed_employees,
+            )
+            # Names served by /attendance come from this table
+            await session.execute(generation_bump(DataGenerationName.attendance))
+        await session.commit()
+
+        return len(new_employees), len(changed_employees)
@@ -0,0 +1,178 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.constants.enum import DataGenerationName
+from src.app.core.config import settings
+from src.app.db.postgres import advisory_lock_key
+from src.app.models.entities.orm import AttendanceRecord
+from src.app.repositories.attendance_repository import generation_bump
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = AttendanceRecord.__tablename__
+# attendance_records_p2026_10 holds check_time in [2026-10-01, 2026-11-01)
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def retention_cutoff(retention_months: int) -> Optional[date]:
+    """
+    First month kept by the retention policy, or None if every month is kept
+    """
+    if retention_months <= 0:
+        return None
+    return add_months(month_start(date.today()), -retention_months)
+
+
+async def list_attendance_partitions(session: AsyncSession) -> Dict[date, str]:
+    """
+    Monthly partitions attached to attendance_records, keyed by month.
+    Partitions not named by partition_name are left alone.
+    """
+    rows = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def ensure_attendance_partitions(
+    session: AsyncSession, from_date: datetime, to_date: datetime
+) -> List[str]:
+    """
+    Create the missing monthly partitions covering from_date..to_date and
+    commit. Rows whose month has no partition cannot be inserted, so sync
+    calls this for its window before storing anything.
+
+    Returns:
+        Names of the partitions created
+
+    Raises:
+        ValueError: If from_date lies in a month the retention policy removes,
+            which the next maintenance run would detach again
+    """
+    cutoff = retention_cutoff(settings.ATTENDANCE_RETENTION_MONTHS)
+    if cutoff is not None and from_date.date() < cutoff:
+        raise ValueError(
+            f"From date must not be before {cutoff.isoformat()}: older months are "
+            f"removed by the attendance retention ({settings.ATTENDANCE_RETENTION_MONTHS} months)"
+        )
+
+    months = []
+    month = month_start(from_date)
+    while month <= to_date.date():
+        months.append(month)
+        month = add_months(month, 1)
+
+    existing = await list_attendance_partitions(session)
+    missing = [month for month in months if month not in existing]
+    if not missing:
+        return []
+
+    # Creating a partition briefly locks the parent; serialize the workers
+    # doing it, and look again once the lock is held for partitions another
+    # worker created meanwhile
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"),
+        {"key": advisory_lock_key("attendance_partitions")},
+    )
+    existing = await list_attendance_partitions(session)
+    missing = [month for month in missing if month not in existing]
+    # No IF NOT EXISTS: a plain table under the partition's name must fail
+    # here rather than leave the month without a partition
+    for month in missing:
+        await session.execute(
+            text(
+                f"CREATE TABLE {partition_name(month)} "
+                f"PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+    await session.commit()
+    if not missing:
+        return []
+    logger.info(f"Created attendance partitions for {', '.join(f'{m:%Y-%m}' for m in missing)}")
+    return [partition_name(month) for month in missing]
+
+
+async def apply_attendance_retention(
+    session: AsyncSession, retention_months: int, drop: bool = False
+) -> List[str]:
+    """
+    Detach (or drop) the partitions whose whole month lies more than
+    retention_months before the current month, and commit. Detached
+    partitions remain as plain tables for archiving, renamed with an
+    _archived suffix and the time of the detach, so neither the month's
+    partition name nor an earlier archive of the month is ever taken. Daily
+    summaries of those months are kept.
+
+    Returns:
+        Names of the partitions removed
+    """
+    cutoff = retention_cutoff(retention_months)
+    if cutoff is None:
+        return []
+    expired = [
+        name
+        for month, name in sorted((await list_attendance_partitions(session)).items())
+        if month < cutoff
+    ]
+    archived_at = f"{datetime.now():%Y%m%d%H%M%S}"
+    for name in expired:
+        await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            await session.execute(text(f"DROP TABLE {name}"))
+        else:
+            await session.execute(text(f"ALTER TABLE {name} RENAME TO {name}_archived_{archived_at}"))
+    if expired:
+        # Clients holding tags of the removed punches must refetch
+        await session.execute(generation_bump(DataGenerationName.attendance))
+    await session.commit()
+    if expired:
+        logger.info(
+            f"{'Dropped' if drop else 'Detached'} attendance partitions {', '.join(expired)}"
+        )
+    return expired
+
+
+async def maintain_attendance_partitions(session: AsyncSession) -> None:
+    """
+    Create partitions for the current month and ATTENDANCE_PARTITION_MONTHS_AHEAD
+    months after it, then apply the retention policy
+    """
+    today = datetime.now()
+    await ensure_attendance_partitions(
+        session,
+        today,
+        datetime.combine(
+            add_months(month_start(today), settings.ATTENDANCE_PARTITION_MONTHS_AHEAD),
+            datetime.min.time(),
+        ),
+    )
+    await apply_attendance_retention(
+        session, settings.ATTENDANCE_RETENTION_MONTHS, settings.ATTENDANCE_RETENTION_DROP
+    )
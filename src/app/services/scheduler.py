@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from src.app.core.config import settings
+from src.app.db.postgres import advisory_lock_key, get_async_postgres
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.services.attendance_service import AttendanceService
+from src.app.services.partitions import maintain_attendance_partitions
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class SyncScheduler:
+    """
+    Runs periodic jobs on the worker's event loop. Every run first takes a
+    Postgres advisory lock named after the job, so when several workers (or
+    replicas) run a scheduler, only one of them executes a given job at a time.
+    """
+    def __init__(self) -> None:
+        self._jobs: List[Tuple[str, float, Job, Optional[str]]] = []
+        self._tasks: List[asyncio.Task] = []
+        # Set once a job's first run is over, whatever its outcome
+        self._first_run_done: Dict[str, asyncio.Event] = {}
+
+    def add_job(
+        self, name: str, interval_seconds: float, job: Job, after: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            after: Job whose first run must be over before this job first runs
+        """
+        self._jobs.append((name, interval_seconds, job, after))
+        self._first_run_done[name] = asyncio.Event()
+
+    def start(self) -> None:
+        for name, interval_seconds, job, after in self._jobs:
+            self._tasks.append(
+                asyncio.create_task(self._run_periodically(name, interval_seconds, job, after))
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def run_locked(self, name: str, job: Job) -> bool:
+        """
+        Run a job if no other worker holds its lock
+
+        Returns:
+            True if the job ran, False if another worker was running it
+        """
+        key = advisory_lock_key(name)
+        async with get_async_postgres().engine.connect() as conn:
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+            )
+            # Session-level lock: survives the commit, which avoids holding
+            # the lock connection idle in transaction while the job runs
+            await conn.commit()
+            if not acquired:
+                logger.debug(f"Skipping job {name}: running on another worker")
+                return False
+            try:
+                await job()
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                await conn.commit()
+        return True
+
+    async def _run_periodically(
+        self, name: str, interval_seconds: float, job: Job, after: Optional[str]
+    ) -> None:
+        if after is not None:
+            await self._first_run_done[after].wait()
+        while True:
+            started = datetime.now()
+            try:
+                if await self.run_locked(name, job):
+                    logger.info(
+                        f"Job {name} finished in {(datetime.now() - started).total_seconds():.1f}s"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {name} failed: {e}")
+            self._first_run_done[name].set()
+            await asyncio.sleep(interval_seconds)
+
+
+def create_sync_scheduler(attendance_service: AttendanceService) -> SyncScheduler:
+    """
+    Scheduler running device, employee and incremental attendance sync, and
+    attendance partition maintenance, on the intervals configured in settings
+    """
+    async def sync_devices() -> None:
+        async with get_async_session() as session:
+            # Periodic sync exists to pick up changes, so skip the cache
+            new_devices, updated_devices = await attendance_service.sync_devices(
+                session, refresh=True
+            )
+            logger.info(f"Device sync: {new_devices} new, {updated_devices} updated")
+
+    async def sync_employees() -> None:
+        async with get_async_session() as session:
+            new_employees, updated_employees = await attendance_service.sync_employees(
+                session, refresh=True
+            )
+            logger.info(f"Employee sync: {new_employees} new, {updated_employees} updated")
+
+    async def sync_attendance() -> None:
+        async with get_async_session() as session:
+            result = await attendance_service.sync_attendance(
+                session=session, to_date=datetime.now()
+            )
+            logger.info(
+                f"Attendance sync: {result.inserted} new of {result.fetched} fetched, "
+                f"{len(result.failed_windows)} failed windows"
+            )
+
+    async def partition_maintenance() -> None:
+        async with get_async_session() as session:
+            await maintain_attendance_partitions(session)
+
+    scheduler = SyncScheduler()
+    scheduler.add_job("device_sync", settings.DEVICE_SYNC_INTERVAL_SECONDS, sync_devices)
+    # Both need the devices: on a new database the first attendance sync
+    # would otherwise find no device for any punch
+    scheduler.add_job(
+        "employee_sync", settings.EMPLOYEE_SYNC_INTERVAL_SECONDS, sync_employees, after="device_sync"
+    )
+    scheduler.add_job(
+        "attendance_sync", settings.ATTENDANCE_SYNC_INTERVAL_SECONDS, sync_attendance, after="device_sync"
+    )
+    scheduler.add_job(
+        "partition_maintenance", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, partition_maintenance
+    )
+    return scheduler
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from src.app.constants.enum import SyncJobStatus, SyncMode
+from src.app.core.config import settings
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.services.attendance_service import AttendanceService, AttendanceSyncResult
+
+logger = logging.getLogger(__name__)
+
+SyncJobKey = Tuple[Optional[datetime], Optional[datetime], Optional[str], SyncMode]
+
+
+@dataclass
+class SyncJob:
+    id: str
+    key: SyncJobKey
+    status: SyncJobStatus = SyncJobStatus.pending
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: AttendanceSyncResult = field(default_factory=AttendanceSyncResult)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (SyncJobStatus.pending, SyncJobStatus.running)
+
+
+class SyncJobManager:
+    """
+    Runs attendance syncs as background tasks on the worker's event loop
+
+    A request identical to a job that is still pending or running joins that
+    job instead of starting a second upstream fetch. Jobs live in the
+    worker's memory: with several workers, poll the status endpoint through
+    the same worker, or expect a 404 after a restart.
+    """
+    def __init__(self, attendance_service: AttendanceService) -> None:
+        self.attendance_service = attendance_service
+        self._jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._active: Dict[SyncJobKey, SyncJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        to_date: Optional[datetime] = None,
+        from_date: Optional[datetime] = None,
+        employee_id: Optional[str] = None,
+        mode: SyncMode = SyncMode.incremental,
+    ) -> Tuple[SyncJob, bool]:
+        """
+        Start a sync job, or join the running job with the same parameters
+
+        Returns:
+            The job and whether it was merged into an existing one
+        """
+        key: SyncJobKey = (from_date, to_date, employee_id, mode)
+        job = self._active.get(key)
+        if job is not None:
+            return job, True
+
+        job = SyncJob(id=uuid.uuid4().hex, key=key)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        self._prune()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: SyncJob) -> None:
+        from_date, to_date, employee_id, mode = job.key
+        job.status = SyncJobStatus.running
+        job.started_at = datetime.now()
+        try:
+            async with get_async_session() as session:
+                await self.attendance_service.sync_attendance(
+                    session=session,
+                    # An open-ended job syncs up to the moment it starts
+                    to_date=to_date or job.started_at,
+                    from_date=from_date,
+                    employee_id=employee_id,
+                    mode=mode,
+                    result=job.result,
+                )
+            job.status = SyncJobStatus.succeeded
+        except asyncio.CancelledError:
+            job.status = SyncJobStatus.failed
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Sync job {job.id} failed: {e}")
+            job.status = SyncJobStatus.failed
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            self._active.pop(job.key, None)
+            self._tasks.pop(job.id, None)
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[: max(len(finished) - settings.SYNC_JOB_HISTORY, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,256 @@
+"""
+Fill attendance_devices, employees and attendance_records with a synthetic
+dataset of a given size, through COPY, and rebuild its daily summaries.
+
+Devices and employees are named like paradise_mock's, so a generated
+database can also be synced from the mock. Punches are generated a whole
+day at a time, going back from --end-date, so the row count is rounded up
+to whole days.
+
+Uses the database configured by POSTGRES_*; --truncate empties its
+attendance data first: scratch databases only.
+
+Usage:
+    python -m src.benchmarks.dataset --rows 10000000 [--employees 2000] [--devices 40]
+        [--punches-per-day 4] [--end-date 2026-10-18] [--truncate]
+"""
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.db.postgres import get_async_postgres
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.models.entities.orm import AttendanceDevice, AttendanceRecord, DeviceSyncStatus, DeviceType, Employee
+from src.app.repositories.attendance_repository import daily_summary_refresh
+from src.app.services.partitions import add_months, ensure_attendance_partitions, month_start
+from src.benchmarks.paradise_mock import ParadiseMockConfig, device_serial, devices, employee_code
+
+# attendance_records columns written by COPY, in punch_rows tuple order
+COPY_COLUMNS = (
+    "uuid", "device_key", "att_date", "check_time", "employee_key", "created_at", "sync_status",
+)
+
+
+@dataclass
+class DatasetConfig:
+    rows: int = 1_000_000
+    employees: int = 2000
+    devices: int = 40
+    punches_per_day: int = 4
+    end_date: Optional[date] = None
+    seed: int = 0
+
+    @property
+    def days(self) -> int:
+        return math.ceil(self.rows / (self.employees * self.punches_per_day))
+
+    @property
+    def last_day(self) -> date:
+        return self.end_date or date.today()
+
+    @property
+    def first_day(self) -> date:
+        return self.last_day - timedelta(days=self.days - 1)
+
+
+def punch_rows(
+    config: DatasetConfig, day: date, device_keys: List[int], employee_keys: List[int]
+) -> Iterator[Tuple]:
+    """
+    COPY_COLUMNS tuples of one day's punches, the same for the same config
+    and day
+    """
+    rng = random.Random(config.seed * 100003 + day.toordinal())
+    midnight = datetime.combine(day, time.min)
+    created_at = midnight + timedelta(days=1)
+    for index, employee_key in enumerate(employee_keys):
+        # Distinct seconds, so no two punches collide on the punch constraint
+        offsets = sorted(rng.sample(range(7 * 3600, 19 * 3600), config.punches_per_day))
+        for punch, offset in enumerate(offsets):
+            yield (
+                uuid.uuid4(), device_keys[(index + punch) % len(device_keys)], midnight,
+                midnight + timedelta(seconds=offset), employee_key, created_at, "synced",
+            )
+
+
+async def upsert_devices(session: AsyncSession, config: DatasetConfig) -> List[int]:
+    """
+    Register the dataset's devices, alternating check-in and check-out types
+
+    Returns:
+        Device keys, in device index order
+    """
+    mock_config = ParadiseMockConfig(devices=config.devices, employees=config.employees)
+    for index, api_device in enumerate(devices(mock_config)):
+        device = AttendanceDevice.from_api_response(api_device)
+        await session.execute(
+            pg_insert(AttendanceDevice).values(
+                uuid=uuid.uuid4(),
+                device_id=device.device_id,
+                serial_number=device.serial_number,
+                name=device.name,
+                ip_address=device.ip_address,
+                model=device.model,
+                firmware=device.firmware,
+                is_active=True,
+                last_sync=device.last_sync,
+                sync_status=DeviceSyncStatus.ACTIVE,
+            ).on_conflict_do_nothing()
+        )
+        await session.execute(
+            update(AttendanceDevice)
+            .where(AttendanceDevice.serial_number == device.serial_number)
+            .values(device_type=DeviceType.CHECK_IN if index % 2 == 0 else DeviceType.CHECK_OUT)
+        )
+    rows = await session.execute(
+        select(AttendanceDevice.serial_number, AttendanceDevice.device_key)
+        .where(AttendanceDevice.serial_number.in_([device_serial(i) for i in range(config.devices)]))
+    )
+    by_serial = dict(rows.tuples().all())
+    await session.commit()
+    return [by_serial[device_serial(i)] for i in range(config.devices)]
+
+
+async def upsert_employees(session: AsyncSession, config: DatasetConfig) -> List[int]:
+    """
+    Register the dataset's employees
+
+    Returns:
+        Employee keys, in employee index order
+    """
+    codes = [employee_code(index) for index in range(config.employees)]
+    await session.execute(
+        pg_insert(Employee).on_conflict_do_nothing(index_elements=[Employee.employee_id]),
+        [
+            {"employee_id": code, "name": f"Employee {index}", "updated_at": datetime.now()}
+            for index, code in enumerate(codes)
+        ],
+    )
+    rows = await session.execute(
+        select(Employee.employee_id, Employee.id).where(Employee.employee_id.in_(codes))
+    )
+    by_code = dict(rows.tuples().all())
+    await session.commit()
+    return [by_code[code] for code in codes]
+
+
+async def generate_dataset(config: DatasetConfig, truncate: bool = False) -> Dict[str, float]:
+    """
+    Generate the dataset month by month: COPY a month's punches, then
+    rebuild that month's daily summaries, then commit
+
+    Returns:
+        Rows written and the seconds spent copying and summarizing
+    """
+    await get_async_postgres().init_models()
+    stats = {"rows": 0, "copy_seconds": 0.0, "summary_seconds": 0.0}
+    async with get_async_session() as session:
+        if truncate:
+            await session.execute(text("TRUNCATE attendance_records, daily_attendance_summary"))
+            await session.commit()
+        device_keys = await upsert_devices(session, config)
+        employee_keys = await upsert_employees(session, config)
+        await ensure_attendance_partitions(
+            session,
+            datetime.combine(config.first_day, time.min),
+            datetime.combine(config.last_day, time.max),
+        )
+
+        connection = await session.connection()
+        driver = (await connection.get_raw_connection()).driver_connection
+        month = month_start(config.first_day)
+        while month <= config.last_day:
+            first = max(month, config.first_day)
+            last = min(add_months(month, 1) - timedelta(days=1), config.last_day)
+
+            def month_rows() -> Iterator[Tuple]:
+                for offset in range((last - first).days + 1):
+                    yield from punch_rows(config, first + timedelta(days=offset), device_keys, employee_keys)
+
+            started = perf_counter()
+            result = await driver.copy_records_to_table(
+                AttendanceRecord.__tablename__, records=month_rows(), columns=COPY_COLUMNS
+            )
+            # "COPY <rows>"
+            rows = int(result.split()[-1])
+            copied = perf_counter()
+
+            # A day at a time with explicit keys, like sync refreshes them,
+            # so each refresh only reads the punches around that day
+            for offset in range((last - first).days + 1):
+                day = first + timedelta(days=offset)
+                await session.execute(daily_summary_refresh([(key, day) for key in employee_keys]))
+            await session.commit()
+            stats["rows"] += rows
+            stats["copy_seconds"] += copied - started
+            stats["summary_seconds"] += perf_counter() - copied
+            print(
+                f"{month:%Y-%m}: {rows} rows, copy {copied - started:.1f}s, "
+                f"summaries {perf_counter() - copied:.1f}s"
+            )
+            month = add_months(month, 1)
+
+    # Fresh statistics, so plans reflect the new volume
+    async with get_async_postgres().engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("ANALYZE attendance_records"))
+        await connection.execute(text("ANALYZE daily_attendance_summary"))
+        await connection.execute(text("ANALYZE attendance_devices"))
+        await connection.execute(text("ANALYZE employees"))
+    return stats
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--punches-per-day", type=int, default=4)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day with punches (default today)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def dataset_config(args: argparse.Namespace, rows: int) -> DatasetConfig:
+    return DatasetConfig(
+        rows=rows,
+        employees=args.employees,
+        devices=args.devices,
+        punches_per_day=args.punches_per_day,
+        end_date=args.end_date,
+        seed=args.seed,
+    )
+
+
+async def _generate(config: DatasetConfig, truncate: bool) -> Dict[str, float]:
+    try:
+        return await generate_dataset(config, truncate)
+    finally:
+        await get_async_postgres().dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, required=True, help="Punches to generate, rounded up to whole days")
+    add_dataset_arguments(parser)
+    parser.add_argument("--truncate", action="store_true", help="Empty attendance_records and daily_attendance_summary first")
+    args = parser.parse_args()
+
+    config = dataset_config(args, args.rows)
+    print(f"{config.days} days from {config.first_day} to {config.last_day}")
+    started = perf_counter()
+    stats = asyncio.run(_generate(config, args.truncate))
+    seconds = perf_counter() - started
+    print(
+        f"{stats['rows']} rows in {seconds:.1f}s ({stats['rows'] / seconds:,.0f} rows/s; "
+        f"copy {stats['copy_seconds']:.1f}s, summaries {stats['summary_seconds']:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
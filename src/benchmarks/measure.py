@@ -0,0 +1,104 @@
+"""
+Measurement helpers shared by the benchmarks
+"""
+import math
+import resource
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Dict, Iterator, Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Linear-interpolated percentile (pct in 0..100) of a non-empty sample
+    """
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+@dataclass
+class MemoryPeak:
+    peak_mb: Optional[float] = None
+
+
+@contextmanager
+def traced_memory(enabled: bool = True) -> Iterator[MemoryPeak]:
+    """
+    Peak Python heap allocated inside the block, through tracemalloc.
+    Tracing slows allocation-heavy code several times, so time a run
+    without it.
+    """
+    result = MemoryPeak()
+    if not enabled:
+        yield result
+        return
+    tracemalloc.start()
+    try:
+        yield result
+        result.peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+@dataclass
+class StatementStats:
+    statements: int = 0
+    executemany: int = 0
+    seconds: float = 0.0
+    by_verb: Dict[str, int] = field(default_factory=dict)
+
+
+class StatementCounter:
+    """
+    Counts the statements an engine sends to the database, and the time
+    spent waiting for them. Attach to the sync_engine of an AsyncEngine.
+    """
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.stats = StatementStats()
+
+    def reset(self) -> StatementStats:
+        """
+        Return the statistics so far and start new ones
+        """
+        stats, self.stats = self.stats, StatementStats()
+        return stats
+
+    def _before(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        # On the statement's own context, which a failed statement discards
+        # without an after_cursor_execute
+        context._query_start_time = perf_counter()
+
+    def _after(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = getattr(context, "_query_start_time", None)
+        if started is not None:
+            self.stats.seconds += perf_counter() - started
+        self.stats.statements += 1
+        self.stats.executemany += executemany
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+        self.stats.by_verb[verb] = self.stats.by_verb.get(verb, 0) + 1
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
@@ -0,0 +1,210 @@
+"""
+Stand-in for the Paradise time-clock API, serving synthetic devices,
+employees and punches so sync can be measured without the real server.
+
+Run standalone and point EXTERNAL_API_URL at it:
+    python -m src.benchmarks.paradise_mock [--port 6900] [--employees 500] [--latency 0.05]
+    EXTERNAL_API_URL=http://localhost:6900/api/hpa/Paradise
+
+The benchmarks mount it in-process through httpx.ASGITransport instead.
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+PARADISE_PATH = "/api/hpa/Paradise"
+
+
+@dataclass
+class ParadiseMockConfig:
+    devices: int = 4
+    employees: int = 200
+    punches_per_day: int = 4
+    # Delay before each response starts, plus up to jitter_seconds more
+    latency_seconds: float = 0.05
+    jitter_seconds: float = 0.0
+    # Records per body chunk of API_AttendanceList responses
+    records_per_chunk: int = 500
+    user: str = "admin"
+    password: str = "1234"
+    seed: int = 0
+
+
+@dataclass
+class ParadiseMockStats:
+    requests: Dict[str, int] = field(default_factory=dict)
+    records: int = 0
+
+
+def device_serial(index: int) -> str:
+    return f"BENCH{index:04d}"
+
+
+def employee_code(index: int) -> str:
+    return f"{index:05d}"
+
+
+def devices(config: ParadiseMockConfig) -> List[Dict[str, Any]]:
+    return [
+        {
+            "ID": index + 1,
+            "SerialNumber": device_serial(index),
+            "Alias": f"Gate {index + 1}",
+            "IP": f"10.0.0.{index + 1}",
+            "MAC": None,
+            "Model": "Mock",
+            "Firmware": "1.0",
+            "Location": None,
+        }
+        for index in range(config.devices)
+    ]
+
+
+def employees(config: ParadiseMockConfig, serial_number: str) -> List[Dict[str, Any]]:
+    """
+    Employees enrolled on a device: those whose punches it records
+    """
+    serials = [device_serial(index) for index in range(config.devices)]
+    if serial_number not in serials:
+        return []
+    device = serials.index(serial_number)
+    return [
+        {
+            "SSN": employee_code(index),
+            "FullName": f"Employee {index}",
+            "Card": f"C{index:07d}",
+            "Department": f"Dept {index % 10}",
+            "SerialNumber": serial_number,
+        }
+        for index in range(config.employees)
+        if any((index + punch) % config.devices == device for punch in range(config.punches_per_day))
+    ]
+
+
+def attendance_records(
+    config: ParadiseMockConfig,
+    from_date: date,
+    to_date: date,
+    employee_id: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Punches of every day in from_date..to_date (inclusive, like the real
+    API), identical for the same config and day on every call
+    """
+    day = from_date
+    while day <= to_date:
+        # Seeded per day so overlapping windows return the same punches
+        rng = random.Random(config.seed * 100003 + day.toordinal())
+        midnight = datetime.combine(day, datetime.min.time())
+        for index in range(config.employees):
+            code = employee_code(index)
+            offsets = sorted(
+                rng.randrange(7 * 3600, 19 * 3600) for _ in range(config.punches_per_day)
+            )
+            if employee_id is not None and code != employee_id:
+                continue
+            for punch, offset in enumerate(offsets):
+                serial = device_serial((index + punch) % config.devices)
+                yield {
+                    "AttDate": midnight.isoformat(),
+                    "AttTime": (midnight + timedelta(seconds=offset)).isoformat(),
+                    "EmployeeID": code,
+                    "FullName": f"Employee {index}",
+                    "MachineAlias": serial,
+                    "sn": serial,
+                }
+        day += timedelta(days=1)
+
+
+def create_paradise_app(config: Optional[ParadiseMockConfig] = None) -> FastAPI:
+    """
+    Paradise API stand-in; request and record counts are kept in
+    app.state.stats
+    """
+    config = config or ParadiseMockConfig()
+    app = FastAPI(title="Paradise API mock")
+    app.state.config = config
+    app.state.stats = ParadiseMockStats()
+    jitter = random.Random(config.seed)
+
+    def envelope(data: Any) -> Dict[str, Any]:
+        return {"result": "success", "reason": "", "data": [data]}
+
+    @app.post(PARADISE_PATH)
+    async def paradise(request: Request):
+        body = await request.json()
+        name = body.get("name")
+        stats: ParadiseMockStats = app.state.stats
+        stats.requests[name] = stats.requests.get(name, 0) + 1
+        await asyncio.sleep(config.latency_seconds + jitter.uniform(0, config.jitter_seconds))
+
+        if body.get("user") != config.user or body.get("pass") != config.password:
+            return JSONResponse({"result": "fail", "reason": "Invalid user or password", "data": []})
+
+        param = body.get("param") or []
+        params = dict(zip(param[::2], param[1::2]))
+        if name == "API_DeviceList":
+            return JSONResponse(envelope(devices(config)))
+        if name == "API_EmployeeListByDevices":
+            return JSONResponse(envelope(employees(config, params.get("SerialNumber", ""))))
+        if name != "API_AttendanceList":
+            return JSONResponse({"result": "fail", "reason": f"Unknown API {name}", "data": []})
+
+        records = attendance_records(
+            config,
+            date.fromisoformat(params["FromDate"]),
+            date.fromisoformat(params["ToDate"]),
+            params.get("EmployeeID"),
+        )
+
+        async def body_chunks() -> AsyncIterator[bytes]:
+            yield b'{"result": "success", "reason": "", "data": [['
+            chunk: List[str] = []
+            first = True
+            for record in records:
+                chunk.append(json.dumps(record))
+                stats.records += 1
+                if len(chunk) == config.records_per_chunk:
+                    yield (("" if first else ",") + ",".join(chunk)).encode()
+                    chunk, first = [], False
+                    # Let the consumer run, like a network would
+                    await asyncio.sleep(0)
+            if chunk:
+                yield (("" if first else ",") + ",".join(chunk)).encode()
+            yield b"]]}"
+
+        return StreamingResponse(body_chunks(), media_type="application/json")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6900)
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--punches-per-day", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, at most")
+    args = parser.parse_args()
+
+    config = ParadiseMockConfig(
+        devices=args.devices,
+        employees=args.employees,
+        punches_per_day=args.punches_per_day,
+        latency_seconds=args.latency,
+        jitter_seconds=args.jitter,
+    )
+    uvicorn.run(create_paradise_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
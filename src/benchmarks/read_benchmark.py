@@ -0,0 +1,298 @@
+"""
+Latency of the read and status-update endpoints at several dataset sizes,
+with the plans of the queries behind them.
+
+For each --sizes entry, regenerates the dataset (see dataset.py), calls
+every endpoint through the app in-process --repeat times after a warm-up
+call, and reports p50/p95 latency and statements per call. The plans of
+src/scripts/explain_queries.py are recorded for each size as well.
+PATCH /devices/{serial_number}/type times include the daily summary
+refresh it runs after responding.
+
+Uses the database configured by POSTGRES_*, whose attendance data is
+replaced for each size: scratch databases only. --current benchmarks the
+data already there instead, without generating any.
+
+Usage:
+    python -m src.benchmarks.read_benchmark [--sizes 100000,1000000,10000000]
+        [--employees 2000] [--devices 40] [--repeat 20] [--days 7] [--analyze]
+        [--current] [--json read.json] [--plans-dir plans/]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+import httpx
+from sqlalchemy import func, select
+from src.app.constants.enum import AttendanceStatus
+from src.app.core.config import settings
+from src.app.db.postgres import get_async_postgres, get_postgres
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.models.entities.orm import AttendanceDevice, AttendanceRecord, DeviceType, Employee
+from src.benchmarks.dataset import add_dataset_arguments, dataset_config, generate_dataset
+from src.benchmarks.measure import StatementCounter, percentile
+from src.scripts.explain_queries import endpoint_queries, explain
+
+
+@dataclass
+class EndpointCall:
+    method: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Endpoint:
+    name: str
+    # Made in turn; updates alternate between two values
+    calls: List[EndpointCall]
+    # Untimed, puts back what the timed calls changed
+    restore: Optional[EndpointCall] = None
+
+
+@dataclass
+class SampleKeys:
+    last_day: date
+    employee_id: str
+    employee_key: int
+    serial_number: str
+    record_uuid: str
+    device_type: Optional[DeviceType]
+
+
+async def sample_keys() -> Optional[SampleKeys]:
+    """
+    Keys of the newest punch, used by the filtered and update endpoints
+    """
+    async with get_async_session() as session:
+        row = (
+            await session.execute(
+                select(
+                    AttendanceRecord.check_time,
+                    Employee.employee_id,
+                    AttendanceRecord.employee_key,
+                    AttendanceDevice.serial_number,
+                    AttendanceRecord.uuid,
+                    AttendanceDevice.device_type,
+                )
+                .join(AttendanceRecord.employee)
+                .join(AttendanceRecord.device)
+                .order_by(AttendanceRecord.check_time.desc())
+                .limit(1)
+            )
+        ).first()
+    if row is None:
+        return None
+    check_time, employee_id, employee_key, serial_number, record_uuid, device_type = row
+    return SampleKeys(
+        check_time.date(), employee_id, employee_key, serial_number, str(record_uuid), device_type
+    )
+
+
+def endpoints(keys: SampleKeys, days: int) -> List[Endpoint]:
+    """
+    The calls timed for each endpoint, over the last `days` days of data
+    """
+    window = {
+        "from_date": datetime.combine(keys.last_day - timedelta(days=days), time.min).isoformat(),
+        "to_date": datetime.combine(keys.last_day, time.max).isoformat(),
+    }
+    day_window = {
+        "from_date": (keys.last_day - timedelta(days=days)).isoformat(),
+        "to_date": keys.last_day.isoformat(),
+    }
+    employee = {"employee_id": keys.employee_id}
+    status_path = f"/api/attendance/{keys.record_uuid}/status"
+    type_path = f"/api/devices/{keys.serial_number}/type"
+    device_type = keys.device_type or DeviceType.CHECK_IN
+    other_type = DeviceType.CHECK_OUT if device_type == DeviceType.CHECK_IN else DeviceType.CHECK_IN
+    return [
+        Endpoint("GET /attendance", [EndpointCall("GET", "/api/attendance", window)]),
+        Endpoint(
+            "GET /attendance?include_total",
+            [EndpointCall("GET", "/api/attendance", {**window, "include_total": "true"})],
+        ),
+        Endpoint("GET /attendance?employee_id", [EndpointCall("GET", "/api/attendance", {**window, **employee})]),
+        Endpoint("GET /attendance/export", [EndpointCall("GET", "/api/attendance/export", window)]),
+        Endpoint("GET /attendance/daily", [EndpointCall("GET", "/api/attendance/daily", day_window)]),
+        Endpoint(
+            "GET /attendance/daily?employee_id",
+            [EndpointCall("GET", "/api/attendance/daily", {**day_window, **employee})],
+        ),
+        Endpoint(
+            "GET /attendance/timesheet",
+            [EndpointCall("GET", "/api/attendance/timesheet", {"month": keys.last_day.strftime("%Y-%m")})],
+        ),
+        Endpoint(
+            "PATCH /attendance/{record_uuid}/status",
+            [
+                EndpointCall("PATCH", status_path, body={"status_override": AttendanceStatus.check_out.value}),
+                EndpointCall("PATCH", status_path, body={"status_override": None}),
+            ],
+            restore=EndpointCall("PATCH", status_path, body={"status_override": None}),
+        ),
+        Endpoint(
+            "PATCH /devices/{serial_number}/type",
+            [
+                EndpointCall("PATCH", type_path, body={"device_type": other_type.value}),
+                EndpointCall("PATCH", type_path, body={"device_type": device_type.value}),
+            ],
+            restore=EndpointCall("PATCH", type_path, body={"device_type": device_type.value}),
+        ),
+    ]
+
+
+async def call(client: httpx.AsyncClient, endpoint_call: EndpointCall) -> None:
+    response = await client.request(
+        endpoint_call.method, endpoint_call.path, params=endpoint_call.params, json=endpoint_call.body
+    )
+    response.raise_for_status()
+
+
+async def time_endpoints(keys: SampleKeys, days: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Call each endpoint through the app, once to warm up and then `repeat`
+    times
+
+    Returns:
+        p50/p95 seconds and statements per call, keyed by endpoint
+    """
+    # The app's own scheduler would sync while the endpoints are timed
+    settings.SCHEDULER_ENABLED = False
+    from src.app.app import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://attportal",
+            headers={"X-Access-Code": settings.ACCESS_CODE},
+            timeout=None,
+        )
+        try:
+            for endpoint in endpoints(keys, days):
+                await call(client, endpoint.calls[0])
+                seconds = []
+                with StatementCounter(get_async_postgres().engine.sync_engine) as counter:
+                    for index in range(repeat):
+                        started = perf_counter()
+                        await call(client, endpoint.calls[index % len(endpoint.calls)])
+                        seconds.append(perf_counter() - started)
+                if endpoint.restore is not None:
+                    await call(client, endpoint.restore)
+                results[endpoint.name] = {
+                    "p50_ms": 1000 * percentile(seconds, 50),
+                    "p95_ms": 1000 * percentile(seconds, 95),
+                    "statements_per_call": counter.stats.statements / repeat,
+                }
+                print(
+                    f"  {endpoint.name:<40} p50 {results[endpoint.name]['p50_ms']:9.1f}ms  "
+                    f"p95 {results[endpoint.name]['p95_ms']:9.1f}ms  "
+                    f"{results[endpoint.name]['statements_per_call']:.1f} statements"
+                )
+        finally:
+            await client.aclose()
+    return results
+
+
+def query_plans(keys: SampleKeys, days: int, analyze: bool) -> Dict[str, str]:
+    to_date = datetime.combine(keys.last_day, time.max)
+    from_date = to_date - timedelta(days=days)
+    with get_postgres().engine.connect() as connection:
+        try:
+            return {
+                name: explain(connection, statement, analyze=analyze)
+                for name, statement in endpoint_queries(
+                    from_date, to_date, keys.employee_id, keys.serial_number, keys.employee_key
+                ).items()
+            }
+        finally:
+            connection.rollback()
+
+
+def write_plans(plans_dir: str, label: str, plans: Dict[str, str]) -> None:
+    directory = os.path.join(plans_dir, label)
+    os.makedirs(directory, exist_ok=True)
+    for name, plan in plans.items():
+        filename = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") + ".txt"
+        with open(os.path.join(directory, filename), "w") as f:
+            f.write(f"-- {name}\n{plan}\n")
+
+
+async def benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    sizes: List[Optional[int]] = [None] if args.current else args.sizes
+    results = []
+    try:
+        for size in sizes:
+            dataset = None
+            if size is not None:
+                print(f"Generating {size} rows")
+                dataset = await generate_dataset(dataset_config(args, size), truncate=True)
+            keys = await sample_keys()
+            if keys is None:
+                raise SystemExit("attendance_records is empty; generate a dataset first")
+            async with get_async_session() as session:
+                rows = await session.scalar(select(func.count()).select_from(AttendanceRecord))
+
+            print(f"{rows} rows")
+            endpoint_results = await time_endpoints(keys, args.days, args.repeat)
+            plans = query_plans(keys, args.days, args.analyze)
+            label = str(size) if size is not None else "current"
+            if args.plans_dir:
+                write_plans(args.plans_dir, label, plans)
+            results.append({
+                "size": label,
+                "rows": rows,
+                "dataset": dataset,
+                "endpoints": endpoint_results,
+                "plans": plans,
+            })
+    finally:
+        await get_async_postgres().dispose()
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    """
+    p50 latency of each endpoint (rows) at each size (columns)
+    """
+    names = list(results[0]["endpoints"])
+    header = f"{'p50 ms':<40}" + "".join(f"{result['rows']:>14,}" for result in results)
+    print(header)
+    for name in names:
+        print(f"{name:<40}" + "".join(f"{result['endpoints'][name]['p50_ms']:>14.1f}" for result in results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", type=lambda value: [int(size) for size in value.split(",")],
+        default=[100_000, 1_000_000], help="Comma-separated row counts",
+    )
+    add_dataset_arguments(parser)
+    parser.add_argument("--current", action="store_true", help="Benchmark the existing data only")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per endpoint")
+    parser.add_argument("--days", type=int, default=7, help="Size of the date range read")
+    parser.add_argument(
+        "--analyze", action="store_true",
+        help="Record EXPLAIN ANALYZE plans (statements are executed, then rolled back)",
+    )
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results, plans included, to this file")
+    parser.add_argument("--plans-dir", default=None, help="Write each plan to <dir>/<size>/<endpoint>.txt")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
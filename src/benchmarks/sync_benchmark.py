@@ -0,0 +1,311 @@
+"""
+Attendance sync throughput against the Paradise API stand-in.
+
+Runs a full-mode sync of --days days, either through
+AttendanceService.sync_attendance (--target service) or through
+GET /api/attendance/sync on the app (--target endpoint). The upstream is
+served in-process by paradise_mock over httpx.ASGITransport, which
+buffers each response body. Use --upstream-url with a standalone
+paradise_mock, started with the same counts, to exercise real HTTP
+streaming.
+
+Reports records per second, p50/p95 of run and upstream response times,
+peak memory and the statements sent to the database. --json writes the
+results, and --baseline fails the run when throughput drops more than
+--max-regression below a previous result.
+
+The database comes from POSTGRES_*. --reset truncates its attendance data
+before every run, so that each run stores every record: scratch databases
+only. Without it, runs after the first measure re-syncing known records.
+
+Usage:
+    python -m src.benchmarks.sync_benchmark [--days 30] [--employees 200] [--devices 4]
+        [--punches-per-day 4] [--latency 0.05] [--runs 3] [--target service|endpoint]
+        [--reset] [--trace-memory] [--json sync.json]
+        [--baseline sync.json] [--max-regression 0.2]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from sqlalchemy import text, update
+from src.app.constants.enum import SyncMode
+from src.app.core.config import settings
+from src.app.db.postgres import get_async_postgres
+from src.app.dependencies.db_dependencies import get_async_session
+from src.app.models.entities.orm import AttendanceDevice, DeviceType
+from src.app.services.attendance_service import AttendanceService
+from src.benchmarks.measure import (
+    StatementCounter,
+    peak_rss_mb,
+    percentile,
+    traced_memory,
+)
+from src.benchmarks.paradise_mock import (
+    PARADISE_PATH,
+    ParadiseMockConfig,
+    create_paradise_app,
+    device_serial,
+)
+
+RESET_TABLES = ("attendance_records", "daily_attendance_summary", "attendance_sync_state", "employees")
+
+
+@dataclass
+class SyncRun:
+    seconds: float
+    fetched: int
+    inserted: int
+    statements: int
+    executemany: int
+    db_seconds: float
+    statements_by_verb: Dict[str, int]
+    upstream_requests: int
+    upstream_seconds: List[float] = field(default_factory=list)
+    peak_memory_mb: Optional[float] = None
+
+    @property
+    def records_per_second(self) -> float:
+        return self.fetched / self.seconds if self.seconds else 0.0
+
+
+def upstream_client(latencies: List[float], upstream_url: Optional[str], mock_app: Any) -> httpx.AsyncClient:
+    """
+    Client for AttendanceService that records the response time of every
+    upstream request in `latencies`
+    """
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["benchmark_started"] = perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        latencies.append(perf_counter() - response.request.extensions["benchmark_started"])
+
+    hooks = {"request": [on_request], "response": [on_response]}
+    if upstream_url:
+        return httpx.AsyncClient(event_hooks=hooks, timeout=None)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mock_app), event_hooks=hooks, timeout=None
+    )
+
+
+async def prepare_devices(service: AttendanceService, config: ParadiseMockConfig) -> None:
+    """
+    Register the mock's devices, alternating check-in and check-out types
+    """
+    async with get_async_session() as session:
+        await service.sync_devices(session, refresh=True)
+        for index in range(config.devices):
+            await session.execute(
+                update(AttendanceDevice)
+                .where(AttendanceDevice.serial_number == device_serial(index))
+                .values(device_type=DeviceType.CHECK_IN if index % 2 == 0 else DeviceType.CHECK_OUT)
+            )
+        await session.commit()
+
+
+async def reset_attendance() -> None:
+    async with get_async_session() as session:
+        await session.execute(text(f"TRUNCATE {', '.join(RESET_TABLES)}"))
+        await session.commit()
+
+
+async def run_service_sync(service: AttendanceService, from_date: datetime, to_date: datetime) -> Tuple[int, int]:
+    """
+    Returns:
+        Records fetched and inserted
+    """
+    async with get_async_session() as session:
+        result = await service.sync_attendance(
+            session=session, from_date=from_date, to_date=to_date, mode=SyncMode.full
+        )
+    return result.fetched, result.inserted
+
+
+async def run_endpoint_sync(client: httpx.AsyncClient, from_date: datetime, to_date: datetime) -> int:
+    response = await client.get(
+        "/api/attendance/sync",
+        params={"mode": SyncMode.full.value, "from_date": from_date.isoformat(), "to_date": to_date.isoformat()},
+    )
+    response.raise_for_status()
+    return response.json()["records_count"]
+
+
+async def benchmark(args: argparse.Namespace) -> List[SyncRun]:
+    config = ParadiseMockConfig(
+        devices=args.devices,
+        employees=args.employees,
+        punches_per_day=args.punches_per_day,
+        latency_seconds=args.latency,
+        jitter_seconds=args.jitter,
+        user=settings.EXTERNAL_API_USER,
+        password=settings.EXTERNAL_API_PASSWORD,
+    )
+    mock_app = create_paradise_app(config)
+    latencies: List[float] = []
+    client = upstream_client(latencies, args.upstream_url, mock_app)
+    service = AttendanceService(client)
+    service.base_url = args.upstream_url or f"http://paradise{PARADISE_PATH}"
+
+    end = args.end_date or date.today()
+    from_date = datetime.combine(end - timedelta(days=args.days - 1), time.min)
+    to_date = datetime.combine(end, time.max)
+
+    postgres = get_async_postgres()
+    await postgres.init_models()
+    await prepare_devices(service, config)
+
+    app_client: Optional[httpx.AsyncClient] = None
+    lifespan = None
+    if args.target == "endpoint":
+        # The app's own scheduler would sync concurrently with the runs
+        settings.SCHEDULER_ENABLED = False
+        from src.app.app import app
+
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        app.state.attendance_service = service
+        app_client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://attportal",
+            headers={"X-Access-Code": settings.ACCESS_CODE},
+            timeout=None,
+        )
+
+    runs: List[SyncRun] = []
+    try:
+        for _ in range(args.runs):
+            if args.reset:
+                await reset_attendance()
+            records_before = mock_app.state.stats.records
+            latencies.clear()
+
+            with StatementCounter(postgres.engine.sync_engine) as counter, \
+                    traced_memory(args.trace_memory) as memory:
+                started = perf_counter()
+                if app_client is not None:
+                    inserted = await run_endpoint_sync(app_client, from_date, to_date)
+                    fetched = mock_app.state.stats.records - records_before
+                else:
+                    fetched, inserted = await run_service_sync(service, from_date, to_date)
+                seconds = perf_counter() - started
+
+            statements = counter.reset()
+            run = SyncRun(
+                seconds=seconds,
+                fetched=fetched,
+                inserted=inserted,
+                statements=statements.statements,
+                executemany=statements.executemany,
+                db_seconds=statements.seconds,
+                statements_by_verb=statements.by_verb,
+                upstream_requests=len(latencies),
+                upstream_seconds=list(latencies),
+                peak_memory_mb=memory.peak_mb,
+            )
+            runs.append(run)
+            print(
+                f"run {len(runs)}: {run.fetched} records in {run.seconds:.2f}s "
+                f"({run.records_per_second:,.0f} rec/s), {run.inserted} inserted, "
+                f"{run.statements} statements ({run.db_seconds:.2f}s in database)"
+                + (f", peak {run.peak_memory_mb:.1f}MB traced" if run.peak_memory_mb is not None else "")
+            )
+    finally:
+        if app_client is not None:
+            await app_client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        await client.aclose()
+        await postgres.dispose()
+    return runs
+
+
+def summarize(args: argparse.Namespace, runs: List[SyncRun]) -> Dict[str, Any]:
+    upstream = [seconds for run in runs for seconds in run.upstream_seconds]
+    run_seconds = [run.seconds for run in runs]
+    fetched = sum(run.fetched for run in runs)
+    traced = [run.peak_memory_mb for run in runs if run.peak_memory_mb is not None]
+    return {
+        "benchmark": "sync",
+        "target": args.target,
+        "days": args.days,
+        "devices": args.devices,
+        "employees": args.employees,
+        "punches_per_day": args.punches_per_day,
+        "latency_seconds": args.latency,
+        "reset": args.reset,
+        "runs": len(runs),
+        "records_per_run": runs[0].fetched if runs else 0,
+        "records_per_second": percentile([run.records_per_second for run in runs], 50),
+        "run_seconds_p50": percentile(run_seconds, 50),
+        "run_seconds_p95": percentile(run_seconds, 95),
+        "upstream_requests_per_run": runs[0].upstream_requests if runs else 0,
+        "upstream_seconds_p50": percentile(upstream, 50) if upstream else None,
+        "upstream_seconds_p95": percentile(upstream, 95) if upstream else None,
+        "statements_per_run": sum(run.statements for run in runs) / len(runs),
+        "statements_per_1000_records": 1000 * sum(run.statements for run in runs) / fetched if fetched else None,
+        "db_seconds_per_run": sum(run.db_seconds for run in runs) / len(runs),
+        "statements_by_verb": runs[-1].statements_by_verb if runs else {},
+        "peak_traced_memory_mb": max(traced) if traced else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "run_details": [
+            {**asdict(run), "upstream_seconds": None, "records_per_second": run.records_per_second}
+            for run in runs
+        ],
+    }
+
+
+def check_regression(summary: Dict[str, Any], baseline_path: str, max_regression: float) -> bool:
+    """
+    Returns:
+        False if throughput fell more than max_regression below the baseline
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    floor = baseline["records_per_second"] * (1 - max_regression)
+    ok = summary["records_per_second"] >= floor
+    print(
+        f"baseline {baseline['records_per_second']:,.0f} rec/s, now "
+        f"{summary['records_per_second']:,.0f} rec/s (floor {floor:,.0f}): "
+        + ("ok" if ok else "REGRESSION")
+    )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("service", "endpoint"), default="service")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last synced day (default today)")
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--punches-per-day", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Upstream seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random upstream seconds, at most")
+    parser.add_argument("--upstream-url", default=None, help="Standalone paradise_mock instead of the in-process one")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--reset", action="store_true", help="Truncate attendance data before each run")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure peak heap with tracemalloc (slower runs)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this file")
+    parser.add_argument("--baseline", default=None, help="Results file to compare throughput against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.upstream_url and args.target == "endpoint":
+        parser.error("--upstream-url only applies to --target service")
+
+    runs = asyncio.run(benchmark(args))
+    summary = summarize(args, runs)
+    print(json.dumps({k: v for k, v in summary.items() if k != "run_details"}, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline and not check_regression(summary, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
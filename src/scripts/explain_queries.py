@@ -0,0 +1,151 @@
+"""
+Print the PostgreSQL plans of the queries behind each endpoint, so index or
+query regressions show up as a changed plan.
+
+Usage:
+    python -m src.scripts.explain_queries [--days 7] [--employee-id 00210]
+                                          [--serial-number AYSB28014732] [--analyze]
+"""
+import argparse
+import uuid
+from datetime import datetime, time, timedelta
+from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable
+
+from src.app.core.config import settings
+from src.app.db.postgres import get_postgres
+from src.app.models.entities.orm import AttendanceDevice, AttendanceRecord, Employee
+from src.app.repositories.attendance_repository import (
+    attendance_count_query,
+    attendance_export_query,
+    attendance_records_query,
+    daily_summary_query,
+    daily_summary_refresh,
+    device_daily_keys_query,
+    devices_by_serial_query,
+    monthly_timesheet_query,
+    status_override_update,
+)
+
+
+def endpoint_queries(
+    from_date: datetime,
+    to_date: datetime,
+    employee_id: str,
+    serial_number: str,
+    employee_key: int = 0,
+) -> Dict[str, Executable]:
+    """
+    The statements each endpoint issues, keyed by endpoint
+
+    Args:
+        employee_key: Key of employee_id, for the statements sync runs with
+            keys it already resolved
+    """
+    page_size = settings.ATTENDANCE_PAGE_SIZE + 1
+    return {
+        "GET /attendance": attendance_records_query(from_date, to_date).limit(page_size),
+        "GET /attendance?employee_id": attendance_records_query(
+            from_date, to_date, employee_id
+        ).limit(page_size),
+        "GET /attendance?include_total (total)": attendance_count_query(from_date, to_date),
+        "GET /attendance/export": attendance_export_query(from_date, to_date),
+        "GET /attendance/daily": daily_summary_query(
+            from_date.date(), to_date.date()
+        ).limit(page_size),
+        "GET /attendance/daily?employee_id": daily_summary_query(
+            from_date.date(), to_date.date(), employee_id
+        ).limit(page_size),
+        "GET /attendance/timesheet": monthly_timesheet_query(
+            from_date.date().replace(day=1),
+            time.fromisoformat(settings.SHIFT_START),
+            timedelta(minutes=settings.LATE_GRACE_MINUTES),
+        ),
+        "GET /attendance/sync (device lookup)": devices_by_serial_query(),
+        "GET /attendance/sync (daily summary refresh)": daily_summary_refresh(
+            [(employee_key, to_date.date())]
+        ),
+        "PATCH /attendance/{record_uuid}/status": status_override_update(
+            uuid.uuid4(), "Check In"
+        ),
+        "PATCH /devices/{serial_number}/type (daily summary refresh)": (
+            daily_summary_refresh(device_daily_keys_query(serial_number))
+        ),
+    }
+
+
+def explain(connection: Connection, statement: Executable, analyze: bool = False) -> str:
+    """
+    Return the text plan of a statement. With analyze the statement is
+    executed, so callers must roll back.
+    """
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    # exec_driver_sql skips the type conversions execute() would apply
+    # (e.g. Enum members to their database labels), so apply them here
+    params = {}
+    for key, value in compiled.params.items():
+        bind = compiled.binds.get(key)
+        processor = (
+            bind.type.dialect_impl(connection.dialect).bind_processor(connection.dialect)
+            if bind is not None else None
+        )
+        params[key] = processor(value) if processor else value
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    rows = connection.exec_driver_sql(f"EXPLAIN ({options}) {compiled}", params)
+    return "\n".join(row[0] for row in rows)
+
+
+def _sample_keys(connection: Connection) -> tuple[Optional[str], Optional[str]]:
+    row = connection.execute(
+        select(Employee.employee_id, AttendanceDevice.serial_number)
+        .select_from(AttendanceRecord)
+        .join(AttendanceRecord.employee)
+        .join(AttendanceRecord.device)
+        .limit(1)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _employee_key(connection: Connection, employee_id: str) -> int:
+    return connection.scalar(select(Employee.id).where(Employee.employee_id == employee_id)) or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=7, help="Size of the check_time range")
+    parser.add_argument("--employee-id", help="Employee used for filtered queries")
+    parser.add_argument("--serial-number", help="Device used for per-device queries")
+    parser.add_argument(
+        "--analyze", action="store_true",
+        help="Run EXPLAIN ANALYZE (statements are executed, then rolled back)",
+    )
+    args = parser.parse_args()
+
+    to_date = datetime.now()
+    from_date = to_date - timedelta(days=args.days)
+
+    with get_postgres().engine.connect() as connection:
+        try:
+            sample_employee, sample_serial = _sample_keys(connection)
+            employee_id = args.employee_id or sample_employee or "00000"
+            queries = endpoint_queries(
+                from_date,
+                to_date,
+                employee_id,
+                args.serial_number or sample_serial or "",
+                _employee_key(connection, employee_id),
+            )
+            for name, statement in queries.items():
+                print(f"=== {name}")
+                print(explain(connection, statement, analyze=args.analyze))
+                print()
+        finally:
+            connection.rollback()
+
+
+if __name__ == "__main__":
+    main()
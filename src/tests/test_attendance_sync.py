@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+import httpx
+from sqlalchemy.sql.dml import Insert
+from src.app.core.config import settings
+from src.app.models.entities.orm import AttendanceDevice, DeviceSyncStatus
+from src.app.services.attendance_service import AttendanceService, SyncBatch
+
+DAY = (datetime(2026, 10, 1), datetime(2026, 10, 1, 23, 59, 59, 999999))
+NEXT_DAY = (datetime(2026, 10, 2), datetime(2026, 10, 2, 23, 59, 59, 999999))
+
+
+def punch(time: str, serial: str) -> dict:
+    return {
+        "AttDate": time[:10], "AttTime": time, "EmployeeID": "00001",
+        "FullName": "Emp 1", "MachineAlias": serial, "sn": serial,
+    }
+
+
+class StubService(AttendanceService):
+    def __init__(self, records):
+        super().__init__(httpx.AsyncClient())
+        self.records = records
+
+    async def stream_attendance_data(self, from_date, to_date, employee_id=None):
+        for record in self.records:
+            yield record
+
+
+class DeviceListService(AttendanceService):
+    def __init__(self, api_devices):
+        super().__init__(httpx.AsyncClient())
+        self.api_devices = api_devices
+
+    async def fetch_device_list(self, refresh=False):
+        return self.api_devices
+
+
+class FakeSession:
+    def __init__(self, devices):
+        self.devices = devices
+        self.bumped = []
+
+    async def execute(self, stmt):
+        if isinstance(stmt, Insert):
+            self.bumped.append(stmt.compile().params["name"])
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.devices))
+
+    def add(self, device):
+        self.devices.append(device)
+
+    async def commit(self):
+        pass
+
+
+def api_device(alias: str) -> dict:
+    return {"ID": 1, "SerialNumber": "SN1", "Alias": alias, "IP": "10.0.0.1"}
+
+
+def stored_device(alias: str = "MC1") -> AttendanceDevice:
+    device = AttendanceDevice.from_api_response(api_device(alias))
+    # As loaded from the database, with the column default applied
+    device.is_active = True
+    return device
+
+
+def sync_devices(*api_devices: dict, stored=None) -> FakeSession:
+    session = FakeSession([stored_device()] if stored is None else stored)
+    asyncio.run(DeviceListService(list(api_devices)).sync_devices(session))
+    return session
+
+
+def parse_window(records, devices, grace_hours=24 * 365 * 10):
+    async def run():
+        queue: "asyncio.Queue[SyncBatch]" = asyncio.Queue()
+        await StubService(records)._parse_window(DAY, None, devices, queue)
+        batches = []
+        while not queue.empty():
+            batches.append(queue.get_nowait())
+        return batches
+
+    with patch.object(settings, "SYNC_UNKNOWN_DEVICE_GRACE_HOURS", grace_hours):
+        return asyncio.run(run())
+
+
+def test_latest_only_counts_stored_punches():
+    batches = parse_window(
+        [punch("2026-10-01T08:00:00", "SN1"), punch("2026-10-01T17:00:00", "SNX")],
+        {"SN1": SimpleNamespace(device_key=1)},
+    )
+    done = batches[-1]
+    assert done.done
+    assert done.fetched == 2
+    assert done.latest == datetime(2026, 10, 1, 8)
+    assert done.earliest_skipped == datetime(2026, 10, 1, 17)
+    assert done.unknown_serials == {"SNX": 1}
+
+
+def test_unknown_device_punch_past_grace_stops_holding_watermark():
+    batches = parse_window(
+        [punch("2026-10-01T08:00:00", "SN1"), punch("2026-10-01T17:00:00", "SNX")],
+        {"SN1": SimpleNamespace(device_key=1)},
+        grace_hours=0,
+    )
+    done = batches[-1]
+    assert done.earliest_skipped is None
+    assert done.unknown_serials == {"SNX": 1}
+    assert done.abandoned_serials == {"SNX": 1}
+    windows = {DAY: (done.latest, done.earliest_skipped)}
+    assert AttendanceService.covered_until(windows, []) == datetime(2026, 10, 1, 8)
+
+
+def test_watermark_stops_before_skipped_punch():
+    windows = {
+        DAY: (datetime(2026, 10, 1, 17), datetime(2026, 10, 1, 12)),
+        NEXT_DAY: (datetime(2026, 10, 2, 17), None),
+    }
+    assert AttendanceService.covered_until(windows, []) == datetime(2026, 10, 1, 12) - timedelta(microseconds=1)
+
+
+def test_watermark_with_only_unknown_devices_stays_before_them():
+    windows = {DAY: (None, datetime(2026, 10, 1, 8))}
+    assert AttendanceService.covered_until(windows, []) < datetime(2026, 10, 1, 8)
+
+
+def test_watermark_stops_at_failed_window():
+    windows = {DAY: (datetime(2026, 10, 1, 17), None)}
+    assert AttendanceService.covered_until(windows, [NEXT_DAY]) == datetime(2026, 10, 1, 17)
+    assert AttendanceService.covered_until({NEXT_DAY: (datetime(2026, 10, 2, 17), None)}, [DAY]) is None
+
+
+def test_watermark_covers_all_stored_windows():
+    windows = {
+        DAY: (datetime(2026, 10, 1, 17), None),
+        NEXT_DAY: (None, None),
+    }
+    assert AttendanceService.covered_until(windows, []) == datetime(2026, 10, 1, 17)
+
+
+def test_device_rename_bumps_attendance_generation():
+    assert sync_devices(api_device("Gate 1")).bumped == ["devices", "attendance"]
+
+
+def test_unchanged_device_list_keeps_generations():
+    assert sync_devices(api_device("MC1")).bumped == []
+
+
+def test_device_change_bumps_devices_generation():
+    assert sync_devices({**api_device("MC1"), "IP": "10.0.0.2"}).bumped == ["devices"]
+    assert sync_devices(api_device("MC1"), {**api_device("MC2"), "SerialNumber": "SN2"}).bumped == ["devices"]
+
+
+def test_device_missing_from_one_sync_is_reactivated():
+    device = stored_device()
+    assert sync_devices(stored=[device]).bumped == ["devices"]
+    assert not device.is_active
+    # Already inactive: nothing changes
+    assert sync_devices(stored=[device]).bumped == []
+    assert sync_devices(api_device("MC1"), stored=[device]).bumped == ["devices"]
+    assert device.is_active
+    assert device.sync_status == DeviceSyncStatus.ACTIVE
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from src.app.core import cache
+from src.app.core.cache import AsyncTTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "monotonic", clock)
+    return clock
+
+
+def loader_of(value, calls):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(0)
+        return value
+
+    return load
+
+
+def test_value_expires_after_ttl(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=4)
+    store.set("a", 1)
+    clock.now += 9.9
+    assert store.get("a") == 1
+    clock.now += 0.1
+    assert store.get("a") is None
+
+
+def test_least_recently_used_key_is_evicted(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    assert store.get("a") == 1
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert store.get("a") == 1
+    assert store.get("c") == 3
+
+
+def test_concurrent_misses_share_one_load(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=4)
+    calls = []
+
+    async def run():
+        return await asyncio.gather(
+            *(store.get_or_load("a", loader_of(1, calls)) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == [1] * 5
+    assert calls == [1]
+    assert store.get("a") == 1
+
+
+def test_failed_load_is_not_cached(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=4)
+    calls = []
+
+    async def fail():
+        calls.append("fail")
+        raise RuntimeError("upstream down")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await store.get_or_load("a", fail)
+        assert store.get("a") is None
+        return await store.get_or_load("a", loader_of(1, calls))
+
+    assert asyncio.run(run()) == 1
+    assert calls == ["fail", 1]
+
+
+def test_refresh_bypasses_cached_value(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=4)
+    calls = []
+
+    async def run():
+        await store.get_or_load("a", loader_of(1, calls))
+        cached = await store.get_or_load("a", loader_of(2, calls))
+        refreshed = await store.get_or_load("a", loader_of(2, calls), refresh=True)
+        return cached, refreshed
+
+    assert asyncio.run(run()) == (1, 2)
+    assert calls == [1, 2]
+    assert store.get("a") == 2
+
+
+def test_expired_value_is_loaded_again(clock):
+    store = AsyncTTLCache(ttl_seconds=10, max_size=4)
+    calls = []
+
+    async def run():
+        await store.get_or_load("a", loader_of(1, calls))
+        clock.now += 10
+        return await store.get_or_load("a", loader_of(2, calls))
+
+    assert asyncio.run(run()) == 2
+    assert calls == [1, 2]
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Request, Response
+from src.app.api.routers.attedance_report import _device_response, get_devices
+from src.app.models.entities.orm import AttendanceDevice
+
+API_DEVICE = {
+    "ID": 7, "SerialNumber": "SN7", "IP": "10.0.0.7", "MAC": "00:11", "Model": "X",
+    "Firmware": "1.0", "Platform": "ZMM220", "Alias": "Gate", "Location": "Lobby",
+}
+
+
+class FailingDeviceService:
+    async def sync_devices(self, session, refresh=False):
+        raise ValueError("API Error: Invalid user or password")
+
+
+class ClosingSession:
+    def __init__(self):
+        self.closed = False
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+def test_device_response_keeps_upstream_shape():
+    device = AttendanceDevice.from_api_response(API_DEVICE)
+    assert _device_response(device).model_dump(by_alias=True) == API_DEVICE
+
+
+def test_unexpected_refresh_error_is_a_handled_500():
+    session = ClosingSession()
+    request = Request({"type": "http", "method": "GET", "path": "/api/devices", "query_string": b"", "headers": []})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_devices(
+            request, Response(), active_only=True, refresh=True,
+            session=session, attendance_service=FailingDeviceService(),
+        ))
+    assert error.value.status_code == 500
+    assert error.value.detail == "An unexpected error occurred while fetching devices"
+    assert session.closed
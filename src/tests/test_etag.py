@@ -0,0 +1,78 @@
+import asyncio
+from fastapi import Request, Response
+from src.app.api.routers.attedance_report import _not_modified
+from src.app.constants.enum import DataGenerationName
+from src.app.core.etag import compute_etag, etag_matches
+
+ETAG = '"abc123"'
+
+
+class GenerationSession:
+    def __init__(self, generation):
+        self.generation = generation
+
+    async def scalar(self, stmt):
+        return self.generation
+
+
+def request(query: str = "", if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({
+        "type": "http", "method": "GET", "path": "/api/attendance",
+        "query_string": query.encode(), "headers": headers,
+    })
+
+
+def not_modified(generation, req):
+    response = Response()
+    result = asyncio.run(
+        _not_modified(GenerationSession(generation), req, response, DataGenerationName.attendance)
+    )
+    return result, response
+
+
+def test_etag_matches_exact_and_wildcard():
+    assert etag_matches(ETAG, ETAG)
+    assert etag_matches("*", ETAG)
+    assert etag_matches(" * ", ETAG)
+    assert not etag_matches('"other"', ETAG)
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches("", ETAG)
+
+
+def test_etag_matches_weak_tag():
+    assert etag_matches(f"W/{ETAG}", ETAG)
+
+
+def test_etag_matches_any_tag_of_a_list():
+    assert etag_matches(f'"other", W/{ETAG}', ETAG)
+    assert etag_matches(f'"other",{ETAG}', ETAG)
+    assert not etag_matches('"other", W/"another"', ETAG)
+
+
+def test_etag_ignores_query_order_but_not_generation():
+    first = compute_etag(1, request("a=1&b=2"))
+    assert compute_etag(1, request("b=2&a=1")) == first
+    assert compute_etag(2, request("a=1&b=2")) != first
+    assert compute_etag(1, request("a=1&b=2"), "bucket") != first
+
+
+def test_not_modified_tags_fresh_response():
+    result, response = not_modified(3, request("limit=10"))
+    assert result is None
+    assert response.headers["etag"] == compute_etag(3, request("limit=10"))
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_not_modified_returns_304_for_current_tag():
+    etag = compute_etag(3, request("limit=10"))
+    result, _ = not_modified(3, request("limit=10", if_none_match=etag))
+    assert result.status_code == 304
+    assert result.headers["etag"] == etag
+
+
+def test_not_modified_refetches_after_generation_bump():
+    etag = compute_etag(3, request("limit=10"))
+    result, response = not_modified(4, request("limit=10", if_none_match=etag))
+    assert result is None
+    assert response.headers["etag"] != etag
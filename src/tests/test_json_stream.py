@@ -0,0 +1,57 @@
+import asyncio
+import json
+import pytest
+from src.app.core.json_stream import JSONEnvelopeStream
+
+BODY = json.dumps({
+    "result": "success",
+    "reason": None,
+    "data": [[
+        {"EmployeeID": "00210", "FullName": "Nguyễn \"A\", [x]", "Temp": 36.75},
+        {"EmployeeID": "00211", "FullName": "B", "Temp": 1e3},
+        12345,
+    ]],
+    "total": 3,
+}, ensure_ascii=False)
+
+
+def parse(body: str, chunk_size: int):
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def run():
+        stream = JSONEnvelopeStream(chunks())
+        return [item async for item in stream.items()], stream.fields
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, len(BODY)])
+def test_items_survive_any_chunk_split(chunk_size):
+    envelope = json.loads(BODY)
+    items, fields = parse(BODY, chunk_size)
+    assert items == envelope["data"][0]
+    assert fields == {"result": "success", "reason": None, "total": 3}
+
+
+def test_number_split_at_chunk_end_is_not_truncated():
+    items, _ = parse('{"data": [[12345, 6.5e10]]}', 4)
+    assert items == [12345, 6.5e10]
+
+
+@pytest.mark.parametrize("body", ['{}', '{"data": []}', '{"data": [[]]}', '{"data": [{"a": 1}]}'])
+def test_envelope_without_items(body):
+    items, _ = parse(body, 2)
+    assert items == []
+
+
+def test_only_first_data_array_is_streamed():
+    items, _ = parse('{"data": [[1, 2], [3]]}', 3)
+    assert items == [1, 2]
+
+
+@pytest.mark.parametrize("body", ['{"data": [[1, 2', '{"data": [[1 2]]}', '[1, 2]'])
+def test_malformed_body_raises(body):
+    with pytest.raises(ValueError):
+        parse(body, 3)
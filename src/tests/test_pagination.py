@@ -0,0 +1,43 @@
+import uuid
+from datetime import date, datetime
+import pytest
+from src.app.core.pagination import (
+    _encode,
+    decode_cursor,
+    decode_daily_cursor,
+    encode_cursor,
+    encode_daily_cursor,
+)
+
+
+def test_cursor_round_trip():
+    position = (datetime(2026, 10, 1, 8, 30, 15, 123456), uuid.uuid4())
+    cursor = encode_cursor(*position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+def test_daily_cursor_round_trip():
+    position = (date(2026, 10, 1), "00210")
+    assert decode_daily_cursor(encode_daily_cursor(*position)) == position
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "bm90IGpzb24",  # "not json"
+    _encode(["2026-10-01T08:00:00"]),
+    _encode(["yesterday", str(uuid.uuid4())]),
+    _encode(["2026-10-01T08:00:00", "not-a-uuid"]),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    _encode(["2026-10-01", 210]),
+    _encode(["2026-10-01T08:00:00", str(uuid.uuid4())]),
+])
+def test_malformed_daily_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_daily_cursor(cursor)
@@ -0,0 +1,33 @@
+import asyncio
+from datetime import date, datetime
+from unittest.mock import patch
+import pytest
+from src.app.core.config import settings
+from src.app.services.partitions import (
+    add_months,
+    ensure_attendance_partitions,
+    month_start,
+    partition_name,
+    retention_cutoff,
+)
+
+
+def test_partition_name_and_month_arithmetic():
+    assert partition_name(date(2024, 12, 1)) == "attendance_records_p2024_12"
+    assert add_months(date(2024, 12, 1), 1) == date(2025, 1, 1)
+    assert add_months(date(2025, 1, 1), -13) == date(2023, 12, 1)
+    assert month_start(datetime(2024, 12, 31, 23, 59)) == date(2024, 12, 1)
+
+
+def test_retention_cutoff():
+    assert retention_cutoff(0) is None
+    assert retention_cutoff(3) == add_months(month_start(date.today()), -3)
+
+
+def test_partitions_of_expired_months_are_refused():
+    cutoff = retention_cutoff(3)
+    expired = datetime.combine(add_months(cutoff, -1), datetime.min.time())
+    with patch.object(settings, "ATTENDANCE_RETENTION_MONTHS", 3):
+        with pytest.raises(ValueError, match=cutoff.isoformat()):
+            # Refused before the session is used
+            asyncio.run(ensure_attendance_partitions(None, expired, datetime.now()))
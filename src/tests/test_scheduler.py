@@ -0,0 +1,52 @@
+import asyncio
+from src.app.services.scheduler import SyncScheduler
+
+
+class UnlockedScheduler(SyncScheduler):
+    async def run_locked(self, name, job):
+        await job()
+        return True
+
+
+def test_job_waits_for_first_run_of_job_it_follows():
+    events = []
+
+    async def run():
+        async def device_sync():
+            await asyncio.sleep(0.05)
+            events.append("devices")
+
+        async def attendance_sync():
+            events.append("attendance")
+
+        scheduler = UnlockedScheduler()
+        # Added first, so it would start first without the ordering
+        scheduler.add_job("attendance_sync", 60, attendance_sync, after="device_sync")
+        scheduler.add_job("device_sync", 60, device_sync)
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert events == ["devices", "attendance"]
+
+
+def test_failed_first_run_still_releases_followers():
+    events = []
+
+    async def run():
+        async def device_sync():
+            raise RuntimeError("upstream down")
+
+        async def attendance_sync():
+            events.append("attendance")
+
+        scheduler = UnlockedScheduler()
+        scheduler.add_job("device_sync", 60, device_sync)
+        scheduler.add_job("attendance_sync", 60, attendance_sync, after="device_sync")
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert events == ["attendance"]
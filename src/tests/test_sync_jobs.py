@@ -0,0 +1,154 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+import pytest
+from src.app.constants.enum import SyncJobStatus, SyncMode
+from src.app.core.config import settings
+from src.app.services import sync_jobs
+from src.app.services.sync_jobs import SyncJobManager
+
+FROM = datetime(2026, 10, 1)
+TO = datetime(2026, 10, 2)
+
+
+class GatedService:
+    """
+    Attendance service whose syncs wait for release(), then fail if asked to
+    """
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+        self.gate = asyncio.Event()
+
+    def release(self):
+        self.gate.set()
+
+    async def sync_attendance(self, session, to_date, from_date, employee_id, mode, result):
+        self.calls.append((from_date, to_date, employee_id, mode))
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        result.inserted = 3
+        return result
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch):
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    monkeypatch.setattr(sync_jobs, "get_async_session", session)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_identical_request_joins_active_job():
+    async def run():
+        service = GatedService()
+        manager = SyncJobManager(service)
+        job, merged = manager.submit(TO, FROM)
+        assert (job.status, merged) == (SyncJobStatus.pending, False)
+        await settle()
+        assert job.status == SyncJobStatus.running
+
+        same, merged = manager.submit(TO, FROM)
+        assert same is job and merged
+
+        service.release()
+        await settle()
+        assert job.status == SyncJobStatus.succeeded
+        assert job.result.inserted == 3
+        assert job.started_at <= job.finished_at
+        assert len(service.calls) == 1
+
+    asyncio.run(run())
+
+
+def test_different_parameters_start_new_job():
+    async def run():
+        service = GatedService()
+        manager = SyncJobManager(service)
+        job, _ = manager.submit(TO, FROM)
+        others = [
+            manager.submit(TO, FROM, employee_id="00001"),
+            manager.submit(TO, FROM, mode=SyncMode.full),
+            manager.submit(TO, datetime(2026, 9, 30)),
+        ]
+        assert all(not merged and other is not job for other, merged in others)
+        service.release()
+        await settle()
+        assert len(service.calls) == 4
+
+    asyncio.run(run())
+
+
+def test_request_after_job_finished_starts_new_job():
+    async def run():
+        service = GatedService()
+        service.release()
+        manager = SyncJobManager(service)
+        job, _ = manager.submit(TO, FROM)
+        await settle()
+        again, merged = manager.submit(TO, FROM)
+        assert not merged and again is not job
+        assert manager.get(job.id) is job
+
+    asyncio.run(run())
+
+
+def test_open_ended_job_syncs_up_to_its_start():
+    async def run():
+        service = GatedService()
+        service.release()
+        manager = SyncJobManager(service)
+        job, _ = manager.submit()
+        await settle()
+        assert service.calls == [(None, job.started_at, None, SyncMode.incremental)]
+
+    asyncio.run(run())
+
+
+def test_failed_job_records_error_and_frees_key():
+    async def run():
+        service = GatedService(error=ValueError("From date must be before or equal to to date"))
+        service.release()
+        manager = SyncJobManager(service)
+        job, _ = manager.submit(TO, FROM)
+        await settle()
+        assert job.status == SyncJobStatus.failed
+        assert job.error == "From date must be before or equal to to date"
+        assert not manager.submit(TO, FROM)[1]
+
+    asyncio.run(run())
+
+
+def test_stop_cancels_running_jobs():
+    async def run():
+        manager = SyncJobManager(GatedService())
+        job, _ = manager.submit(TO, FROM)
+        await settle()
+        await manager.stop()
+        assert (job.status, job.error) == (SyncJobStatus.failed, "Cancelled")
+
+    asyncio.run(run())
+
+
+def test_finished_jobs_beyond_history_are_forgotten(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_JOB_HISTORY", 2)
+
+    async def run():
+        service = GatedService()
+        service.release()
+        manager = SyncJobManager(service)
+        jobs = []
+        for day in range(1, 5):
+            jobs.append(manager.submit(datetime(2026, 10, day), FROM)[0])
+            await settle()
+        # Pruned when a job is submitted; active jobs do not count
+        assert [manager.get(job.id) for job in jobs] == [None, jobs[1], jobs[2], jobs[3]]
+
+    asyncio.run(run())
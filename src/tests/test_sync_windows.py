@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import pytest
+from pydantic import ValidationError
+from src.app.core.config import Settings
+from src.app.services.attendance_service import AttendanceService
+
+split_windows = AttendanceService.split_windows
+TICK = timedelta(microseconds=1)
+
+
+def test_windows_are_day_aligned_and_contiguous():
+    windows = split_windows(datetime(2026, 10, 1, 10, 30), datetime(2026, 10, 3, 9), 1)
+    assert windows == [
+        (datetime(2026, 10, 1, 10, 30), datetime(2026, 10, 2) - TICK),
+        (datetime(2026, 10, 2), datetime(2026, 10, 3) - TICK),
+        (datetime(2026, 10, 3), datetime(2026, 10, 3, 9)),
+    ]
+
+
+def test_last_window_is_partial():
+    windows = split_windows(datetime(2026, 10, 1), datetime(2026, 10, 5, 12), 3)
+    assert windows == [
+        (datetime(2026, 10, 1), datetime(2026, 10, 4) - TICK),
+        (datetime(2026, 10, 4), datetime(2026, 10, 5, 12)),
+    ]
+
+
+def test_window_ends_exactly_at_day_boundary():
+    windows = split_windows(datetime(2026, 10, 1), datetime(2026, 10, 2) - TICK, 1)
+    assert windows == [(datetime(2026, 10, 1), datetime(2026, 10, 2) - TICK)]
+    windows = split_windows(datetime(2026, 10, 1), datetime(2026, 10, 2), 1)
+    assert windows[-1] == (datetime(2026, 10, 2), datetime(2026, 10, 2))
+
+
+def test_single_instant_range():
+    moment = datetime(2026, 10, 1, 8)
+    assert split_windows(moment, moment, 1) == [(moment, moment)]
+
+
+def test_empty_range():
+    assert split_windows(datetime(2026, 10, 2), datetime(2026, 10, 1), 1) == []
+
+
+@pytest.mark.parametrize("window_days", [0, -1])
+def test_non_positive_window_days_are_rejected(window_days):
+    with pytest.raises(ValueError):
+        split_windows(datetime(2026, 10, 1), datetime(2026, 10, 2), window_days)
+    with pytest.raises(ValidationError, match="SYNC_WINDOW_DAYS must be at least 1"):
+        Settings(SYNC_WINDOW_DAYS=window_days)
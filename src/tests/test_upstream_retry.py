@@ -0,0 +1,90 @@
+import asyncio
+import json
+import httpx
+import pytest
+from src.app.core.config import settings
+from src.app.services import attendance_service
+from src.app.services.attendance_service import AttendanceService
+
+SUCCESS = {"result": "success", "reason": None, "data": [[{"SerialNumber": "SN1"}]]}
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(attendance_service.asyncio, "sleep", sleep)
+    monkeypatch.setattr(settings, "EXTERNAL_API_MAX_RETRIES", 3)
+    monkeypatch.setattr(settings, "EXTERNAL_API_RETRY_BACKOFF", 0.5)
+    return delays
+
+
+def fetch(*outcomes):
+    """
+    Stream one API_DeviceList request from an upstream answering with the
+    given outcomes in turn: a status code, or an exception to raise
+
+    Returns:
+        The records (or the exception raised) and the number of attempts
+    """
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        outcome = outcomes[len(attempts)]
+        attempts.append(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome == 200:
+            return httpx.Response(200, text=json.dumps(SUCCESS))
+        return httpx.Response(outcome, text="upstream error")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = AttendanceService(client)
+            try:
+                return [record async for record in service._stream_api_request("API_DeviceList")]
+            except Exception as e:
+                return e
+
+    return asyncio.run(run()), len(attempts)
+
+
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+def test_retryable_status_is_retried_with_backoff(delays, status):
+    records, attempts = fetch(status, status, 200)
+    assert records == [{"SerialNumber": "SN1"}]
+    assert attempts == 3
+    assert delays == [0.5, 1.0]
+
+
+def test_transport_error_is_retried(delays):
+    records, attempts = fetch(httpx.ConnectError("refused"), httpx.ReadTimeout("slow"), 200)
+    assert records == [{"SerialNumber": "SN1"}]
+    assert attempts == 3
+    assert delays == [0.5, 1.0]
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_client_error_is_not_retried(delays, status):
+    error, attempts = fetch(status, 200)
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert error.response.status_code == status
+    assert attempts == 1
+    assert delays == []
+
+
+def test_gives_up_after_last_retry(delays):
+    error, attempts = fetch(503, 503, 503, 503)
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert attempts == 4
+    assert delays == [0.5, 1.0, 2.0]
+
+
+def test_transport_error_on_last_retry_is_raised(delays):
+    error, attempts = fetch(*[httpx.ConnectError("refused")] * 4)
+    assert isinstance(error, httpx.ConnectError)
+    assert attempts == 4
+    assert delays == [0.5, 1.0, 2.0]